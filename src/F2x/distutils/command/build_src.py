@@ -17,14 +17,25 @@ import os
 import shlex
 import sys
 
-from distutils.dep_util import newer, newer_group
+from distutils.dep_util import newer
+from distutils.errors import DistutilsError
 from distutils.util import get_platform
 from numpy.distutils import log
 from numpy.distutils.command import build_src as numpy_build_src
 
 from F2x.runtime import argp
+from F2x.distutils.manifest import BuildManifest
 from F2x.distutils.strategy import get_strategy, show_strategies, base as strategy_base
-from F2x.template import get_template, show_templates
+from F2x.template import get_template, show_templates, package_dir as template_package_dir
+
+
+def _is_bundled_template_dir(template_dir):
+    """ Check whether templates from *template_dir* are bundled with F2x (and hence available to a daemon). """
+    if template_dir is None:
+        return True
+
+    bundled_dir = os.path.abspath(template_package_dir)
+    return os.path.commonpath([bundled_dir, os.path.abspath(template_dir)]) == bundled_dir
 
 
 class build_src(numpy_build_src.build_src):
@@ -41,7 +52,9 @@ class build_src(numpy_build_src.build_src):
         ('strategy=',    None, 'appy the given strategy'),
         ('templates=',   None, 'list of F2x templates to use'),
         ('f2x-options=', None, 'list of F2x command line options'),
-        ('force',        'f',  'forcibly build everything (ignore file timestamps)'),
+        ('f2x-daemon=',  None, 'wrap sources using an F2x daemon at HOST:PORT (or "auto" to use a local daemon that '
+                               'is started on demand)'),
+        ('force',        'f',  'forcibly build everything (ignore build manifest)'),
         ('inplace',      'i',  'ignore build-lib and put compiled extensions into the source directory '
                                'alongside your pure Python modules'),
     ]
@@ -66,6 +79,8 @@ class build_src(numpy_build_src.build_src):
         self.strategy = None
         self.templates = None
         self.f2x_options = None
+        self.f2x_daemon = None
+        self.manifest = None
 
     def finalize_options(self):
         self.set_undefined_options('build', ('build_base', 'build_base'),
@@ -84,6 +99,8 @@ class build_src(numpy_build_src.build_src):
         if self.build_src is None:
             self.build_src = os.path.join(self.build_base, f"src.{get_platform()}-{sys.version[:3]}")
 
+        self.manifest = BuildManifest(os.path.join(self.build_src, 'f2x-manifest.json'))
+
         if self.templates is not None:
             self.templates = [get_template(name) for name in shlex.split(self.templates)]
 
@@ -178,11 +195,10 @@ class build_src(numpy_build_src.build_src):
 
                 template_sources = sources_to_wrap[template_dir][template_file]
 
+                # The strategy only returns sources that need to be wrapped.
                 for source_file, target_file, output, depends in wrap_input:
-                    depends = [target_file] + depends
                     if target_file not in template_sources:
-                        if self.force or any([newer_group(depends, output_file) for output_file in output]):
-                            template_sources.append(target_file)
+                        template_sources.append(target_file)
 
     def _filter_compile_sets(self, sources_to_wrap):
         input_file_sets = dict()  # Collect (input files) -> (templates)
@@ -274,17 +290,48 @@ class build_src(numpy_build_src.build_src):
         from F2x.runtime.wrapper import F2xWrapper
 
         compile_sets, *_ = sorted(self._filter_compile_sets(sources_to_wrap), key=len)
+        client = self._get_daemon_client() if self.f2x_daemon else None
+        requests = []
+        failed = []
+        self.manifest.start()
 
         for template_dirs, template_files, input_files in compile_sets:
             join = lambda head, *tail: (head) if not tail else (head + join(*tail))
 
-            argv = self.f2x_options[:]
+            argv = self.f2x_options[:] + ['--bytecode-cache', os.path.join(self.build_src, 'jinja')]
             argv = join(argv, *(['-T', template_dir] for template_dir in template_dirs))
             argv = join(argv, *(['-t', template_file] for template_file in template_files))
 
             log.info(f'wrapping sources {", ".join(input_files)}...')
             log.info(f'  F2x args: {" ".join(argv)}')
 
-            args = argp.get_args_parser().parse_args(argv + list(input_files))
-            wrapper = F2xWrapper(args, log)
-            wrapper.run()
+            if client is not None and all(map(_is_bundled_template_dir, template_dirs)):
+                # Send all compile sets at once so the daemon can process them in parallel.
+                requests.append((client.submit(argv + list(input_files)), input_files))
+
+            else:
+                # Templates registered by the build script are unknown to the daemon, hence they are wrapped here.
+                args = argp.get_args_parser().parse_args(argv + list(input_files))
+                wrapper = F2xWrapper(args, log)
+                wrapper.run()
+
+                if wrapper.failed:
+                    failed.append(wrapper.failed)
+
+        if client is not None:
+            failed += [input_files for request_id, input_files in requests if client.wait(request_id) != 0]
+            client.close()
+
+        if failed:
+            raise DistutilsError('F2x failed to wrap ' + '; '.join(map(', '.join, failed)))
+
+        self.manifest.update()
+
+    def _get_daemon_client(self):
+        from F2x.runtime import daemon
+
+        if self.f2x_daemon == 'auto':
+            return daemon.F2xClient(daemon.ensure_daemon(), log=log)
+
+        host, port = self.f2x_daemon.rsplit(':', 1)
+        return daemon.F2xClient(host, int(port), log=log)
@@ -0,0 +1,155 @@
+# -*- encoding: utf-8 -*-
+#
+# Copyright 2018 German Aerospace Center (DLR)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Content based change detection for :code:`build_src`.
+
+Instead of comparing timestamps, the :py:class:`BuildManifest` records a digest of all inputs that went into wrapping
+a source (the source itself, its interface configuration, all template files and the F2x version). A source is only
+wrapped again if this digest changes or any of its outputs is missing. This keeps no-op rebuilds cheap even after a
+fresh checkout touched all timestamps.
+"""
+import hashlib
+import json
+import os
+import time
+
+import F2x
+
+
+class BuildManifest(object):
+    """
+    Persistent record of the inputs used to generate wrapper sources.
+
+    :param filename: The file the manifest is stored in.
+    """
+
+    # Increase to invalidate existing manifests after incompatible changes.
+    VERSION = 1
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.entries = {}
+        self._pending = {}
+        self._file_digests = {}
+        self._started = None
+
+        self.load()
+
+    def load(self):
+        """ Read the manifest from disk. Missing or unreadable manifests are treated as empty. """
+        try:
+            with open(self.filename, 'r') as manifest_file:
+                data = json.load(manifest_file)
+
+        except (OSError, ValueError):
+            return
+
+        if data.get('version') == self.VERSION:
+            self.entries = data.get('entries', {})
+
+    def save(self):
+        """ Write the manifest to disk. """
+        os.makedirs(os.path.dirname(self.filename) or '.', exist_ok=True)
+
+        temp_filename = f'{self.filename}.{os.getpid()}'
+        with open(temp_filename, 'w') as manifest_file:
+            json.dump({'version': self.VERSION, 'entries': self.entries}, manifest_file, indent=1, sort_keys=True)
+        os.replace(temp_filename, self.filename)
+
+    def file_digest(self, filename):
+        """ Calculate the digest of a file. Results are cached for the lifetime of the manifest. """
+        if filename not in self._file_digests:
+            digest = hashlib.sha256()
+            try:
+                with open(filename, 'rb') as input_file:
+                    for block in iter(lambda: input_file.read(65536), b''):
+                        digest.update(block)
+
+            except OSError:
+                digest.update(b'<missing>')
+
+            self._file_digests[filename] = digest.hexdigest()
+
+        return self._file_digests[filename]
+
+    def digest(self, depends, extra=None):
+        """
+        Calculate a combined digest for a list of input files.
+
+        :param depends: The list of input files.
+        :param extra: Additional text that influences the output (e.g., the interface configuration).
+        """
+        digest = hashlib.sha256(F2x.get_version_string(full=True).encode('utf-8'))
+        for filename in depends:
+            digest.update(os.path.normpath(filename).encode('utf-8'))
+            digest.update(self.file_digest(filename).encode('utf-8'))
+
+        if extra:
+            digest.update(extra.encode('utf-8'))
+
+        return digest.hexdigest()
+
+    def is_outdated(self, target_file, depends, output, extra=None):
+        """
+        Check whether a source needs to be wrapped.
+
+        Outdated sources are remembered so they can be recorded by :py:meth:`update` after wrapping succeeded.
+
+        :param target_file: The source file that will be wrapped.
+        :param depends: All files the output depends on.
+        :param output: The list of files that will be generated.
+        :param extra: Additional text that influences the output.
+        :return: :code:`True` if the source needs to be wrapped.
+        """
+        key = self._make_key(target_file, output)
+        digest = self.digest(depends, extra)
+        entry = self.entries.get(key)
+
+        if entry is not None \
+                and entry['digest'] == digest \
+                and all(os.path.isfile(output_file) for output_file in output):
+            return False
+
+        self._pending[key] = {'source': target_file, 'digest': digest, 'output': list(output)}
+        return True
+
+    def start(self):
+        """ Mark the begin of wrapping. Only outputs written after this will be recorded. """
+        self._started = time.time()
+
+    def update(self):
+        """
+        Record all pending sources whose outputs were written since :py:meth:`start`.
+
+        Sources that failed to wrap (e.g., due to a parser error) are left out so they will be retried next time.
+        """
+        for key, entry in list(self._pending.items()):
+            try:
+                written = all(os.path.getmtime(output_file) >= (self._started or 0) - 1
+                              for output_file in entry['output'])
+
+            except OSError:
+                written = False
+
+            if written:
+                self.entries[key] = entry
+                del self._pending[key]
+
+        self.save()
+
+    @staticmethod
+    def _make_key(target_file, output):
+        return '|'.join([os.path.normpath(target_file)] + sorted(map(os.path.normpath, output)))
@@ -27,15 +27,24 @@ custom build strategies.
         A build strategy to create Python extensions that need to load a library with the compiled wrapper code (like
         the :py:mod:`F2x.template.ctypes` template).
 
+    :py:class:`F2x.distutils.strategy.library.PackageLibBuildStrategy`
+        A build strategy like :py:class:`F2x.distutils.strategy.library.ExtensionLibBuildStrategy` that builds all
+        wrapped modules of a package into one shared library.
+
     :py:class:`F2x.distutils.strategy.extension.ExtensionBuildStrategy`
         A build strategy to create Python C extensions that contain the wrapper code in a loadable module.
 """
-from F2x.distutils.strategy.library import ExtensionLibBuildStrategy
+from F2x.distutils.strategy.library import ExtensionLibBuildStrategy, PackageLibBuildStrategy
 from F2x.distutils.strategy.base import BuildStrategy
 
 _strategies = {
     'lib': ExtensionLibBuildStrategy(['bindc', 'cerr', 'ctypes']),
+    'lib_capi': ExtensionLibBuildStrategy(['bindc', 'cerr', 'ctypes', 'capi']),
+    'lib_cfi': ExtensionLibBuildStrategy(['cfi']),
+    'lib_codes': ExtensionLibBuildStrategy(['bindc', 'cerr', 'ctypes'], generate={'error_codes': 'yes'}),
     'lib_noerr': ExtensionLibBuildStrategy(['bindc_new', 'ctypes_new']),
+    'lib_package': PackageLibBuildStrategy(['bindc', 'cerr', 'ctypes']),
+    'lib_ufunc': ExtensionLibBuildStrategy(['bindc', 'cerr', 'ctypes', 'ufunc']),
     'sphinx_docs': BuildStrategy(['sphinx']),
 }
 
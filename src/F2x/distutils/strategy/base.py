@@ -15,6 +15,7 @@
 # limitations under the License.
 import configparser
 import glob
+import io
 import os
 
 from distutils.errors import DistutilsFileError
@@ -67,7 +68,7 @@ class BuildStrategy(object):
 
         * Collect information about extension sources into :py:attr:`ext_modules`.
         * Decide whether to split and split.
-        * Collect libraries and modules form templates.
+        * Collect libraries, modules and include directories form templates.
         """
         if not extension.ext_modules:
             extension.ext_modules = self._collect_ext_sources(build_src, extension)
@@ -88,6 +89,10 @@ class BuildStrategy(object):
                 sources = [os.path.join(template.package_dir, module) for module in template.modules]
                 self._add_python_modules(build_src, package_name, sources)
 
+            for include_dir in getattr(template, 'include_dirs', None) or []:
+                if include_dir not in extension.include_dirs:
+                    extension.include_dirs.append(include_dir)
+
     def prepare_wrap_sources(self, build_src, extension, target_dir):
         """ Prepare sources for wrapping. Make sure everything is where it is expected. """
         build_src.mkpath(target_dir)
@@ -109,19 +114,27 @@ class BuildStrategy(object):
         - target name of source file (from where code generation will take place)
         - names of new files to be expected
         - dependencies of those new files (i.e., templates, sources, interface config)
+
+        If the :code:`build_src` command provides a :py:class:`BuildManifest <F2x.distutils.manifest.BuildManifest>`,
+        sources are selected by comparing the content of their inputs. Otherwise, timestamps are used.
         """
         wrap_sources = []
         common_depends = self.get_template_files(with_imports=True) + list(extension.depends)
+        manifest = getattr(build_src, 'manifest', None)
 
         for source, ext_info in extension.ext_modules:
             target_file = os.path.join(target_dir, os.path.basename(source))
             output = [os.path.join(target_dir, output_file) for output_file in ext_info['output']]
             depends = ext_info.get('depends', []) + common_depends + [target_file]
 
-            for output_file in output:
-                if build_src.force or newer_group(depends, output_file, missing='newer'):
-                    wrap_sources.append((source, target_file, output, depends))
-                    break
+            if manifest is not None:
+                extra = '\n'.join([self._get_config_text(ext_info) or '', ' '.join(build_src.f2x_options or [])])
+                outdated = manifest.is_outdated(target_file, depends, output, extra)
+            else:
+                outdated = any(newer_group(depends, output_file, missing='newer') for output_file in output)
+
+            if build_src.force or outdated:
+                wrap_sources.append((source, target_file, output, depends))
 
         return wrap_sources
 
@@ -285,6 +298,15 @@ class BuildStrategy(object):
 
         return ext_sources
 
+    def _get_config_text(self, ext_info):
+        config = ext_info.get('config')
+        if config is None:
+            return None
+
+        config_text = io.StringIO()
+        config.write(config_text)
+        return config_text.getvalue()
+
     def _get_wrap_output(self, extension, target_dir):
         wrap_output = []
 
@@ -16,6 +16,7 @@
 import configparser
 import os
 
+from distutils.errors import DistutilsSetupError
 from distutils.sysconfig import get_config_vars as distuils_get_config_vars
 from numpy.distutils import log, system_info
 
@@ -24,6 +25,15 @@ from F2x.distutils.strategy.extension import ExtensionBuildStrategy
 
 
 class ExtensionLibBuildStrategy(ExtensionBuildStrategy):
+    def __init__(self, templates=None, generate=None):
+        """
+        :param templates: The templates to use.
+        :param generate: Default values for the 'generate' section of the interface configuration of all wrapped
+                         sources (e.g., :code:`{'error_codes': 'yes'}`).
+        """
+        super(ExtensionLibBuildStrategy, self).__init__(templates)
+        self.generate = generate or {}
+
     def prepare_extension(self, build_src, extension):
         *package_path, ext_name = extension.name.split('.')
 
@@ -48,13 +58,16 @@ class ExtensionLibBuildStrategy(ExtensionBuildStrategy):
         for source, ext_info in extension.ext_modules:
             if not 'config' in ext_info:
                 ext_info['config'] = configparser.RawConfigParser()
-                ext_info['wrapper'] = os.path.join(target_dir, os.path.basename(source) + '-wrap')
+            ext_info['wrapper'] = os.path.join(target_dir, os.path.basename(source) + '-wrap')
 
             config = ext_info['config']
             if not config.has_section('generate'):
                 config.add_section('generate')
 
             config.set('generate', 'dll', self.get_ext_filename(build_src, extension.library_name or extension.name))
+            for option, value in self.generate.items():
+                if not config.has_option('generate', option):
+                    config.set('generate', option, value)
 
     def select_wrap_sources(self, build_src, extension, target_dir):
         wrap_sources = super(ExtensionLibBuildStrategy, self).select_wrap_sources(build_src, extension, target_dir)
@@ -90,3 +103,47 @@ class ExtensionLibBuildStrategy(ExtensionBuildStrategy):
     def get_ext_filename(self, build_src, ext_name):
         *_, ext_name = ext_name.split('.')
         return f'lib{ext_name}{system_info.so_ext}'
+
+
+class PackageLibBuildStrategy(ExtensionLibBuildStrategy):
+    """
+    Build all wrapped modules of a package into one shared library.
+
+    Extensions with a wildcard name (like :code:`package.*`) are never split. All such extensions of a package that use
+    this strategy are merged into one shared library. It is named after the package unless :code:`library_name` is
+    given. Each FORTRAN module still gets its own Python module that loads the shared library, i.e., the library is
+    only loaded once and all modules share the error handling state.
+    """
+
+    def prepare_extension(self, build_src, extension):
+        *package_path, ext_name = extension.name.split('.')
+
+        if ext_name == '*':
+            if extension.autosplit:
+                log.warn(f'ignoring autosplit for extension "{extension.name}"')
+                extension.autosplit = False
+
+            if not extension.library_name:
+                extension.library_name = '_'.join(package_path)
+
+            shared_name = '.'.join(package_path + [extension.library_name])
+            for shared_extension in build_src.extensions:
+                if shared_extension is not extension and shared_extension.name == shared_name \
+                        and shared_extension.strategy is self:
+                    self._merge_extension(build_src, shared_extension, extension)
+                    return
+
+        super(PackageLibBuildStrategy, self).prepare_extension(build_src, extension)
+
+    def _merge_extension(self, build_src, shared_extension, extension):
+        if extension.templates != shared_extension.templates:
+            raise DistutilsSetupError(f'extension "{extension.name}" uses other templates than '
+                                      f'"{shared_extension.name}" and cannot be built into the same library')
+
+        extension.ext_modules = self._collect_ext_sources(build_src, extension)
+        shared_extension.ext_modules += extension.ext_modules
+        shared_extension.sources += [source for source in extension.sources if source not in shared_extension.sources]
+        shared_extension.depends += [depend for depend in extension.depends if depend not in shared_extension.depends]
+
+        log.info(f'merge extension "{extension.name}" into "{shared_extension.name}"')
+        build_src.extensions.remove(extension)
@@ -16,14 +16,22 @@ Created on 12.02.2016
 
 @author: meinel
 '''
+import hashlib
+import io
 import logging
 import os
+import pickle
 import re
+import shutil
 import sys
 import time
 
+import ply
 import plyplus
+from ply import yacc
+from plyplus import engine_ply
 
+import F2x
 from F2x.parser import source
 from F2x.parser.plyplus import tree
 
@@ -32,8 +40,134 @@ log = logging.getLogger(__name__)
 grammar_cache = {}
 package_path, _ = os.path.split(__file__)
 
+# Bump this whenever the layout of the cached LALR tables changes.
+CACHE_VERSION = 1
 
-def load_grammar(grammar_filename):
+# Bump this whenever the layout of the cached generation trees changes. Changes of the tree classes are detected by
+# hashing the sources of their modules (see :py:func:`_tree_class_key`).
+GTREE_CACHE_VERSION = 5
+
+_module_hashes = {}
+
+
+def get_cache_dir():
+    """
+    Find the directory for persistent F2x caches.
+
+    The directory can be set using the environment variable :code:`F2X_CACHE_DIR`. Setting it to an empty value
+    disables all on-disk caches.
+
+    :return: The cache directory or :code:`None` if caching is disabled.
+    """
+    cache_dir = os.environ.get('F2X_CACHE_DIR')
+    if cache_dir is None:
+        cache_dir = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'F2x')
+
+    return cache_dir or None
+
+
+def _grammar_cache_key(grammar_data):
+    """
+    Calculate a key that identifies the LALR tables for a grammar.
+
+    The key includes the hash of the grammar source as well as the versions of plyplus and ply so that updates of any
+    of them invalidate the cache.
+    """
+    key = hashlib.sha256(grammar_data.encode('utf-8'))
+    key.update(u"{0}:{1}:{2}".format(CACHE_VERSION, plyplus.__version__, ply.__version__).encode('utf-8'))
+    return key.hexdigest()[:16]
+
+
+def _tree_class_key(cls):
+    """
+    Calculate a key that identifies the implementation of a tree class.
+
+    The key includes the hashes of the sources of all modules that define the class or one of its base classes, so
+    changes of the tree classes (including custom ones) invalidate cached generation trees.
+    """
+    key = hashlib.sha256(u"{0}.{1}".format(cls.__module__, cls.__qualname__).encode('utf-8'))
+
+    for base in cls.__mro__:
+        filename = getattr(sys.modules.get(base.__module__), '__file__', None)
+        if filename is None:
+            continue
+
+        if filename not in _module_hashes:
+            with open(filename, 'rb') as module_file:
+                _module_hashes[filename] = hashlib.sha256(module_file.read()).hexdigest()
+        key.update(_module_hashes[filename].encode('utf-8'))
+
+    return key.hexdigest()
+
+
+def _cached_build_parser(cache_dir, cache_key):
+    """
+    Create a replacement for :py:meth:`plyplus.engine_ply.Engine_PLY.build_parser` that stores the LALR tables in
+    :code:`cache_dir`.
+
+    plyplus passes a table module name to ply that can never be imported again so the tables are re-generated on every
+    run. This instead uses ply's pickle support. ply writes new tables to the file it read the old ones from, so it
+    always works on a private copy of the cache file that is moved into place afterwards. This way, concurrent builds
+    never see a partial cache file.
+    """
+    def build_parser(engine, cache_file):
+        table_filename = os.path.join(cache_dir, u"{0}-{1}.lrtab".format(cache_file, cache_key))
+        temp_filename = u"{0}.{1}".format(table_filename, os.getpid())
+        cached_stat = None
+
+        try:
+            if os.path.isfile(table_filename):
+                try:
+                    shutil.copyfile(table_filename, temp_filename)
+                    cached_stat = _file_stat(temp_filename)
+                    engine.parser = yacc.yacc(module=engine.callback, debug=engine.options.debug, write_tables=False,
+                                              picklefile=temp_filename, errorlog=engine_ply.grammar_logger)
+
+                except Exception as e:
+                    log.warning(u"Ignoring broken grammar cache {0} ({1}).".format(table_filename, e))
+                    cached_stat = None
+                    if os.path.isfile(temp_filename):
+                        os.remove(temp_filename)
+
+                if cached_stat is not None and cached_stat == _file_stat(temp_filename):
+                    log.debug(u"* Using cached LALR tables from {0}.".format(table_filename))
+                    return
+
+            if cached_stat is None:
+                engine.parser = yacc.yacc(module=engine.callback, debug=engine.options.debug, write_tables=False,
+                                          picklefile=temp_filename, errorlog=engine_ply.grammar_logger)
+
+            try:
+                os.replace(temp_filename, table_filename)
+                log.debug(u"* Stored LALR tables in {0}.".format(table_filename))
+            except OSError as e:
+                log.warning(u"Could not store grammar cache {0} ({1}).".format(table_filename, e))
+
+        finally:
+            if os.path.isfile(temp_filename):
+                os.remove(temp_filename)
+
+    return build_parser
+
+
+def _file_stat(filename):
+    """ Get size and modification time of a file to find out whether it was re-written. """
+    stat = os.stat(filename)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_grammar(grammar_filename, cache_dir=None):
+    """
+    Load a plyplus grammar.
+
+    Loaded grammars are kept in memory for the lifetime of the interpreter. Additionally, the generated LALR tables are
+    stored in :code:`cache_dir` (see :py:func:`get_cache_dir`) so that subsequent processes do not need to rebuild
+    them.
+
+    :param grammar_filename: The grammar file to load. A leading '@' refers to a grammar bundled with F2x.
+    :param cache_dir: The directory for persistent caches. Defaults to :py:func:`get_cache_dir`.
+    :return: The loaded grammar.
+    """
     if grammar_filename[0] == u'@':
         # Replace '@'-prefix with path to F2x.grammar.
         grammar_filename = os.path.join(package_path, u'grammar', grammar_filename[1:])
@@ -42,6 +176,14 @@ def load_grammar(grammar_filename):
     if grammar_filename in grammar_cache:
         return grammar_cache[grammar_filename]
 
+    cache_dir = cache_dir or get_cache_dir()
+    if cache_dir is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError as e:
+            log.warning(u"Could not create cache directory {0} ({1}).".format(cache_dir, e))
+            cache_dir = None
+
     # Need to adjust recursion limit as plyplus is very recusive and FORTRAN grammars are complex.
     old_recursionlimit = sys.getrecursionlimit()
     sys.setrecursionlimit(3000)
@@ -49,26 +191,110 @@ def load_grammar(grammar_filename):
     log.info(u"Loading grammar from {0}. This may take some time...".format(grammar_filename))
 
     start = time.time()
-    with open(grammar_filename, 'r') as grammar_file:
-        grammar = plyplus.Grammar(grammar_file)
-        grammar_cache[grammar_filename] = grammar
+    old_build_parser = engine_ply.Engine_PLY.build_parser
+    try:
+        with open(grammar_filename, 'r') as grammar_file:
+            if cache_dir is not None:
+                cache_key = _grammar_cache_key(grammar_file.read())
+                engine_ply.Engine_PLY.build_parser = _cached_build_parser(cache_dir, cache_key)
+                grammar_file.seek(0)
+
+            grammar = plyplus.Grammar(grammar_file)
+            grammar_cache[grammar_filename] = grammar
+
+    finally:
+        engine_ply.Engine_PLY.build_parser = old_build_parser
+        sys.setrecursionlimit(old_recursionlimit)
+
     timer = time.time() - start
-    
     log.debug(u"* Loaded grammar in {0}.".format(timer))
-    sys.setrecursionlimit(old_recursionlimit)
 
     return grammar
 
 
 class SourceFile(source.SourceFile):
+    gtree = None
+
     def parse(self):
         grammar_filename = self.config.get('parser', 'grammar')
         grammar = load_grammar(grammar_filename)
-        self.tree = grammar.parse(self.source)
+
+        try:
+            self.tree = grammar.parse(self.source)
+
+        except plyplus.ParseError as e:
+            if self.line_map is None:
+                raise
+
+            # Report errors with the line numbers of the original source.
+            for error in e.errors:
+                if 'line' in error.args:
+                    error.args['line'] = self.original_line(error.args['line'])
+            raise plyplus.ParseError(e.errors)
 
     def get_gtree(self, cls=None):
         if cls is None:
             cls = tree.Module
-        module = cls(self.tree)
-        module.export_methods(self)
-        return module
+
+        if self.gtree is None or type(self.gtree) is not cls:
+            self.gtree = cls(self.tree)
+            self.gtree.export_methods(self)
+            self._store_gtree(cls)
+
+        return self.gtree
+
+    def load_cached_gtree(self, cls=None):
+        """
+        Try to load the generation tree from the persistent cache.
+
+        The cache is keyed on the preprocessed source, the configuration and the tree class (including the sources of
+        its modules). If a cached tree is found, there is no need to :py:meth:`parse` the source.
+
+        :param cls: The tree class that would be used by :py:meth:`get_gtree`.
+        :return: The cached tree or :code:`None`.
+        """
+        cache_filename = self._gtree_cache_filename(cls or tree.Module)
+        if cache_filename is None or not os.path.isfile(cache_filename):
+            return None
+
+        try:
+            with open(cache_filename, 'rb') as cache_file:
+                self.gtree = pickle.load(cache_file)
+
+        except Exception as e:
+            log.warning(u"Ignoring broken tree cache {0} ({1}).".format(cache_filename, e))
+            return None
+
+        log.debug(u"* Using cached tree from {0}.".format(cache_filename))
+        return self.gtree
+
+    def _store_gtree(self, cls):
+        cache_filename = self._gtree_cache_filename(cls)
+        if cache_filename is None:
+            return
+
+        temp_filename = u"{0}.{1}".format(cache_filename, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(cache_filename), exist_ok=True)
+            with open(temp_filename, 'wb') as cache_file:
+                pickle.dump(self.gtree, cache_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_filename, cache_filename)
+
+        except (OSError, pickle.PicklingError) as e:
+            log.warning(u"Could not store tree cache {0} ({1}).".format(cache_filename, e))
+
+    def _gtree_cache_filename(self, cls):
+        cache_dir = get_cache_dir()
+        if cache_dir is None or self.source is None:
+            return None
+
+        config_text = io.StringIO()
+        self.config.write(config_text)
+
+        key = hashlib.sha256(u"{0}:{1}".format(GTREE_CACHE_VERSION, F2x.get_version_string(full=True)).encode('utf-8'))
+        key.update(_tree_class_key(cls).encode('utf-8'))
+        key.update(config_text.getvalue().encode('utf-8'))
+        key.update(u'\n'.join(self.source_lines).encode('utf-8'))
+        key.update(self.source.encode('utf-8'))
+
+        return os.path.join(cache_dir, 'gtree', key.hexdigest() + '.pickle')
@@ -19,6 +19,20 @@ Created on 08.04.2016
 from F2x.parser import tree
 
 
+# Kinds of scalar numbers and logicals that have an interoperable counterpart (and a NumPy dtype).
+_INTEROPERABLE_KINDS = {
+    "INTEGER": (None, 1, 2, 4, 8),
+    "LOGICAL": (None, 1, 2, 4, 8),
+    "REAL": (None, 4, 8),
+}
+
+
+def _is_interoperable_scalar(var):
+    """ Check if a variable is a scalar number or logical of a kind listed in :py:data:`_INTEROPERABLE_KINDS`. """
+    return not ("dims" in var or "strlen" in var or "ftype" in var) \
+        and var.get("kind") in _INTEROPERABLE_KINDS.get(var["type"].upper(), ())
+
+
 class VarDecl(tree.VarDecl):
     """
     A variable declaration.
@@ -116,6 +130,24 @@ class VarDecl(tree.VarDecl):
             if dims:
                 self["dims"] = dims
 
+        # Components use their own rules for explicit and deferred shapes
+        if self._prefix == "component_" and "dims" not in self:
+            for spec_nodes in (self._ast.select("component_array_spec"),
+                               full_spec.select("component_attr_spec component_array_spec")):
+                if not spec_nodes:
+                    continue
+
+                dims = []
+                for node in spec_nodes[0].select("explicit_shape_spec"):
+                    dim = node.select("int_literal_constant") or node.select("part_ref")
+                    dims.append(dim[-1].tail[0] if dim else 0)
+
+                for node in spec_nodes[0].select("deferred_shape_spec_list"):
+                    dims.extend(0 for token in node.tail if token == ':')
+
+                self["dims"] = dims
+                break
+
         if "dims" in self \
         and "strlen" not in self:
             if "setter" in self:
@@ -170,12 +202,19 @@ class TypeDef(tree.TypeDef):
         for field in self["fields"]:
             del field["intent"]
 
+        self["packed"] = [field for field in self["fields"] if self._is_packable(field)]
+
+    def _is_packable(self, field):
+        """ Check if a field is a scalar number or logical that can be copied to a BIND(C) mirror type. """
+        return not field.get("dynamic") and _is_interoperable_scalar(field)
+
 
 class SubDef(tree.SubDef):
     _PREFIX = "subroutine"
 
     def _init_children(self):
         self["name"] = self._ast.select(self._PREFIX + "_stmt name")[0].tail[0]
+        self["elemental"] = "ELEMENTAL" in self._get_prefix()
 
         # Two-stage argument extraction:
         # First, identify all variables declared and the dummy argument list.
@@ -190,6 +229,16 @@ class SubDef(tree.SubDef):
 
         return var_specs # to be re-used in child classes.
 
+    def _get_prefix(self):
+        """ Collect the prefix specifiers (like ELEMENTAL or PURE) of the procedure. """
+        # Depending on the statement, the prefix is either part of it or of the enclosing module subprogram.
+        specs = list(self._ast.select(self._PREFIX + "_stmt t_prefix_spec"))
+        for node in self._ast.parent().tail:
+            if getattr(node, "head", None) == "prefix":
+                specs += node.select("t_prefix_spec")
+
+        return [spec.tail[0].upper() for spec in specs if spec.tail and isinstance(spec.tail[0], str)]
+
 class FuncDef(SubDef):
     _PREFIX = "function"
     def _init_children(self):
@@ -287,6 +336,32 @@ class Module(tree.Module):
                     if config.has_option(section_key, var["name"]):
                         var["free"] = config.get(section_key, var["name"])
 
+        if config.has_option("generate", "batch"):
+            batch_items = [name.strip().lower() for name in config.get("generate", "batch").split(",")]
+
+            for method in methods:
+                if "*" in batch_items or method["name"].lower() in batch_items:
+                    method["batch"] = self._is_batchable(method)
+
+        # Without a list of failing methods, every method might raise an error.
+        fail_items = None
+        if config.has_option("generate", "fails"):
+            fail_items = [name.strip().lower() for name in config.get("generate", "fails").split(",")]
+
+        for method in methods:
+            method["fails"] = fail_items is None or "*" in fail_items or method["name"].lower() in fail_items
+
+    def _is_batchable(self, method):
+        """ Check if a method is a FUNCTION that only takes and returns scalar numbers or logicals. """
+        if not method["args"] or "ret" not in method or method["ret"]["getter"] != "function":
+            return False
+
+        for var in method["args"] + [method["ret"]]:
+            if not _is_interoperable_scalar(var):
+                return False
+
+        return all(arg["intent"] == "IN" for arg in method["args"])
+
     def _set_array_size(self, a_argument, a_src):
         l_arg = a_argument["name"]
         l_arg_len = len(l_arg)
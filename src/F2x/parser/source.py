@@ -36,27 +36,24 @@ CONFIG_DEFAULTS = {
 }
 
 
+# Each rule is a tuple (name, pattern, replacement[, start]). All rules are applied in a single scan of the source. The
+# optional start is a character class that contains all characters a match can start with. It allows the scan to skip
+# uninteresting characters quickly and is only used if all rules provide it.
 PREPROCESS_RULES = (
     # Disambiguate END statements by joining them into single keyword
-    (u'end/function',   r'(?i)END[ \t\u000C]+FUNCTION',     r'ENDFUNCTION'),
-    (u'end/interface',  r'(?i)END[ \t\u000C]+INTERFACE',    r'ENDINTERFACE'),
-    (u'end/module',     r'(?i)END[ \t\u000C]+MODULE',       r'ENDMODULE'),
-    (u'end/procedure',  r'(?i)END[ \t\u000C]+PROCEDURE',    r'ENDPROCEDURE'),
-    (u'end/program',    r'(?i)END[ \t\u000C]+PROGRAM',      r'ENDPROGRAM'),
-    (u'end/submodule',  r'(?i)END[ \t\u000C]+SUBMODULE',    r'ENDSUBMODULE'),
-    (u'end/subroutine', r'(?i)END[ \t\u000C]+SUBROUTINE',   r'ENDSUBROUTINE'),
-    (u'end/type',       r'(?i)END[ \t\u000C]+TYPE',         r'ENDTYPE'),
+    (u'end', r'(?i)END[ \t\u000C]+(FUNCTION|INTERFACE|MODULE|PROCEDURE|PROGRAM|SUBMODULE|SUBROUTINE|TYPE)',
+     lambda match: u'END' + match.group(1).upper(), r'[Ee]'),
 
     # Remove spaces from data types
-    (u'type/double precision', r'(?i)DOUBLE\s+PRECISION', r'DOUBLEPRECISION'),
-    (u'type/double complex',   r'(?i)DOUBLE\s+COMPLEX',   r'DOUBLECOMPLEX'),
+    (u'type/double', r'(?i)DOUBLE\s+(PRECISION|COMPLEX)',
+     lambda match: u'DOUBLE' + match.group(1).upper(), r'[Dd]'),
 
     # Replace (/ ... /) array constructs with [ ... ]
-    (u'array/left',  r'\(/', '['),
-    (u'array/right', r'/\)', ']'),
+    (u'array/left',  r'\(/', '[', r'\('),
+    (u'array/right', r'/\)', ']', r'/'),
 
     # Kind of numeric constant
-    (u'kind', r'(\d+)_(\d+|LF)', r'\1'),
+    (u'kind', r'(\d+)_(\d+|LF)', r'\1', r'\d'),
 )
 
 
@@ -65,6 +62,150 @@ grammar_cache = {}
 package_path, _ = os.path.split(__file__)
 
 
+class _RuleSet(object):
+    """
+    A list of preprocessing rules merged into one regular expression.
+
+    This allows to apply all rules in a single scan of the source instead of one scan per rule. If the matches of two
+    rules overlap, the match that starts first (or the rule that comes first in the list) wins. For the rules in
+    :py:data:`PREPROCESS_RULES` this is the same result as applying the rules one after another.
+
+    Executable lines are still found in a separate pass (see :py:func:`_find_executable_lines`). Visiting each line
+    start in the merged expression needs a Python callback per line, which makes the scan slower than the extra pass.
+    """
+
+    _inline_flags = re.compile(r'^\(\?([aiLmsux]+)\)')
+    _group_refs = re.compile(r'\\(?:g<(\d+)>|(\d+))')
+
+    def __init__(self, rules):
+        self.rules = []
+        alternatives = []
+        starts = []
+        groups = 0
+
+        for index, (name, pattern, repl, *start) in enumerate(rules):
+            # Global inline flags are only allowed at the start of an expression, hence they are scoped to the rule.
+            flags = self._inline_flags.match(pattern)
+            if flags:
+                pattern = f'(?{flags.group(1)}:{pattern[flags.end():]})'
+            else:
+                pattern = f'(?:{pattern})'
+
+            rule_pattern = re.compile(pattern)
+            if not callable(repl):
+                # Shift group references to the position of the rule's groups in the merged expression.
+                repl = self._group_refs.sub(lambda ref: f'\\g<{int(ref.group(1) or ref.group(2)) + groups + 1}>', repl)
+
+            alternatives.append(f'(?P<_{index}>{pattern})')
+            starts.append(start[0] if start else None)
+            self.rules.append((name, rule_pattern, repl, callable(repl) or '\\' in repl))
+            groups += rule_pattern.groups + 1
+
+        pattern = u'|'.join(alternatives)
+        if starts and None not in starts:
+            pattern = f'(?={"|".join(starts)})(?:{pattern})'
+        self.pattern = re.compile(pattern)
+
+    def apply(self, source):
+        """
+        Apply all rules to a source.
+
+        :param source: The text to process.
+        :return: A tuple of the processed text and a dict that counts how often each rule was applied.
+        """
+        counts = {}
+
+        def replace(match):
+            name, pattern, repl, expand = self.rules[int(match.lastgroup[1:])]
+            counts[name] = counts.get(name, 0) + 1
+
+            if not expand:
+                return repl
+            elif callable(repl):
+                # Callables expect the groups of their own rule, hence re-match the single rule.
+                return repl(pattern.match(match.string, match.start()))
+            else:
+                return match.expand(repl)
+
+        return self.pattern.sub(replace, source), counts
+
+
+_rule_sets = {}
+
+
+def _compile_rules(rules):
+    rules = tuple(rules)
+    if rules not in _rule_sets:
+        _rule_sets[rules] = _RuleSet(rules)
+    return _rule_sets[rules]
+
+
+def _find_executable_lines(lines):
+    """
+    Find the lines that belong to the execution part of a FUNCTION or SUBROUTINE.
+
+    This little state machine tracks where it is:
+
+    * :code:`st=0` -> Header (everything before CONTAINS)
+    * :code:`st=1` -> Outside of FUNCTION/SUBROUTINE
+    * :code:`st=2` -> In declaration part
+    * :code:`st=21` -> In declaration part : TYPE specification
+    * :code:`st=3` -> In execution part
+
+    :param lines: The stripped and upper-cased lines of the source.
+    :return: A list of indices of executable lines.
+    """
+    executable = []
+    ln, st, info = 0, 0, None
+    count = len(lines)
+
+    while ln < count:
+        line = lines[ln]
+
+        if line and line[0] != u'!':
+            if st == 0:
+                if line == u'CONTAINS':
+                    st = 1
+
+            elif st == 1:
+                if u'FUNCTION' in line:
+                    st = 2
+                    info = u'FUNCTION'
+                elif u'SUBROUTINE' in line:
+                    st = 2
+                    info = u'SUBROUTINE'
+
+            elif st == 2:
+                # TODO not very nice, only works with single space (but should be okay for now)
+                # YWA -- Interface definition is not covered
+                if line.startswith(u'TYPE ::'):
+                    st = 21
+
+                # YWA -- cover the case for continuous line
+                elif u'::' not in line and u'&' not in lines[ln - 1]:
+                    st = 3
+                    continue
+
+            elif st == 21:
+                if line.startswith(u'END') and line.endswith(u'TYPE'):
+                    st = 2
+
+            elif st == 3:
+                if u'END' in line and info in line:
+                    st = 1
+                else:
+                    executable.append(ln)
+
+        # Make sure get the whole statement with continuation
+        if st != 3:
+            while ln < count and lines[ln].endswith('&'):
+                ln += 1
+
+        ln += 1
+
+    return executable
+
+
 def load_grammar(grammar_filename):
     if grammar_filename[0] == u'@':
         # Replace '@'-prefix with path to F2x.grammar.
@@ -93,6 +234,7 @@ class SourceFile(object):
         self.source = None
         self.source_lines = None
         self.pre_source_lines = None
+        self.line_map = None
         self.tree = None
 
         self.filename = filename
@@ -107,7 +249,7 @@ class SourceFile(object):
             if not self.config.has_section(section):
                 self.config.add_section(section)
 
-        for opt in ('grammar', 'output_pre', 'encoding'):
+        for opt in ('grammar', 'output_pre', 'declarations_only', 'encoding'):
             if not self.config.has_option('parser', opt):
                 self.config.set('parser', opt, unicode(getattr(args, opt)))
 
@@ -140,91 +282,70 @@ class SourceFile(object):
             for index in ignore_lines:
                 lines[index - 1] = '!F2x/ignore ' + lines[index - 1]
 
-        # Automatically ignore executable lines.
-        # This little state machine tracks where it is:
-        # st=0 -> Header (everything before CONTAINS)
-        # st=1 -> Outside of FUNCTION/SUBROUTINE
-        # st=2 -> In declaration part
-        # st=21 -> In declaration part : TYPE specification
-        # st=3 -> In execution part
-        ln, st, info = 0, 0, None
-        while ln < len(lines):
-            line = lines[ln].strip().upper()
-
-            if line \
-            and line[0] != u'!':
-                if st == 0:
-                    if line == u'CONTAINS':
-                        st = 1
-    
-                elif st == 1:
-                    if u'FUNCTION' in line:
-                        st = 2
-                        info = u'FUNCTION'
-                    elif u'SUBROUTINE' in line:
-                        st = 2
-                        info = u'SUBROUTINE'
-
-                elif st == 2:
-                    # TODO not very nice, only works with single space (but should be okay for now)
-                    # YWA -- Interface definition is not covered
-                    lineBefore = lines[ln-1].strip().upper()
-                    if line.startswith(u'TYPE ::'):
-                        st = 21
-
-                    # YWA -- cover the case for continuous line
-                    elif u'::' not in line and u'&' not in lineBefore :
-                        st = 3
-                        ln -= 1
-
-                elif st == 21:
-                    if line.startswith(u'END') \
-                    and line.endswith(u'TYPE'):
-                        st = 2
-
-                elif st == 3:
-                    if u'END' in line \
-                    and info in line:
-                        st = 1
-    
-                    elif line \
-                    and line[0] != u'!':
-                        lines[ln] = u'!F2x-exe' + lines[ln]
-    
-            # Make sure get the whole statement with continuation
-            if st != 3:
-                while ln < len(lines) \
-                and lines[ln].strip().endswith('&'):
-                    ln += 1
-            
-            ln +=1
-
+        # Classify all lines in one pass (before the rules are applied) and mask executable lines.
+        executable = set(_find_executable_lines([line.strip().upper() for line in lines]))
+        for index in executable:
+            lines[index] = u'!F2x-exe' + lines[index]
 
         # Replace lines.
         if self.config.has_section('replace'):
             for index in self.config.options('replace'):
                 lines[int(index) - 1] = self.config.get('replace', index)
                 self.source_lines[int(index)-1] = lines[int(index)-1]
+                executable.discard(int(index) - 1)
             
         self.source = u'\n'.join(lines)
+        line_count = self.source.count('\n')
 
         # Apply preprocessing rules.
-        for name, pattern, repl in rules:
-            self.source, count = re.subn(pattern, repl, self.source)
-            if count:
-                log.debug("* {0} applied {1} times.".format(name, count))
+        self.source, counts = _compile_rules(rules).apply(self.source)
+        for name, count in counts.items():
+            log.debug("* {0} applied {1} times.".format(name, count))
+        lines_joined = self.source.count('\n') != line_count
 
         # Ensure source ends with newline.
         if not self.source.endswith('\n'):
             self.source += '\n'
 
+        self.pre_source_lines = list(map(unicode.rstrip, self.source.split('\n')))
+        self.line_map = None
+
+        if self.config.getboolean('parser', 'declarations_only'):
+            if lines_joined:
+                log.warning("Preprocessing changed line numbers of {0}, keeping executable lines.".format(self.filename))
+            else:
+                self._strip_executable_lines(executable)
+
         if self.config.getboolean('parser', 'output_pre'):
             pre_source_filename = self.filename + '.pre'
             log.info("Writing preprocessed source to {0}...".format(pre_source_filename))
             with open(pre_source_filename, 'wb') as pre_source_file:
                 pre_source_file.write(self.source.encode(self.config.get('parser', 'encoding')))
 
-        self.pre_source_lines = list(map(unicode.rstrip, self.source.split('\n')))
+    def _strip_executable_lines(self, executable):
+        """
+        Reduce procedure bodies to their declarations by removing all executable lines from the source.
+
+        The :py:attr:`pre_source_lines` still refer to the full source. :py:attr:`line_map` is used to translate line
+        numbers of the reduced source back.
+        """
+        lines = self.source.split('\n')
+        kept = [index for index in range(len(lines)) if index not in executable]
+
+        log.debug("* Removed {0} executable lines.".format(len(lines) - len(kept)))
+        self.source = u'\n'.join(lines[index] for index in kept)
+        self.line_map = [index + 1 for index in kept]
+
+    def original_line(self, line):
+        """
+        Translate a line number of the parsed source to the line number in the original source.
+
+        :param line: The (1-based) line number as reported by the parser.
+        """
+        if self.line_map is None or not 0 < line <= len(self.line_map):
+            return line
+
+        return self.line_map[line - 1]
     
     def parse(self):
         raise NotImplementedError()
@@ -29,6 +29,8 @@ class Node(dict):
         :code:`{{ module.name }}`
     """
 
+    _ast = None
+
     def __init__(self, ast):
         self._ast = ast
         self._init_children()
@@ -37,6 +39,13 @@ class Node(dict):
         """ Implement this to store useful values (i.e. lists or dicts) in the properties. """
         raise NotImplementedError()
 
+    def __getstate__(self):
+        """ Drop the AST when pickling. Templates only need the generation tree itself. """
+        state = dict(self.__dict__)
+        state.pop('_ast', None)
+        return state
+
+
 class VarDecl(Node):
     """
     A variable declaration.
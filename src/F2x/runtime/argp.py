@@ -18,6 +18,8 @@ def get_args_parser():
                              help="Suffix for per-source configuration file. (Default: %(default)s)")
     argp_parser.add_argument('-P', '--output-pre', action=u"store_true",  default=False,
                              help="Write pre-processed source.")
+    argp_parser.add_argument('-D', '--declarations-only', action=u"store_true", default=False,
+                             help="Remove executable statements from procedures before parsing.")
     argp_parser.add_argument('-F', '--configure', action=u"store_true", default=False,
                              help="Create/update configuration file.")
     argp_parser.add_argument('-e', '--encoding', default='latin1',
@@ -51,6 +53,8 @@ def get_args_parser():
                                 help="Add PATH to the template search path.")
     argp_generator.add_argument('-x', '--jinja-ext', action='append', metavar='EXTENSION', default=['jinja2.ext.do'],
                                 help="Add EXTENSION to Jinja2 environment.")
+    argp_generator.add_argument('--bytecode-cache', action='store', metavar='DIR',
+                                help="Store compiled templates in DIR. (Default: 'jinja' in the F2x cache directory)")
 
     argp_logging = argp.add_argument_group(u"Logging")
     argp_logging.add_argument(u'-l', u'--logfile', action='store',
@@ -63,6 +67,8 @@ def get_args_parser():
     argp_action = argp.add_argument_group(u"Action")
     argp_action.add_argument('-f', '--force', action='store_true', default=False,
                              help="Force rebuild of wrapper.")
+    argp_action.add_argument('-j', '--jobs', action='store', type=int, default=1, metavar='N',
+                             help="Wrap up to N sources in parallel. (Default: %(default)s)")
     argp_action.add_argument(u'--get', nargs=1, choices=['depends', 'modules', 'libraries', 'extlib'],
                              help="Collect template information about dependencies, modules, libraries, or "
                                   "the name of the extension library.")
@@ -1,21 +1,110 @@
+"""
+A daemon that keeps a pool of F2x processes with preloaded grammar.
+
+Clients talk to the daemon using a simple framed protocol: Each message is a JSON object, prefixed by its length as
+4-byte unsigned integer in network byte order. A client may send many requests over one connection without waiting
+for the previous ones to finish:
+
+* :code:`{"type": "request", "id": ..., "cwd": ..., "args": [...]}` asks the daemon to run F2x with the given command
+  line arguments in the given working directory.
+
+The daemon answers with any number of log records and finally a result for each request:
+
+* :code:`{"type": "log", "id": ..., "level": ..., "name": ..., "process": ..., "message": ...}`
+* :code:`{"type": "result", "id": ..., "exit_code": ..., "error": ..., "run_time": ...}`
+
+By default, the daemon listens on a Unix domain socket. TCP is available as well.
+"""
 import argparse
+import asyncio
+import collections
+import fcntl
+import hashlib
+import json
 import logging
 import os
-import select
 import socket
+import struct
+import subprocess
 import sys
+import tempfile
+import threading
+import time
 import multiprocessing
 
-from F2x.parser.plyplus.source import load_grammar
+import F2x
+from F2x.parser.plyplus.source import load_grammar, get_cache_dir
 from F2x.runtime.main import main as f2x_main
 from F2x.runtime.argp import init_logger
 
 _log = logging.getLogger(__name__)
 
+_FRAME_HEADER = struct.Struct('!I')
+_MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+def encode_frame(message):
+    """
+    Serialize a message into a frame.
+
+    :raises ValueError: If the message is too large for a frame.
+    """
+    data = json.dumps(message).encode('utf-8')
+    if len(data) > _MAX_FRAME_SIZE:
+        raise ValueError(f"Message of {len(data)} bytes exceeds the maximum frame size.")
+
+    return _FRAME_HEADER.pack(len(data)) + data
+
+
+def _frame_size(header):
+    size, = _FRAME_HEADER.unpack(header)
+    if size > _MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {size} bytes exceeds the maximum frame size.")
+
+    return size
+
+
+def decode_frame(data):
+    """ Deserialize the payload of a frame (without the length prefix). """
+    return json.loads(data.decode('utf-8'))
+
+
+def send_frame(sock, message):
+    """ Send a message as one frame. """
+    sock.sendall(encode_frame(message))
+
+
+def recv_frame(sock):
+    """
+    Receive one frame.
+
+    :return: The decoded message or :code:`None` if the connection was closed.
+    :raises ConnectionError: If the connection was closed within a frame.
+    :raises ValueError: If the frame is too large.
+    """
+    header = _recv_exactly(sock, _FRAME_HEADER.size)
+    if header is None:
+        return None
+
+    data = _recv_exactly(sock, _frame_size(header))
+    if data is None:
+        raise ConnectionError("Connection closed within a frame.")
+
+    return decode_frame(data)
+
 
-class SocketStream(socket.SocketIO):
-    def write(self, data):
-        return super().write(data.encode('utf-8'))
+def _recv_exactly(sock, size):
+    chunks = []
+    while size > 0:
+        data = sock.recv(min(size, 65536))
+        if not data:
+            if chunks:
+                raise ConnectionError("Connection closed within a frame.")
+            return None
+        chunks.append(data)
+        size -= len(data)
+
+    return b''.join(chunks)
 
 
 def _log_args():
@@ -34,96 +123,595 @@ def _preload_grammar():
     load_grammar('@fortran.g')
 
 
-def _run_process(pwd, args, conn):
-    handler = logging.StreamHandler(SocketStream(conn, 'w'))
-    handler.setFormatter(logging.Formatter(f'%(levelno)d:{multiprocessing.current_process().name}:%(message)s\n'))
+_records = None
+
+
+def _init_worker(records):
+    global _records
+    _records = records
+
+    _preload_grammar()
+
+
+class _RecordHandler(logging.Handler):
+    """ Pass log records of a request back to the daemon process. """
+
+    def __init__(self, connection_id, request_id):
+        super(_RecordHandler, self).__init__()
+        self.connection_id = connection_id
+        self.request_id = request_id
+        self.errors = 0
+
+    def emit(self, record):
+        if record.levelno >= logging.ERROR:
+            self.errors += 1
+
+        _records.put({'connection': self.connection_id, 'type': 'log', 'id': self.request_id,
+                      'level': record.levelno, 'name': record.name, 'process': record.processName,
+                      'message': record.getMessage()})
+
+
+def _run_process(connection_id, request_id, pwd, args):
+    handler = _RecordHandler(connection_id, request_id)
+    exit_code, error = 0, None
+    start = time.perf_counter()
 
     log = logging.getLogger()
     log.addHandler(handler)
 
-    os.chdir(pwd)
-    f2x_main(args)
+    try:
+        os.chdir(pwd)
+        f2x_main(args)
+
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else int(e.code is not None)
+
+    except Exception as e:
+        exit_code, error = 1, f'{type(e).__name__}: {e}'
+
+    finally:
+        log.removeHandler(handler)
+
+    # Errors are only logged by F2x, hence they are counted to decide about success.
+    if exit_code == 0 and handler.errors:
+        exit_code = 1
+
+    # The result is passed through the same queue as the log records so it is always sent last.
+    _records.put({'connection': connection_id, 'type': 'result', 'id': request_id,
+                  'exit_code': exit_code, 'error': error, 'run_time': time.perf_counter() - start})
+
+
+class _Connection(object):
+    def __init__(self, sock):
+        self.socket = sock
+        self.pending = 0
+        self.reading = True
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        with self._lock:
+            try:
+                send_frame(self.socket, message)
+            except OSError:
+                # The client has gone away. Keep processing, there is nobody to tell.
+                pass
+
+    def add_request(self):
+        with self._lock:
+            self.pending += 1
+
+    def finish_request(self):
+        with self._lock:
+            self.pending -= 1
+            return self._close_if_done()
 
-    log.removeHandler(handler)
+    def finish_reading(self):
+        with self._lock:
+            self.reading = False
+            return self._close_if_done()
+
+    def _close_if_done(self):
+        if self.reading or self.pending > 0:
+            return False
+
+        self.socket.close()
+        return True
+
+
+class DaemonRunningError(RuntimeError):
+    """ Raised if another daemon is already serving (or about to serve) on a Unix socket. """
+    pass
+
+
+def _probe(socket_path):
+    """ Check whether a daemon accepts connections on a Unix socket. """
+    probe_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe_socket.connect(socket_path)
+        return True
+    except (FileNotFoundError, ConnectionRefusedError):
+        return False
+    finally:
+        probe_socket.close()
 
 
 class F2xDaemon(object):
-    def __init__(self, addr, port, num_procs):
-        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self._socket.bind((addr, port))
+    """
+    Serve F2x requests from a pool of processes that have the grammar already loaded.
+
+    A daemon on a Unix socket holds a lock on :code:`PATH.lock` while it is running, so only one daemon serves on
+    a socket. The socket file is only replaced if no other daemon is listening on it.
+
+    :param addr: The host name to listen on or, if no `port` is given, the path of a Unix socket.
+    :param port: The TCP port to listen on.
+    :param num_procs: Number of worker processes.
+    :param idle_timeout: Stop after this many seconds without connections (default: run until interrupted).
+    :raises DaemonRunningError: If another daemon is running on the Unix socket.
+    """
+
+    def __init__(self, addr, port, num_procs, idle_timeout=None):
+        self._lock_file = None
+
+        if port is None:
+            self._lock_file = open(addr + '.lock', 'a')
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._lock_file.close()
+                raise DaemonRunningError(f"Another F2x daemon is starting on {addr}.")
+
+            if os.path.exists(addr):
+                if _probe(addr):
+                    self._lock_file.close()
+                    raise DaemonRunningError(f"Another F2x daemon is running on {addr}.")
+
+                # Left over by a daemon that did not shut down cleanly.
+                os.unlink(addr)
+
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.bind(addr)
+            self._unix_path = addr
+
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.bind((addr, port))
+            self._unix_path = None
+
         self._socket.listen(num_procs)
-        self._pool = multiprocessing.Pool(num_procs, initializer=_preload_grammar)
+        self._idle_timeout = idle_timeout
+        self._last_active = time.monotonic()
+
+        self._connections = {}
+        self._next_connection_id = 1
+        self._records = multiprocessing.Queue()
+        self._pool = multiprocessing.Pool(num_procs, initializer=_init_worker, initargs=(self._records,))
+
+        self._dispatcher = threading.Thread(target=self._dispatch_records, daemon=True)
+        self._dispatcher.start()
 
     def serve(self):
+        if self._idle_timeout is not None:
+            self._socket.settimeout(min(self._idle_timeout, 1.0))
+
         while True:
             try:
                 conn, addr = self._socket.accept()
-                _log.info("New request from %s.", addr)
+                conn.settimeout(None)
+                _log.info("New connection from %s.", addr or self._unix_path)
+
+            except socket.timeout:
+                if self._connections or time.monotonic() - self._last_active < self._idle_timeout:
+                    continue
+
+                _log.info("Stopping after %s seconds without requests...", self._idle_timeout)
+                self._stop()
+                break
 
             except KeyboardInterrupt:
                 _log.info("Stopping...")
-                self._socket.close()
-                self._pool.close()
-                self._pool.join()
+                self._stop()
                 break
 
-            pwd, *args = conn.recv(4096).decode('utf-8').splitlines()
-            self._pool.apply_async(_run_process, (pwd, args, conn), callback=lambda _: conn.close(), error_callback=lambda _: conn.close())
+            connection_id = self._next_connection_id
+            self._next_connection_id += 1
+            self._connections[connection_id] = _Connection(conn)
+
+            threading.Thread(target=self._read_requests, args=(connection_id, ), daemon=True).start()
+
+    def _stop(self):
+        self._socket.close()
+        if self._unix_path is not None:
+            os.unlink(self._unix_path)
+        self._pool.close()
+        self._pool.join()
+        self._records.put(None)
+        self._dispatcher.join()
+        if self._lock_file is not None:
+            self._lock_file.close()
+
+    def _close_connection(self, connection_id):
+        del self._connections[connection_id]
+        self._last_active = time.monotonic()
+
+    def _read_requests(self, connection_id):
+        connection = self._connections[connection_id]
+
+        try:
+            while True:
+                message = recv_frame(connection.socket)
+                if message is None:
+                    break
+
+                request_id = message.get('id')
+                if message.get('type') != 'request':
+                    connection.send({'type': 'result', 'id': request_id, 'exit_code': 2,
+                                     'error': f"Unknown message type {message.get('type')!r}."})
+                    continue
+
+                _log.info("Request %s/%s: %s", connection_id, request_id, ' '.join(message['args']))
+                connection.add_request()
+                self._pool.apply_async(
+                    _run_process, (connection_id, request_id, message['cwd'], message['args']),
+                    error_callback=lambda e, request_id=request_id: self._records.put(
+                        {'connection': connection_id, 'type': 'result', 'id': request_id,
+                         'exit_code': 1, 'error': f'{type(e).__name__}: {e}'}))
+
+        except (OSError, ValueError, KeyError) as e:
+            _log.error("Dropping connection %s: %s", connection_id, e)
+
+        if connection.finish_reading():
+            self._close_connection(connection_id)
+
+    def _dispatch_records(self):
+        while True:
+            message = self._records.get()
+            if message is None:
+                break
+
+            connection_id = message.pop('connection')
+            connection = self._connections.get(connection_id)
+            if connection is None:
+                continue
+
+            connection.send(message)
+            if message['type'] == 'result' and connection.finish_request():
+                self._close_connection(connection_id)
+
+
+def _emit(log, level, message):
+    # Works for both, loggers from the logging module and the distutils log.
+    if level >= logging.ERROR:
+        log.error(message)
+    elif level >= logging.WARNING:
+        getattr(log, 'warning', getattr(log, 'warn', None))(message)
+    elif level >= logging.INFO:
+        log.info(message)
+    else:
+        log.debug(message)
 
 
 class F2xClient(object):
-    def __init__(self, host, port):
-        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self._socket.connect((host, port))
-        self._socket.setblocking(False)
+    """
+    Send F2x requests to a running :py:class:`F2xDaemon`.
+
+    Requests can be pipelined: Use :py:meth:`submit` to send several requests and :py:meth:`wait` to collect their
+    results.
+
+    :param host: The host name of the daemon or, if no `port` is given, the path of its Unix socket (default:
+                 :py:func:`get_default_socket`).
+    :param port: The TCP port of the daemon.
+    :param log: The log to pass output of the daemon to.
+    """
+
+    def __init__(self, host=None, port=None, log=None):
+        if port is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(host or get_default_socket())
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.connect((host, port))
+
+        self._log = log or _log
+        self._next_request_id = 1
+        self._results = {}
+
+    def submit(self, args, cwd=None):
+        """
+        Send a request to the daemon.
+
+        :param args: The command line arguments for F2x.
+        :param cwd: The working directory to run F2x in (default: the current working directory).
+        :return: The id of the request.
+        """
+        request_id = self._next_request_id
+        self._next_request_id += 1
+
+        send_frame(self._socket, {'type': 'request', 'id': request_id, 'cwd': cwd or os.getcwd(), 'args': list(args)})
+        return request_id
+
+    def wait(self, request_id):
+        """
+        Wait for a request to finish. Log records received meanwhile are passed to the log.
+
+        :param request_id: The id as returned by :py:meth:`submit`.
+        :return: The exit code of the request.
+        """
+        while request_id not in self._results:
+            message = recv_frame(self._socket)
+            if message is None:
+                raise ConnectionError("F2x daemon closed the connection.")
+
+            if message['type'] == 'log':
+                _emit(self._log, message['level'], f"[{message['process']}] {message['message']}")
+
+            elif message['type'] == 'result':
+                if message.get('error'):
+                    self._log.error(f"Request {message['id']} failed: {message['error']}")
+                self._results[message['id']] = message['exit_code']
+
+        return self._results.pop(request_id)
 
     def invoke(self, args):
-        pwd = os.getcwd()
-        data = "\n".join([pwd] + args)
-        self._socket.send(data.encode('utf-8'))
-        failed = 0
+        """ Run F2x with the given arguments and wait for the result. """
+        return self.wait(self.submit(args))
+
+    def close(self):
+        self._socket.close()
+
+
+WrapResult = collections.namedtuple('WrapResult', ['source', 'exit_code', 'elapsed', 'run_time'])
+WrapResult.__doc__ = """
+Outcome of wrapping a single source with :py:meth:`AsyncF2xClient.wrap`.
+
+:param source: The wrapped source file.
+:param exit_code: The exit code reported by the daemon.
+:param elapsed: Seconds from sending the request until the result arrived.
+:param run_time: Seconds the daemon actually spent on the request (i.e., without waiting for a free worker).
+"""
+
+
+class AsyncF2xClient(object):
+    """
+    Send F2x requests to a running :py:class:`F2xDaemon` using :py:mod:`asyncio`.
+
+    Any number of requests may be in flight at the same time, so all workers of the daemon can be kept busy. Use
+    :py:meth:`connect` to create a client::
+
+        client = await AsyncF2xClient.connect()
+        results = await client.wrap(['a.f90', 'b.f90'], ['@bindc/_glue.f90.t', '@ctypes/_glue.py.t'])
+        await client.close()
+    """
+
+    def __init__(self, reader, writer, log=None):
+        self._reader = reader
+        self._writer = writer
+        self._log = log or _log
+        self._next_request_id = 1
+        self._pending = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect(cls, host=None, port=None, log=None):
+        """
+        Connect to a daemon.
+
+        :param host: The host name of the daemon or, if no `port` is given, the path of its Unix socket (default:
+                     :py:func:`get_default_socket`).
+        :param port: The TCP port of the daemon.
+        :param log: The log to pass output of the daemon to.
+        """
+        if port is None:
+            reader, writer = await asyncio.open_unix_connection(host or get_default_socket())
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+
+        return cls(reader, writer, log)
+
+    async def invoke(self, args, cwd=None):
+        """
+        Run F2x with the given arguments.
+
+        :param args: The command line arguments for F2x.
+        :param cwd: The working directory to run F2x in (default: the current working directory).
+        :return: The result message of the daemon.
+        :raises ConnectionError: If the connection to the daemon is lost.
+        """
+        if self._receiver.done():
+            # Nobody would ever resolve the result.
+            error = None if self._receiver.cancelled() else self._receiver.exception()
+            raise error or ConnectionError("F2x daemon closed the connection.")
+
+        request_id = self._next_request_id
+        self._next_request_id += 1
+
+        result = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = result
+
+        self._writer.write(encode_frame({'type': 'request', 'id': request_id, 'cwd': cwd or os.getcwd(),
+                                         'args': list(args)}))
+        await self._writer.drain()
+
+        return await result
+
+    async def wrap(self, sources, templates, args=None, cwd=None):
+        """
+        Wrap sources, each by a separate request. All requests are sent at once and processed concurrently.
+
+        :param sources: The source files to wrap.
+        :param templates: The templates to apply.
+        :param args: Additional command line arguments for F2x.
+        :param cwd: The working directory to run F2x in (default: the current working directory).
+        :return: A list of :py:class:`WrapResult` in the order of `sources`.
+        """
+        argv = list(args or [])
+        for template in templates:
+            argv += ['-t', template]
+
+        async def wrap_source(source):
+            start = time.perf_counter()
+            result = await self.invoke(argv + [source], cwd)
+            return WrapResult(source, result['exit_code'], time.perf_counter() - start, result.get('run_time'))
+
+        return await asyncio.gather(*map(wrap_source, sources))
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        await self._receiver
+
+    async def _receive(self):
+        error = ConnectionError("F2x daemon closed the connection.")
+
+        try:
+            while True:
+                header = await self._reader.readexactly(_FRAME_HEADER.size)
+                message = decode_frame(await self._reader.readexactly(_frame_size(header)))
+
+                if message['type'] == 'log':
+                    _emit(self._log, message['level'], f"[{message['process']}] {message['message']}")
+
+                elif message['type'] == 'result':
+                    if message.get('error'):
+                        self._log.error(f"Request {message['id']} failed: {message['error']}")
+
+                    result = self._pending.pop(message['id'], None)
+                    if result is not None and not result.done():
+                        result.set_result(message)
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+        except Exception as e:
+            error = e
+            raise
+
+        finally:
+            # Pending requests would wait forever otherwise.
+            for result in self._pending.values():
+                if not result.done():
+                    result.set_exception(error)
+            self._pending.clear()
+
+
+_sources_hash = None
+
+
+def _get_sources_hash():
+    """ Hash the installed sources of F2x (including templates and grammars). """
+    global _sources_hash
+
+    if _sources_hash is None:
+        key = hashlib.sha256()
+        package_dir = os.path.dirname(F2x.__file__)
+        for dirpath, dirnames, filenames in os.walk(package_dir):
+            dirnames[:] = sorted(name for name in dirnames if name != '__pycache__')
+            for filename in sorted(filenames):
+                if os.path.splitext(filename)[1] in ('.pyc', '.o', '.so', '.d'):
+                    continue
+
+                path = os.path.join(dirpath, filename)
+                key.update(os.path.relpath(path, package_dir).encode('utf-8'))
+                with open(path, 'rb') as source_file:
+                    key.update(hashlib.sha256(source_file.read()).digest())
+
+        _sources_hash = key.hexdigest()
 
-        inputs = [self._socket]
+    return _sources_hash
 
-        while inputs:
-            readable, _, exceptional = select.select(inputs, [], inputs)
 
-            for s in readable:
-                data = s.recv(4096)
-                if data:
-                    _log.info(data.decode('utf-8'))
-                else:
-                    inputs.remove(s)
-                    s.close()
+def get_default_socket():
+    """
+    Get the path of the Unix socket for a daemon that is started on demand.
 
-            for s in exceptional:
-                inputs.remove(s)
-                s.close()
-                failed += 1
+    The path depends on the Python interpreter and a hash of the installed F2x sources so that a daemon never serves
+    requests with outdated code (also for editable installs).
+    """
+    key = hashlib.sha256(f'{os.getuid()}:{sys.executable}:{_get_sources_hash()}'.encode('utf-8'))
+    return os.path.join(get_cache_dir() or tempfile.gettempdir(), f'daemon-{key.hexdigest()[:12]}.sock')
 
-        return failed
+
+def ensure_daemon(socket_path=None, num_procs=None, timeout=60.0, idle_timeout=600.0):
+    """
+    Make sure a daemon is listening on a Unix socket. If none is running yet, a new one is started in background.
+
+    If several processes start a daemon at the same time, only one of them keeps running (see :py:class:`F2xDaemon`).
+
+    :param socket_path: The path of the Unix socket (default: :py:func:`get_default_socket`).
+    :param num_procs: Number of worker processes for a new daemon (default: number of CPUs).
+    :param timeout: Seconds to wait for a new daemon to accept connections.
+    :param idle_timeout: Seconds after which a new daemon stops if it receives no requests.
+    :return: The path of the Unix socket.
+    """
+    socket_path = socket_path or get_default_socket()
+
+    if _probe(socket_path):
+        return socket_path
+
+    _log.info("Starting F2x daemon on %s...", socket_path)
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    with open(os.path.splitext(socket_path)[0] + '.log', 'ab') as log_file:
+        process = subprocess.Popen([sys.executable, '-m', 'F2x.runtime.daemon',
+                                    '--listen-unix', socket_path, '-n', str(num_procs or os.cpu_count() or 1),
+                                    '--idle-timeout', str(idle_timeout)],
+                                   stdin=subprocess.DEVNULL, stdout=log_file, stderr=log_file,
+                                   start_new_session=True)
+
+    deadline = time.time() + timeout
+    while not _probe(socket_path):
+        # A new daemon exits successfully if another one is already starting, so wait for that one.
+        if process.poll() not in (None, 0):
+            raise RuntimeError(f"F2x daemon exited with code {process.returncode}.")
+        if time.time() > deadline:
+            raise RuntimeError(f"F2x daemon did not start within {timeout} seconds.")
+        time.sleep(0.1)
+
+    return socket_path
 
 
 def main():
     argp = argparse.ArgumentParser(description="F2x daemon")
-    argp.add_argument('-l', '--listen', nargs=2, metavar=('HOST', 'PORT'), required=False)
+    argp.add_argument('-l', '--listen', nargs=2, metavar=('HOST', 'PORT'), required=False,
+                      help="Serve requests on TCP port PORT of HOST.")
+    argp.add_argument('-u', '--listen-unix', nargs='?', const='', metavar='PATH', required=False,
+                      help="Serve requests on Unix socket PATH. (Default: per-user socket in the F2x cache directory)")
     argp.add_argument('-n', '--num-procs', nargs=1, action='store', type=int, default=[1])
-    argp.add_argument('-c', '--connect', nargs=2, metavar=('HOST', 'PORT'), required=False, default=('localhost', 2337))
+    argp.add_argument('--idle-timeout', type=float, metavar='SECONDS', required=False,
+                      help="Stop the daemon after SECONDS without requests. (Default: run until interrupted)")
+    argp.add_argument('-c', '--connect', nargs=2, metavar=('HOST', 'PORT'), required=False,
+                      help="Send the request to a daemon listening on TCP port PORT of HOST.")
+    argp.add_argument('--connect-unix', metavar='PATH', required=False,
+                      help="Send the request to a daemon listening on Unix socket PATH.")
 
     daemon_args, args = argp.parse_known_args()
 
     global _log
     _log = init_logger(_log_args())
 
-    if daemon_args.listen:
+    if daemon_args.listen_unix is not None:
+        try:
+            daemon = F2xDaemon(daemon_args.listen_unix or get_default_socket(), None, daemon_args.num_procs[0],
+                               daemon_args.idle_timeout)
+        except DaemonRunningError as e:
+            _log.info("%s", e)
+            sys.exit(0)
+
+        daemon.serve()
+
+    elif daemon_args.listen:
         host, port = daemon_args.listen
-        daemon = F2xDaemon(host, int(port), daemon_args.num_procs[0])
+        daemon = F2xDaemon(host, int(port), daemon_args.num_procs[0], daemon_args.idle_timeout)
         daemon.serve()
 
     else:
-        host, port = daemon_args.connect
-        daemon = F2xClient(host, int(port))
-        sys.exit(daemon.invoke(args))
+        if daemon_args.connect:
+            host, port = daemon_args.connect
+            client = F2xClient(host, int(port))
+        else:
+            client = F2xClient(daemon_args.connect_unix)
+
+        exit_code = client.invoke(args)
+        client.close()
+        sys.exit(exit_code)
 
 
 if __name__ == '__main__':
@@ -25,7 +25,6 @@ import sys
 import time
 from configparser import ConfigParser
 
-import jinja2
 import plyplus
 
 import F2x
@@ -38,21 +37,21 @@ IGNORE_DELTA = 3
 
 
 def _load_templates(log, templates, template_path=None):
+    from F2x.runtime.wrapper import get_environment, load_template_file
+
     log.info(u"Loading {0} templates...".format(len(templates)))
     loaded_templates = []
     template_path = list(template_path or [])
+    template_env = get_environment(template_path, ['jinja2.ext.do'])
 
     start = time.time()
     for mod, filename, filepath, suffix in templates:
         log.debug(u"* Loading template from {0}...".format(filename))
-        template_loader = jinja2.FileSystemLoader(template_path)
-        template_env = jinja2.Environment(loader=template_loader, extensions=['jinja2.ext.do'])
 
         try:
-            template = template_loader.load(template_env, filename)
+            template = template_env.get_template(filename)
         except IOError:
-            with open(filepath, 'r') as template_file:
-                template = template_env.from_string(template_file.read())
+            template = load_template_file(template_env, filepath)
         loaded_templates.append((template, suffix))
     
     timer = time.time() - start
@@ -154,6 +153,7 @@ def main(argv=None, from_distutils=False):
         args.grammar = argp.get_arg(args, config, 'grammar', 'parser', "@fortran.g", str)
         args.config_suffix = argp.get_arg(args, config, 'config_suffix', 'parser', "-wrap", str)
         args.output_pre = argp.get_arg(args, config, 'output_pre', 'parser', False, bool)
+        args.declarations_only = argp.get_arg(args, config, 'declarations_only', 'parser', False, bool)
         args.configure = argp.get_arg(args, config, 'configure', 'parser', False, bool)
         args.encoding = argp.get_arg(args, config, 'encoding', 'parser', 'utf8', str)
         args.tree_class = argp.get_arg(args, config, 'tree_class', 'parser', None, str)
@@ -168,6 +168,9 @@ def main(argv=None, from_distutils=False):
         args.template = argp.get_arg(args, config, 'template', 'generate', [], lambda t: t.split(';'))
         args.template_path = argp.get_arg(args, config, 'template_path', 'generate', [], lambda p: p.split(';'))
         args.jinja_ext = argp.get_arg(args, config, 'jinja_ext', 'generate', ['jinja2.ext.do'], lambda e: e.split(';'))
+        args.bytecode_cache = argp.get_arg(args, config, 'bytecode_cache', 'generate', None, str)
+
+        args.jobs = argp.get_arg(args, config, 'jobs', 'generate', 1, int)
 
         args.logfile = argp.get_arg(args, config, 'logfile', 'logging', None, str)
         # HACK end
@@ -221,6 +224,9 @@ def main(argv=None, from_distutils=False):
         wrapper = F2xWrapper(args, log)
         wrapper.run()
 
+        if wrapper.failed:
+            sys.exit(1)
+
 
 def _make_extension(args):
     from F2x.distutils.extension import Extension
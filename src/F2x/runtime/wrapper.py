@@ -1,14 +1,100 @@
 import ctypes
+import logging
+import multiprocessing
 import os
+import pickle
 from importlib import import_module
 
 import jinja2
 import plyplus
+from jinja2 import meta
 
 from numpy.distutils import system_info
 from F2x.distutils.strategy import get_strategy, base
-from F2x.parser.plyplus.source import SourceFile
-from F2x.template import package_dir as template_package_dir, get_template
+from F2x.parser.plyplus.source import SourceFile, load_grammar, get_cache_dir
+from F2x.template import package_dir as template_package_dir, get_template, log as template_log
+
+
+# Template environments are shared by all wrappers of a process so each template is only compiled once.
+_environments = {}
+_template_files = {}
+
+
+def get_environment(template_path, extensions, bytecode_cache_dir=None):
+    """
+    Get a shared Jinja2 environment for the given template search path.
+
+    :param template_path: List of directories to search for templates.
+    :param extensions: List of Jinja2 extensions to load.
+    :param bytecode_cache_dir: If set, compiled templates are stored in this directory and re-used by later runs.
+    :return: A (possibly cached) :py:class:`jinja2.Environment`. Templates can report messages through the global
+             :code:`log` (e.g., :code:`{% do log.warning(...) %}`).
+    """
+    key = (tuple(template_path), tuple(extensions), bytecode_cache_dir)
+
+    if key not in _environments:
+        bytecode_cache = None
+        if bytecode_cache_dir is not None:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(bytecode_cache_dir)
+
+        loader = jinja2.FileSystemLoader(list(template_path))
+        _environments[key] = jinja2.Environment(loader=loader, extensions=list(extensions),
+                                                bytecode_cache=bytecode_cache)
+        _environments[key].globals['log'] = template_log
+
+    return _environments[key]
+
+
+def load_template_file(env, filename):
+    """
+    Load a template from a file that is not necessarily in the search path of the environment.
+
+    Unlike :py:meth:`jinja2.Environment.from_string` this uses the bytecode cache of the environment. Loaded templates
+    are kept until the file changes.
+    """
+    filename = os.path.abspath(filename)
+    key = (id(env), filename)
+    template = _template_files.get(key)
+
+    if template is None or not template.is_up_to_date:
+        dirname, basename = os.path.split(filename)
+        template = jinja2.FileSystemLoader(dirname).load(env, basename, env.make_globals(None))
+        _template_files[key] = template
+
+    return template
+
+
+def uses_ast(env, filename):
+    """
+    Check whether a template or any template it imports or includes refers to the parse tree :code:`ast`.
+
+    The parse tree is not available when the generation tree is taken from the cache. Such templates require the
+    source to be parsed anyway.
+    """
+    with open(filename, 'r', encoding='utf-8') as template_file:
+        return _source_uses_ast(env, template_file.read(), set())
+
+
+def _source_uses_ast(env, source, seen):
+    parsed = env.parse(source)
+    if u'ast' in meta.find_undeclared_variables(parsed):
+        return True
+
+    for name in meta.find_referenced_templates(parsed):
+        if name is None or name in seen:
+            continue
+
+        seen.add(name)
+        try:
+            source, _, _ = env.loader.get_source(env, name)
+        except jinja2.TemplateNotFound:
+            continue
+
+        if _source_uses_ast(env, source, seen):
+            return True
+
+    return False
 
 
 class _PlatformInfo(object):
@@ -25,45 +111,105 @@ class F2xWrapper(object):
     def __init__(self, args, log):
         self.args = args
         self.log = log
+        self.failed = []
 
     def run(self):
+        jobs = min(getattr(self.args, 'jobs', 1) or 1, len(self.args.source))
+
+        if jobs > 1:
+            try:
+                pickle.dumps(self.args)
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                self.log.warning(f'wrapping sources sequentially as the arguments can not be passed to workers ({e})')
+                jobs = 1
+
+        if jobs > 1:
+            # Templates are only loaded by the workers.
+            _, template_files = self._templates_from_args()
+            self._init_progress(len(template_files))
+            self._run_parallel(jobs)
+            self.progress = self.total_progress
+
+        else:
+            templates = self._prepare()
+            cls = self._get_tree_class()
+            for input_file in self.args.source:
+                self._wrap_source(templates, cls, input_file)
+
+    def _prepare(self):
         strategy, template_files = self._templates_from_args()
         if strategy is None:
             strategy = base.BuildStrategy()
         template_sources = self._resolve_templates(template_files)
         templates = self._load_templates(template_sources)
+        self._init_progress(len(templates))
+
+        return templates
 
+    def _init_progress(self, template_count):
         self.progress = 0
-        self.total_progress = (len(templates) + 4) * len(self.args.source)
-        if self.args.tree_class is not None:
-            mod_name, cls_name = self.args.tree_class.split(':')
-            if '.' in mod_name:
-                pkg_name, _ = mod_name.rsplit('.', 1)
-                mod = import_module(mod_name, pkg_name)
+        self.steps_per_source = template_count + 4
+        self.total_progress = self.steps_per_source * len(self.args.source)
+
+    def _run_parallel(self, jobs):
+        self.log.debug(f'wrapping {len(self.args.source)} sources using {jobs} processes')
+
+        level = logging.getLogger('F2x').getEffectiveLevel()
+        init_records = []
+        with multiprocessing.Pool(jobs, initializer=_init_worker, initargs=(self.args, level)) as pool:
+            # imap keeps the order of the sources so the log output is the same as for a sequential run.
+            for worker_init_records, records, failed, error in pool.imap(_wrap_in_worker,
+                                                                         enumerate(self.args.source)):
+                # All workers are prepared the same way, so their messages are only emitted once.
+                if worker_init_records not in init_records:
+                    init_records.append(worker_init_records)
+                    self._replay(worker_init_records)
+
+                self.progress += self.steps_per_source
+                self.failed += failed
+                self._replay(records)
+                if error is not None:
+                    raise error
+
+    def _replay(self, records):
+        for name, level, msg in records:
+            if name is None:
+                _log_method(self.log, level)(msg)
             else:
-                mod = import_module(mod_name)
-            cls = getattr(mod, cls_name)
+                logging.getLogger(name).log(level, msg)
+
+    def _get_tree_class(self):
+        if self.args.tree_class is None:
+            return None
+
+        mod_name, cls_name = self.args.tree_class.split(':')
+        if '.' in mod_name:
+            pkg_name, _ = mod_name.rsplit('.', 1)
+            mod = import_module(mod_name, pkg_name)
         else:
-            cls = None
+            mod = import_module(mod_name)
+        return getattr(mod, cls_name)
 
-        for input_file in self.args.source:
-            self.progress += 1
-            self.log.info(f'{self._current_progress} reading {input_file}')
+    def _wrap_source(self, templates, cls, input_file):
+        self.progress += 1
+        self.log.info(f'{self._current_progress} reading {input_file}')
 
-            src = self._load_src(input_file)
-            if src is None:
-                self.progress += 3
-                continue
-            self.progress += 2
+        need_ast = any(getattr(template, 'uses_ast', False) for template, _ in templates)
+        src = self._load_src(input_file, cls, need_ast)
+        if src is None:
+            self.failed.append(input_file)
+            self.progress += 3
+            return
+        self.progress += 2
 
-            module = src.get_gtree(cls)
-            self.progress += 1
+        module = src.get_gtree(cls)
+        self.progress += 1
 
-            if not src.config.has_option('generate', 'dll'):
-                lib_name = self.args.library_name or module["name"].lower()
-                src.config.set('generate', 'dll', f'lib{lib_name}{system_info.so_ext}')
+        if not src.config.has_option('generate', 'dll'):
+            lib_name = self.args.library_name or module["name"].lower()
+            src.config.set('generate', 'dll', f'lib{lib_name}{system_info.so_ext}')
 
-            self._generate_from_templates(templates, src, module)
+        self._generate_from_templates(templates, src, module)
 
     @property
     def _current_progress(self):
@@ -87,12 +233,14 @@ class F2xWrapper(object):
             with open(output_filename, 'wb') as output_file:
                 output_file.write(output.encode(self.args.encoding))
 
-    def _load_src(self, input_file):
+    def _load_src(self, input_file, cls=None, need_ast=False):
         src = SourceFile(input_file, self.args)
         try:
             src.read()
             src.preprocess()
-            src.parse()
+            # A cached tree replaces parsing unless a rebuild is forced or a template needs the parse tree as well.
+            if getattr(self.args, 'force', False) or src.load_cached_gtree(cls) is None or need_ast:
+                src.parse()
         except plyplus.ParseError as e:
             self.log.error(f'error reading source file {e}')
             return None
@@ -110,25 +258,34 @@ class F2xWrapper(object):
                 extensions += mod.extensions
                 path.append(mod.package_dir)
 
-            loader = jinja2.FileSystemLoader(path)
-            env = jinja2.Environment(loader=loader, extensions=extensions)
+            env = get_environment(path, extensions, self._get_bytecode_cache_dir())
 
             template = None
             if name[0] != '@':
                 try:
-                    template = loader.load(env, filename)
+                    template = env.get_template(filename)
                 except IOError as e:
                     self.log.info(f'error reading template {filename} from environment ({e})')
 
             if template is None:
-                with open(filename, 'r') as template_file:
-                    template = env.from_string(template_file.read())
-                    template.name = name
-                    template.filename = filename
+                template = load_template_file(env, filename)
+                template.name = name
+
+            if not hasattr(template, 'uses_ast'):
+                template.uses_ast = template.filename is not None and uses_ast(env, template.filename)
 
             templates.append((template, suffix))
 
         return templates
+
+    def _get_bytecode_cache_dir(self):
+        bytecode_cache_dir = getattr(self.args, 'bytecode_cache', None)
+        if bytecode_cache_dir is None:
+            cache_dir = get_cache_dir()
+            if cache_dir is not None:
+                bytecode_cache_dir = os.path.join(cache_dir, 'jinja')
+
+        return bytecode_cache_dir or None
     
     def _resolve_templates(self, template_files):
         template_sources = []
@@ -169,4 +326,93 @@ class F2xWrapper(object):
                     dirname, basename = os.path.split(filename)
                     templates.append((basename, filename, [dirname]))
 
-        return strategy, templates
\ No newline at end of file
+        return strategy, templates
+
+
+_LOG_METHODS = {
+    logging.DEBUG: ('debug', ),
+    logging.INFO: ('info', ),
+    logging.WARNING: ('warning', 'warn'),
+    logging.ERROR: ('error', ),
+    logging.CRITICAL: ('critical', 'fatal'),
+}
+
+
+def _log_method(log, level):
+    """ Get the method of *log* for *level*. This supports :py:class:`logging.Logger` and :py:mod:`distutils.log`. """
+    for name in _LOG_METHODS.get(level, ('info', )):
+        method = getattr(log, name, None)
+        if method is not None:
+            return method
+
+    return log.info
+
+
+class _BufferedLog(logging.Logger):
+    """
+    Collects log messages of a worker process so that the parent can emit them in order.
+
+    Messages of the module loggers (like the parser's) are collected as well, see :py:class:`_BufferHandler`. Records
+    are stored as :code:`(name, level, message)`, name is :code:`None` for messages of the wrapper itself.
+    """
+
+    _formatter = logging.Formatter('%(message)s')
+
+    def __init__(self):
+        super(_BufferedLog, self).__init__(__name__, logging.DEBUG)
+        self.records = []
+
+    def handle(self, record):
+        self.records.append((None, record.levelno, self._formatter.format(record)))
+
+
+class _BufferHandler(logging.Handler):
+    """ Collects the messages of the F2x module loggers in the records of a :py:class:`_BufferedLog`. """
+
+    def __init__(self, log):
+        super(_BufferHandler, self).__init__()
+        self.log = log
+        self.setFormatter(log._formatter)
+
+    def emit(self, record):
+        self.log.records.append((record.name, record.levelno, self.format(record)))
+
+
+_worker = None
+
+
+def _init_worker(args, level):
+    """ Prepare a worker process: Load templates and preload the grammar once. """
+    global _worker
+
+    _worker = F2xWrapper(args, _BufferedLog())
+
+    package_log = logging.getLogger('F2x')
+    package_log.handlers = [_BufferHandler(_worker.log)]
+    package_log.propagate = False
+    package_log.setLevel(level)
+
+    _worker.templates = _worker._prepare()
+    _worker.tree_class = _worker._get_tree_class()
+    load_grammar(args.grammar)
+
+    _worker.init_records, _worker.log.records = _worker.log.records, []
+
+
+def _wrap_in_worker(indexed_source):
+    """
+    Wrap a source in a worker process. Returns the log records of preparing the worker, the log records collected while
+    wrapping, the sources that could not be read, and the error raised (if any).
+    """
+    index, input_file = indexed_source
+
+    _worker.progress = index * _worker.steps_per_source
+    error = None
+    try:
+        _worker._wrap_source(_worker.templates, _worker.tree_class, input_file)
+    except Exception as e:
+        error = e
+
+    records, _worker.log.records = _worker.log.records, []
+    failed, _worker.failed = _worker.failed, []
+    return _worker.init_records, records, failed, error
@@ -95,6 +95,7 @@ def register_template(template):
                        other way. Otherwise use a tuple with the library name and a library spec dict like
                        used for numpy.
         - A docstring.
+    - Optionally, `include_dirs` can list additional include directories for compiling the generated sources.
     - The following attributes are added:
         - `package_dir`: The directory of the template package.
         - `template_files`: A list with full pathes of all template files to be rendered.
@@ -15,6 +15,9 @@
 # limitations under the License.
 """
 Generate a ISO C compliant interface to a Fortran module using BIND(C).
+
+For derived types with scalar number or logical fields, a BIND(C) mirror type :code:`<type>_PACKED` and the routines
+:code:`<type>_pack` and :code:`<type>_unpack` are generated. They copy these fields of many instances at once.
 """
 name = 'bindc'
 templates = ['@bindc/_glue.f90.t']
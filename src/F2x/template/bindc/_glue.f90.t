@@ -35,6 +35,12 @@ MODULE {{ module.name }}_WRAP
     IMPLICIT NONE
 
     INTEGER, PARAMETER :: LF = 8
+{%- for type in module.types %}
+    {%- if type.public and type.packed %}
+
+    {{ types.packed_type(type) }}
+    {%- endif %}
+{%- endfor %}
 
 CONTAINS
 {%- for type in module.types  %}
@@ -0,0 +1,30 @@
+# -*- encoding: utf-8 -*-
+#
+# Copyright 2018 German Aerospace Center (DLR)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Generates precompiled Python C API stubs for methods that only take and return scalar numbers or logicals. The stubs
+call the ISO C interface generated by 'bindc' directly and use the error handling of 'cerr'. They are compiled into the
+wrapper library and replace the corresponding methods of the 'ctypes' template when the library is loaded, i.e., on
+the first call of a wrapped method (importing the Python module does not load the library). Methods that were imported
+from the module before keep using ctypes. All other methods keep using ctypes.
+
+Unlike ctypes, the stubs do not release the GIL during the call. They are meant for short calls where the call overhead
+dominates. The :code:`batch` methods are still called through ctypes and can run in parallel threads.
+"""
+name = 'capi'
+templates = ['@capi/_capi.c.t']
+requires = ['ctypes']
+modules = None
+libraries = None
@@ -0,0 +1,275 @@
+{#-##################################################################################################################-#}
+{#- F2x 'capi' main template.                                                                                        -#}
+{#-                                                                                                                  -#}
+{#- This template generates Python C API stubs that call scalar `FUNCTION`s and `SUBROUTINE`s exported by the        -#}
+{#- 'bindc' template without going through ctypes.                                                                   -#}
+{#-                                                                                                                  -#}
+{#- Copyright 2018 German Aerospace Center (DLR)                                                                     -#}
+{#-                                                                                                                  -#}
+{#- Licensed under the Apache License, Version 2.0 (the "License");                                                  -#}
+{#- you may not use this file except in compliance with the License.                                                 -#}
+{#- You may obtain a copy of the License at                                                                          -#}
+{#-                                                                                                                  -#}
+{#-     http://www.apache.org/licenses/LICENSE-2.0                                                                   -#}
+{#-                                                                                                                  -#}
+{#- Unless required by applicable law or agreed to in writing, software                                              -#}
+{#- distributed under the License is distributed on an "AS IS" BASIS,                                                -#}
+{#- WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.                                         -#}
+{#- See the License for the specific language governing permissions and                                              -#}
+{#- limitations under the License.                                                                                   -#}
+{#-##################################################################################################################-#}
+{%- set C_TYPES = {
+    'INTEGER': {None: 'int32_t', 1: 'int8_t', 2: 'int16_t', 4: 'int32_t', 8: 'int64_t'},
+    'LOGICAL': {None: 'int32_t', 1: 'int8_t', 2: 'int16_t', 4: 'int32_t', 8: 'int64_t'},
+    'REAL': {None: 'float', 4: 'float', 8: 'double'},
+} -%}
+
+
+{#- Get the C type of a scalar variable.
+#}
+{%- macro c_type(var) -%}
+    {{ C_TYPES[var.type|upper][var.get('kind')] }}
+{%- endmacro %}
+
+
+{#- Convert a Python object into the C variable `{{ var.name }}_INTERN`. Returns NULL from the stub on failure.
+#}
+{%- macro cast_arg(var, obj) -%}
+    {%- if var.type|upper == 'REAL' %}
+    {{ var.name }}_VALUE = PyFloat_AsDouble({{ obj }});
+    if ({{ var.name }}_VALUE == -1.0 && PyErr_Occurred()) {
+        return NULL;
+    }
+    {%- elif var.type|upper == 'LOGICAL' %}
+    {{ var.name }}_VALUE = PyObject_IsTrue({{ obj }});
+    if ({{ var.name }}_VALUE < 0) {
+        return NULL;
+    }
+    {%- else %}
+    {{ var.name }}_VALUE = PyLong_AsLongLong({{ obj }});
+    if ({{ var.name }}_VALUE == -1 && PyErr_Occurred()) {
+        return NULL;
+    }
+    {%- endif %}
+    {{ var.name }}_INTERN = ({{ c_type(var) }}) {{ var.name }}_VALUE;
+{%- endmacro %}
+
+
+{#- Convert the C variable `{{ name }}` back into a new Python object.
+#}
+{%- macro uncast_arg(var, name) -%}
+    {%- if var.type|upper == 'REAL' -%}
+        PyFloat_FromDouble((double) {{ name }})
+    {%- elif var.type|upper == 'LOGICAL' -%}
+        PyBool_FromLong({{ name }} != 0)
+    {%- else -%}
+        PyLong_FromLongLong((long long) {{ name }})
+    {%- endif -%}
+{%- endmacro %}
+
+
+{#- Generate a stub for a method.
+
+   The stub accepts the same arguments as the 'ctypes' wrapper (positional or by keyword), calls the `BIND(C)` routine
+   in a `setjmp` context and returns the function result and all output arguments.
+
+   :param method: The :type SubDef: or :type FuncDef: node of the exported method.
+#}
+{%- macro export_method(method) -%}
+    {%- set inargs = method.args|rejectattr('intent', 'equalto', 'OUT')|list -%}
+    {%- set outargs = method.args|rejectattr('intent', 'equalto', 'IN')|list -%}
+    {%- set retcount = (1 if method.ret else 0) + outargs|length -%}
+/* Prototype for BIND(C) routine {{ method.name }} */
+{% if method.ret %}{{ c_type(method.ret) }}{% else %}void{% endif %} {{ method.export_name }}(
+    {%- for arg in method.args -%}
+        {{ c_type(arg) }} *{% if not loop.last %}, {% endif %}
+    {%- endfor -%}
+);
+
+static const char *const f2x_capi_{{ method.export_name }}_names[] = {
+    {%- for arg in inargs %}"{{ arg.name }}", {% endfor %}NULL};
+
+static PyObject *f2x_capi_{{ method.export_name }}(PyObject *self, PyObject *const *args, Py_ssize_t nargs, PyObject *kwnames) {
+    {%- if inargs %}
+    PyObject *slots[{{ inargs|length }}];
+    {%- endif %}
+    {%- for arg in method.args %}
+    {{ c_type(arg) }} {{ arg.name }}_INTERN = 0;
+        {%- if arg in inargs %}
+    {% if arg.type|upper == 'REAL' %}double{% elif arg.type|upper == 'LOGICAL' %}int{% else %}long long{% endif %} {{ arg.name }}_VALUE;
+        {%- endif %}
+    {%- endfor %}
+    {%- if method.ret %}
+    {{ c_type(method.ret) }} {{ method.ret.name }} = 0;
+    {%- endif %}
+    {%- if retcount > 1 %}
+    PyObject *result;
+    {%- endif %}
+    jmp_buf *_jmp_buf;
+
+    if (f2x_capi_collect_args("{{ method.name }}", args, nargs, kwnames, f2x_capi_{{ method.export_name }}_names,
+                              {{ inargs|length }}, {% if inargs %}slots{% else %}NULL{% endif %}) < 0) {
+        return NULL;
+    }
+    {%- for arg in inargs %}
+    {{ cast_arg(arg, 'slots[%d]' % loop.index0) }}
+    {%- endfor %}
+
+    _jmp_buf = f2x_prepare_jmp_buffer();
+    if (_jmp_buf == 0) {
+        return f2x_capi_error("{{ method.name }}");
+    }
+
+    if (setjmp(*_jmp_buf) == 0) {
+        f2x_err_reset();
+        {% if method.ret %}{{ method.ret.name }} = {% endif %}{{ method.export_name }}(
+        {%- for arg in method.args -%}
+            &{{ arg.name }}_INTERN{% if not loop.last %}, {% endif %}
+        {%- endfor -%}
+        );
+    }
+
+    f2x_clear_jmp_buffer();
+    if (f2x_err_get() != 0) {
+        return f2x_capi_error("{{ method.name }}");
+    }
+    {%- if retcount == 0 %}
+
+    Py_RETURN_NONE;
+    {%- elif retcount == 1 %}
+
+    return {% if method.ret %}{{ uncast_arg(method.ret, method.ret.name) }}{% else %}{{ uncast_arg(outargs[0], outargs[0].name + '_INTERN') }}{% endif %};
+    {%- else %}
+
+    result = PyTuple_New({{ retcount }});
+    if (result == NULL) {
+        return NULL;
+    }
+        {%- set offset = 1 if method.ret else 0 %}
+        {%- if method.ret %}
+    PyTuple_SET_ITEM(result, 0, {{ uncast_arg(method.ret, method.ret.name) }});
+        {%- endif %}
+        {%- for arg in outargs %}
+    PyTuple_SET_ITEM(result, {{ loop.index0 + offset }}, {{ uncast_arg(arg, arg.name + '_INTERN') }});
+        {%- endfor %}
+    if (PyErr_Occurred()) {
+        Py_DECREF(result);
+        return NULL;
+    }
+
+    return result;
+    {%- endif %}
+}
+{%- endmacro %}
+
+
+{#- Select methods that only use scalars of known C type. -#}
+{%- set stub_methods = [] -%}
+{%- for method in module.methods -%}
+    {%- set unsupported = [] -%}
+    {%- for var in method.args + ([method.ret] if method.ret else []) -%}
+        {%- if var.dims or var.strlen or var.ftype or var.type|upper not in C_TYPES
+               or var.get('kind') not in C_TYPES[var.type|upper] -%}
+            {%- do unsupported.append(var) -%}
+        {%- endif -%}
+    {%- endfor -%}
+    {%- if method.ret and method.ret.getter != 'function' -%}
+        {%- do unsupported.append(method.ret) -%}
+    {%- endif -%}
+    {%- if not unsupported -%}
+        {%- do stub_methods.append(method) -%}
+    {%- endif -%}
+{%- endfor -%}
+/* This file was generated by the F2x 'capi' template. Please do not modify directly. */
+{%- if stub_methods %}
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <setjmp.h>
+#include <stdint.h>
+
+void f2x_err_reset();
+jmp_buf *f2x_prepare_jmp_buffer();
+void f2x_clear_jmp_buffer();
+int f2x_err_get();
+
+static PyObject *f2x_capi_error_type = NULL;
+static PyObject *f2x_capi_module = NULL;
+
+
+/* Raise the F2x error type for the current error code. */
+static PyObject *f2x_capi_error(const char *name) {
+    PyObject *error_args = Py_BuildValue("(si)", name, f2x_err_get());
+
+    if (error_args != NULL) {
+        PyErr_SetObject(f2x_capi_error_type, error_args);
+        Py_DECREF(error_args);
+    }
+
+    return NULL;
+}
+
+
+/* Sort positional and keyword arguments into slots. */
+static int f2x_capi_collect_args(const char *name, PyObject *const *args, Py_ssize_t nargs, PyObject *kwnames,
+                                 const char *const *names, Py_ssize_t count, PyObject **slots) {
+    Py_ssize_t nkwargs = kwnames == NULL ? 0 : PyTuple_GET_SIZE(kwnames);
+    Py_ssize_t index, kwindex;
+
+    if (nargs + nkwargs != count) {
+        PyErr_Format(PyExc_TypeError, "%s() takes %zd arguments (%zd given)", name, count, nargs + nkwargs);
+        return -1;
+    }
+
+    for (index = 0; index < count; index++) {
+        slots[index] = index < nargs ? args[index] : NULL;
+    }
+
+    for (kwindex = 0; kwindex < nkwargs; kwindex++) {
+        PyObject *key = PyTuple_GET_ITEM(kwnames, kwindex);
+
+        for (index = nargs; index < count; index++) {
+            if (slots[index] == NULL && PyUnicode_CompareWithASCIIString(key, names[index]) == 0) {
+                slots[index] = args[nargs + kwindex];
+                break;
+            }
+        }
+
+        if (index == count) {
+            PyErr_Format(PyExc_TypeError, "%s() got an unexpected keyword argument '%U'", name, key);
+            return -1;
+        }
+    }
+
+    return 0;
+}
+{%- for method in stub_methods %}
+
+
+{{ export_method(method) }}
+{%- endfor %}
+
+
+static PyMethodDef f2x_capi_methods[] = {
+    {%- for method in stub_methods %}
+    {"{{ method.name }}", (PyCFunction) (void (*)(void)) f2x_capi_{{ method.export_name }}, METH_FASTCALL | METH_KEYWORDS, NULL},
+    {%- endfor %}
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef f2x_capi_moduledef = {
+    PyModuleDef_HEAD_INIT, "{{ context.basename }}_capi", NULL, -1, f2x_capi_methods
+};
+
+
+/* Create the stub module. The library keeps a reference to the module, the result is a new reference. */
+PyObject *f2x_capi_{{ module.name }}(PyObject *error_type) {
+    if (f2x_capi_module == NULL) {
+        Py_INCREF(error_type);
+        f2x_capi_error_type = error_type;
+        f2x_capi_module = PyModule_Create(&f2x_capi_moduledef);
+    }
+
+    Py_XINCREF(f2x_capi_module);
+    return f2x_capi_module;
+}
+{% endif %}
@@ -15,6 +15,12 @@
 # limitations under the License.
 """
 Generates a thin C layer that is used as clean stack snapshot for longjmp error handling.
+
+With :code:`error_codes = yes` in the :code:`[generate]` section of the configuration, the wrappers return the error
+code directly, so no additional call to :code:`f2x_err_get()` is required. The list of methods that might raise an
+error can be given as :code:`fails = name, ...`, all other methods are called without preparing a :code:`setjmp`
+context. If one of them raises an error anyway, only a warning is printed and the FORTRAN code continues. Both options
+need to be supported by the wrapping template (like 'ctypes').
 """
 name = 'cerr'
 templates = ['@cerr/_cerr.c.t']
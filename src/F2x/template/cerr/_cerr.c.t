@@ -3,6 +3,9 @@
 {#-                                                                                                                  -#}
 {#- This template generates a small C wrapper to allow longjmp-based error handling.                                 -#}
 {#-                                                                                                                  -#}
+{#- If the option `error_codes` is set in the `generate` section of the configuration, the wrappers return the error  -#}
+{#- code instead. The `setjmp` context is then only prepared for methods listed in the `fails` option.                -#}
+{#-                                                                                                                  -#}
 {#- Copyright 2018 German Aerospace Center (DLR)                                                                     -#}
 {#-                                                                                                                  -#}
 {#- Licensed under the Apache License, Version 2.0 (the "License");                                                  -#}
@@ -124,6 +127,26 @@ void {{ method.export_name }}_cerr(
 {%- endmacro %}
 
 
+{%- macro export_batch(method) -%}
+/* Prototype for BIND(C) routine {{ method.name }} (batch) */
+void {{ method.export_name }}_batch(void *, {% for arg in method.args %}void *, {% endfor %}void *);
+void {{ method.export_name }}_batch_cerr(void *count, {% for arg in method.args %}void *arg{{ loop.index0 }}, {% endfor %}void *out) {
+    jmp_buf *_jmp_buf = f2x_prepare_jmp_buffer();
+
+    if (_jmp_buf == 0) {
+        return;
+    }
+
+    if (setjmp(*_jmp_buf) == 0) {
+        f2x_err_reset();
+        {{ method.export_name }}_batch(count, {% for arg in method.args %}arg{{ loop.index0 }}, {% endfor %}out);
+    }
+
+    f2x_clear_jmp_buffer();
+}
+{%- endmacro %}
+
+
 {% macro export_subroutine(method) -%}
 /* Prototype for BIND(C) routine {{ method.name }} */
 void {{ method.export_name }}(
@@ -166,10 +189,144 @@ void {{ method.export_name }}_cerr(
 {%- endmacro %}
 
 
-{%- if module.methods %}
+{#- C types of scalar `FUNCTION` results as returned by 'bindc' and as passed to the ctypes wrapper. -#}
+{%- set C_TYPES = {
+    'INTEGER': {None: 'int32_t', 1: 'int8_t', 2: 'int16_t', 4: 'int32_t', 8: 'int64_t'},
+    'LOGICAL': {None: 'int32_t', 1: 'int8_t', 2: 'int16_t', 4: 'int32_t', 8: 'int64_t'},
+    'REAL': {None: 'float', 4: 'float', 8: 'double'},
+} -%}
+{%- set PY_C_TYPES = {
+    'ctypes.c_int': 'int',
+    'ctypes.c_bool': '_Bool',
+    'ctypes.c_double': 'double',
+    'ctypes.c_void_p': 'void *',
+} -%}
+
+
+{#- Export a method that returns the error code.
+
+   Only methods that were marked as failing (see `fails` option) prepare a `setjmp` context and return the error code.
+   Their `FUNCTION` result is stored in an additional output argument (unless it already uses one). All other methods
+   call the `BIND(C)` routine directly and return its result.
+
+   :param method: The :type SubDef: or :type FuncDef: node of the exported method.
+#}
+{%- macro export_code(method) -%}
+    {%- set out = method.ret and (method.ret.dims or method.ret.strlen) -%}
+    {%- set ret = method.ret and not out -%}
+    {%- set ret_type = ('void *' if method.ret.ftype else C_TYPES[method.ret.type|upper][method.ret.get('kind')]) if ret else 'void' -%}
+    {%- set store_type = PY_C_TYPES[method.ret.pytype] if ret else 'void' -%}
+/* Prototype for BIND(C) routine {{ method.name }} */
+{{ ret_type }} {{ method.export_name }}(
+    {%- for arg in method.args -%}
+        {%- if 0 in arg.dims %}void *, {% endif -%}
+        {%- if arg.strlen in ('*', ':') %}void *, {% endif -%}
+        void *{% if not loop.last or out %}, {% endif -%}
+    {%- endfor -%}
+    {%- if out -%}
+        {%- if 0 in method.ret.dims %}void *, {% endif -%}
+        {%- if method.ret.strlen in ('*', ':') %}void *, {% endif -%}
+        void *
+    {%- endif -%}
+);
+{% if method.fails %}int{% else %}{{ store_type }}{% endif %} {{ method.export_name }}_cerr(
+    {%- for arg in method.args -%}
+        {%- if 0 in arg.dims %}void *arg{{ loop.index0 }}_size, {% endif -%}
+        {%- if arg.strlen in ('*', ':') %}void *arg{{ loop.index0 }}_length, {% endif -%}
+        void *arg{{ loop.index0 }}{% if not loop.last or out or (ret and method.fails) %}, {% endif -%}
+    {%- endfor -%}
+    {%- if out -%}
+        {%- if 0 in method.ret.dims %}void *out_size, {% endif -%}
+        {%- if method.ret.strlen in ('*', ':') %}void *out_length, {% endif -%}
+        void *out
+    {%- elif ret and method.fails -%}
+        void *out
+    {%- endif -%}
+) {
+    {%- set call -%}
+        {{ method.export_name }}(
+        {%- for arg in method.args -%}
+            {%- if 0 in arg.dims %}arg{{ loop.index0 }}_size, {% endif -%}
+            {%- if arg.strlen in ('*', ':') %}arg{{ loop.index0 }}_length, {% endif -%}
+            arg{{ loop.index0 }}{% if not loop.last or out %}, {% endif -%}
+        {%- endfor -%}
+        {%- if out -%}
+            {%- if 0 in method.ret.dims %}out_size, {% endif -%}
+            {%- if method.ret.strlen in ('*', ':') %}out_length, {% endif -%}
+            out
+        {%- endif -%}
+        )
+    {%- endset %}
+    {%- if method.fails %}
+    jmp_buf *_jmp_buf = f2x_prepare_jmp_buffer();
+
+    if (_jmp_buf == 0) {
+        return f2x_err_get();
+    }
+
+    if (setjmp(*_jmp_buf) == 0) {
+        f2x_err_reset();
+        {% if ret %}*({{ store_type }} *) out = ({{ store_type }}) {% endif %}{{ call }};
+    }
+
+    f2x_clear_jmp_buffer();
+    return f2x_err_get();
+    {%- elif ret %}
+    return ({{ store_type }}) {{ call }};
+    {%- else %}
+    {{ call }};
+    {%- endif %}
+}
+{%- endmacro %}
+
+
+{%- macro export_batch_code(method) -%}
+/* Prototype for BIND(C) routine {{ method.name }} (batch) */
+void {{ method.export_name }}_batch(void *, {% for arg in method.args %}void *, {% endfor %}void *);
+{% if method.fails %}int{% else %}void{% endif %} {{ method.export_name }}_batch_cerr(void *count, {% for arg in method.args %}void *arg{{ loop.index0 }}, {% endfor %}void *out) {
+    {%- if method.fails %}
+    jmp_buf *_jmp_buf = f2x_prepare_jmp_buffer();
+
+    if (_jmp_buf == 0) {
+        return f2x_err_get();
+    }
+
+    if (setjmp(*_jmp_buf) == 0) {
+        f2x_err_reset();
+        {{ method.export_name }}_batch(count, {% for arg in method.args %}arg{{ loop.index0 }}, {% endfor %}out);
+    }
+
+    f2x_clear_jmp_buffer();
+    return f2x_err_get();
+    {%- else %}
+    {{ method.export_name }}_batch(count, {% for arg in method.args %}arg{{ loop.index0 }}, {% endfor %}out);
+    {%- endif %}
+}
+{%- endmacro %}
+
+
+{%- if config.has_option("generate", "error_codes") and config.getboolean("generate", "error_codes") %}
+#include <stdint.h>
+
+int f2x_err_get();
+    {%- for method in module.methods %}
+
+
+{{ export_code(method) }}
+        {%- if method.batch %}
+
+
+{{ export_batch_code(method) }}
+        {%- endif %}
+    {%- endfor %}
+{% elif module.methods %}
     {%- for method in module.methods %}
         {% if method.ret -%}
             {{ export_function(method) }}
+            {%- if method.batch %}
+
+{{ export_batch(method) }}
+            {%- endif %}
         {%- else -%}
             {{ export_subroutine(method) }}
         {%- endif %}
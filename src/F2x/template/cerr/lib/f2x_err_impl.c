@@ -18,9 +18,18 @@
 #include <setjmp.h>
 #include <stdbool.h>
 
-static jmp_buf f2x_err_jmp_buf;
-static bool f2x_err_active = false;
-static int f2x_err_code;
+/* The error context is kept per thread, so calls from different threads do not interfere. */
+#if defined(_MSC_VER)
+#define F2X_THREAD_LOCAL __declspec(thread)
+#elif defined(__STDC_VERSION__) && __STDC_VERSION__ >= 201112L
+#define F2X_THREAD_LOCAL _Thread_local
+#else
+#define F2X_THREAD_LOCAL __thread
+#endif
+
+static F2X_THREAD_LOCAL jmp_buf f2x_err_jmp_buf;
+static F2X_THREAD_LOCAL bool f2x_err_active = false;
+static F2X_THREAD_LOCAL int f2x_err_code;
 
 /* Return address of f2x_err_jmp_buf if not already in use. */
 jmp_buf *f2x_prepare_jmp_buffer() {
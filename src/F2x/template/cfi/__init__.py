@@ -0,0 +1,46 @@
+# -*- encoding: utf-8 -*-
+#
+# Copyright 2018 German Aerospace Center (DLR)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Generates an interface that passes arrays as Fortran 2018 C descriptors (:code:`CFI_cdesc_t` from
+:code:`ISO_Fortran_binding.h`). The generated Python module (:code:`<source>_cfi.py`) passes NumPy arrays with their
+actual strides, so sliced or C-ordered arrays are not copied before the call.
+
+Only methods that take at least one array are exported. All arguments need to be INTEGER or REAL numbers or arrays of
+those. INTENT(OUT) arrays are passed by the caller like INTENT(INOUT) arrays and returned after the call. Functions may
+only return a scalar. Methods with other arguments (like ALLOCATABLE or POINTER arrays) are skipped with a warning
+that names the unsupported arguments, so the wrapper of 'ctypes' (if used as well) stays in place. If the wrapped
+routine declares an explicit-shape array, the Fortran compiler may still copy non-contiguous arrays.
+
+The template brings along the error handling library of 'cerr' and the glue module of 'ctypes', so it can be used
+alone or together with 'bindc', 'cerr' and 'ctypes'. The compiler needs to support :code:`ISO_Fortran_binding`.
+"""
+import os
+
+from F2x.template import cerr
+
+name = 'cfi'
+templates = ['@cfi/_cfi.f90.t', '@cfi/_cfi_cerr.c.t', '@cfi/_cfi.py.t']
+requires = None
+modules = ['../ctypes/lib/glue.py']
+libraries = [
+    # The error handling library is declared by 'cerr', its sources are relative to that template.
+    (lib_name, dict(lib_info, sources=[os.path.join('..', 'cerr', source) for source in lib_info['sources']]))
+    for lib_name, lib_info in cerr.libraries
+] + [
+    ('f2x_cfi', {
+         'sources': ['lib/f2x_cfi.c'],
+     }),
+]
@@ -0,0 +1,55 @@
+{#-##################################################################################################################-#}
+{#- F2x 'cfi' FORTRAN template.                                                                                      -#}
+{#-                                                                                                                  -#}
+{#- This template generates BIND(C) routines that accept arrays as C descriptors (assumed-shape dummy arguments)     -#}
+{#- and call the original routines.                                                                                  -#}
+{#-                                                                                                                  -#}
+{#- Copyright 2018 German Aerospace Center (DLR)                                                                     -#}
+{#-                                                                                                                  -#}
+{#- Licensed under the Apache License, Version 2.0 (the "License");                                                  -#}
+{#- you may not use this file except in compliance with the License.                                                 -#}
+{#- You may obtain a copy of the License at                                                                          -#}
+{#-                                                                                                                  -#}
+{#-     http://www.apache.org/licenses/LICENSE-2.0                                                                   -#}
+{#-                                                                                                                  -#}
+{#- Unless required by applicable law or agreed to in writing, software                                              -#}
+{#- distributed under the License is distributed on an "AS IS" BASIS,                                                -#}
+{#- WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.                                         -#}
+{#- See the License for the specific language governing permissions and                                              -#}
+{#- limitations under the License.                                                                                   -#}
+{#-##################################################################################################################-#}
+{%- import "cfi.tl" as cfi with context -%}
+
+! This module was generated by the F2x 'cfi' template. Please do not modify it directly.
+MODULE {{ module.name }}_CFI
+    USE, INTRINSIC :: ISO_C_BINDING
+    USE {{ module.name }}
+
+    IMPLICIT NONE
+
+CONTAINS
+{%- for method in cfi.methods %}
+
+    ! {% if method.ret %}FUNCTION{% else %}SUBROUTINE{% endif %} {{ method.name }}
+    SUBROUTINE {{ method.export_name|upper }}_CFI(
+    {%- for arg in method.args %}{{ arg.name }}{% if not loop.last %}, {% endif %}{% endfor %}
+    {%- if method.ret %}, {{ method.ret.name }}{% endif %}) BIND(C, name="{{ method.export_name }}_cfi")
+!DEC$ ATTRIBUTES DLLEXPORT :: {{ method.export_name }}_cfi
+    {%- for arg in method.args %}
+        {{ cfi.ftype(arg) }}, INTENT({{ arg.intent }}) :: {{ arg.name }}
+        {%- if arg.dims %}({% for dim in arg.dims %}:{% if not loop.last %}, {% endif %}{% endfor %}){% endif %}
+    {%- endfor %}
+    {%- if method.ret %}
+        {{ cfi.ftype(method.ret) }}, INTENT(OUT) :: {{ method.ret.name }}
+
+        {{ method.ret.name }} = {{ method.name }}(
+    {%- else %}
+
+        CALL {{ method.name }}(
+    {%- endif %}
+    {%- for arg in method.args %}{{ arg.name }}{% if not loop.last %}, {% endif %}{% endfor %})
+    END SUBROUTINE
+{%- endfor %}
+
+END MODULE
+
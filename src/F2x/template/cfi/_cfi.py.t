@@ -0,0 +1,88 @@
+{#-##################################################################################################################-#}
+{#- F2x 'cfi' Python template.                                                                                       -#}
+{#-                                                                                                                  -#}
+{#- This template generates a Python module that calls the routines of the 'cfi' C template using ctypes. Arrays     -#}
+{#- are passed as C descriptors.                                                                                     -#}
+{#-                                                                                                                  -#}
+{#- Copyright 2018 German Aerospace Center (DLR)                                                                     -#}
+{#-                                                                                                                  -#}
+{#- Licensed under the Apache License, Version 2.0 (the "License");                                                  -#}
+{#- you may not use this file except in compliance with the License.                                                 -#}
+{#- You may obtain a copy of the License at                                                                          -#}
+{#-                                                                                                                  -#}
+{#-     http://www.apache.org/licenses/LICENSE-2.0                                                                   -#}
+{#-                                                                                                                  -#}
+{#- Unless required by applicable law or agreed to in writing, software                                              -#}
+{#- distributed under the License is distributed on an "AS IS" BASIS,                                                -#}
+{#- WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.                                         -#}
+{#- See the License for the specific language governing permissions and                                              -#}
+{#- limitations under the License.                                                                                   -#}
+{#-##################################################################################################################-#}
+{%- import "cfi.tl" as cfi with context -%}
+
+# This module was generated by the F2x 'cfi' template. Please do not modify directly.
+import ctypes
+import os
+
+from {% if context.args.py_absolute_import %}F2x.template.ctypes{% endif %}.glue import Library, cfi_array, F2xError, F2xCopyError
+
+library_name = '{{ config.get('generate', 'dll') }}'
+library_path = os.path.join(os.path.dirname(__file__), library_name)
+library = Library(library_path)
+
+# Raise F2xCopyError instead of converting array arguments (None uses the default of the glue library).
+strict_arrays = {% if config.has_option("generate", "strict_arrays") %}{{ config.getboolean("generate", "strict_arrays") }}{% else %}None{% endif %}
+
+
+def check_error(name):
+    code = library.f2x_err_get()
+    if code != 0:
+        raise F2xError(name, code)
+
+
+library.prototype('f2x_err_get', ctypes.c_int, [])
+
+########################################################################################################################
+# Exported methods.
+{%- for method in cfi.methods %}
+    {%- set retargs = [] %}
+    {%- if method.ret %}{% do retargs.append(method.ret.name + '_INTERN.value') %}{% endif %}
+
+# {{ method.name }}
+library.prototype('{{ method.export_name }}_cfi_cerr', None, [
+    {%- for arg in method.args + ([method.ret] if method.ret else []) %}
+        {%- if arg.dims %}ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p
+        {%- else %}ctypes.c_void_p{% endif %}
+        {%- if not loop.last %}, {% endif %}
+    {%- endfor %}])
+
+
+def {{ method.name }}({% for arg in method.args if arg.dims or arg.intent != 'OUT' %}{{ arg.name }}{% if not loop.last %}, {% endif %}{% endfor %}):
+    {%- for arg in method.args %}
+        {%- if arg.dims %}
+    {{ arg.name }}_ARRAY = cfi_array({{ arg.name }}, {{ cfi.ctype(arg) }}, {{ arg.dims|length }}, "{{ method.name }}.{{ arg.name }}", strict_arrays)
+            {%- if arg.intent in ('INOUT', 'OUT') %}{% do retargs.append(arg.name + '_ARRAY') %}{% endif %}
+        {%- else %}
+    {{ arg.name }}_INTERN = {{ cfi.ctype(arg) }}({% if arg.intent != 'OUT' %}{{ arg.name }}{% endif %})
+            {%- if arg.intent != 'IN' %}{% do retargs.append(arg.name + '_INTERN.value') %}{% endif %}
+        {%- endif %}
+    {%- endfor %}
+    {%- if method.ret %}
+    {{ method.ret.name }}_INTERN = {{ cfi.ctype(method.ret) }}()
+    {%- endif %}
+    library.{{ method.export_name }}_cfi_cerr(
+    {%- for arg in method.args %}
+        {%- if arg.dims %}{{ arg.name }}_ARRAY.ctypes.data, {{ arg.name }}_ARRAY.ctypes.shape, {{ arg.name }}_ARRAY.ctypes.strides
+        {%- else %}ctypes.byref({{ arg.name }}_INTERN){% endif %}
+        {%- if not loop.last %}, {% endif %}
+    {%- endfor %}
+    {%- if method.ret %}, ctypes.byref({{ method.ret.name }}_INTERN){% endif %})
+    check_error({{ method.name }})
+    {%- if retargs %}
+    return {{ retargs|join(', ') }}
+    {%- endif %}
+{% endfor %}
+{%- for method, reasons in cfi.unsupported_methods %}
+    {%- do log.warning("'cfi' template skips " ~ method.name ~ " in " ~ context.filename ~ ", it does not support "
+                       ~ reasons|join(', ') ~ ".") %}
+{%- endfor %}
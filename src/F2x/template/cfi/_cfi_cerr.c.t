@@ -0,0 +1,74 @@
+{#-##################################################################################################################-#}
+{#- F2x 'cfi' C template.                                                                                            -#}
+{#-                                                                                                                  -#}
+{#- This template generates C wrappers that call the routines exported by the FORTRAN template of 'cfi' with the     -#}
+{#- error handling of 'cerr'.                                                                                        -#}
+{#-                                                                                                                  -#}
+{#- Copyright 2018 German Aerospace Center (DLR)                                                                     -#}
+{#-                                                                                                                  -#}
+{#- Licensed under the Apache License, Version 2.0 (the "License");                                                  -#}
+{#- you may not use this file except in compliance with the License.                                                 -#}
+{#- You may obtain a copy of the License at                                                                          -#}
+{#-                                                                                                                  -#}
+{#-     http://www.apache.org/licenses/LICENSE-2.0                                                                   -#}
+{#-                                                                                                                  -#}
+{#- Unless required by applicable law or agreed to in writing, software                                              -#}
+{#- distributed under the License is distributed on an "AS IS" BASIS,                                                -#}
+{#- WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.                                         -#}
+{#- See the License for the specific language governing permissions and                                              -#}
+{#- limitations under the License.                                                                                   -#}
+{#-##################################################################################################################-#}
+{%- import "cfi.tl" as cfi with context -%}
+
+/* This file was generated by the F2x 'cfi' template. Please do not modify directly. */
+#include <setjmp.h>
+#include <ISO_Fortran_binding.h>
+
+void f2x_err_reset();
+jmp_buf *f2x_prepare_jmp_buffer();
+void f2x_clear_jmp_buffer();
+void f2x_err_handle(int code);
+int f2x_cfi_establish(CFI_cdesc_t *desc, void *base_addr, char kind, size_t elem_len, int rank,
+                      const CFI_index_t *extents, const CFI_index_t *strides);
+{%- for method in cfi.methods %}
+    {%- set args = method.args + ([method.ret] if method.ret else []) %}
+
+
+/* Prototype for BIND(C) routine {{ method.name }} (CFI) */
+void {{ method.export_name }}_cfi({% for arg in args %}void *{% if not loop.last %}, {% endif %}{% endfor %});
+void {{ method.export_name }}_cfi_cerr(
+    {%- for arg in args -%}
+        void *arg{{ loop.index0 }}
+        {%- if arg.dims %}, CFI_index_t *arg{{ loop.index0 }}_shape, CFI_index_t *arg{{ loop.index0 }}_strides{% endif %}
+        {%- if not loop.last %}, {% endif %}
+    {%- endfor %}) {
+    {%- for arg in args %}{% if arg.dims %}
+    CFI_CDESC_T({{ arg.dims|length }}) arg{{ loop.index0 }}_desc;{% endif %}
+    {%- endfor %}
+    jmp_buf *_jmp_buf = f2x_prepare_jmp_buffer();
+    int status;
+
+    if (_jmp_buf == 0) {
+        return;
+    }
+
+    if (setjmp(*_jmp_buf) == 0) {
+        f2x_err_reset();
+    {%- for arg in args %}{% if arg.dims %}
+        status = f2x_cfi_establish((CFI_cdesc_t *) &arg{{ loop.index0 }}_desc, arg{{ loop.index0 }}, '{{ cfi.kind_char(arg) }}', {{ arg.kind or 4 }}, {{ arg.dims|length }},
+                                   arg{{ loop.index0 }}_shape, arg{{ loop.index0 }}_strides);
+        if (status != CFI_SUCCESS) {
+            f2x_err_handle(status);
+        }{% endif %}
+    {%- endfor %}
+        {{ method.export_name }}_cfi(
+        {%- for arg in args -%}
+            {%- if arg.dims %}&arg{{ loop.index0 }}_desc{% else %}arg{{ loop.index0 }}{% endif %}
+            {%- if not loop.last %}, {% endif %}
+        {%- endfor %});
+    }
+
+    f2x_clear_jmp_buffer();
+}
+{%- endfor %}
+
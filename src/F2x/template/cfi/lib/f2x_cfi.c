@@ -0,0 +1,51 @@
+/* This is a small helper library to create Fortran 2018 C descriptors for NumPy arrays.
+
+   Copyright 2018 German Aerospace Center (DLR)
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+*/
+#include <stddef.h>
+#include <ISO_Fortran_binding.h>
+
+/* Initialize a descriptor for an array with given extents and strides (in bytes). The element type is given by the
+   NumPy kind ('i' or 'f') and size of the elements. */
+int f2x_cfi_establish(CFI_cdesc_t *desc, void *base_addr, char kind, size_t elem_len, int rank,
+                      const CFI_index_t *extents, const CFI_index_t *strides) {
+    CFI_type_t type = CFI_type_other;
+    int status, dim;
+
+    if (kind == 'i') {
+        switch (elem_len) {
+            case 1: type = CFI_type_int8_t; break;
+            case 2: type = CFI_type_int16_t; break;
+            case 4: type = CFI_type_int32_t; break;
+            case 8: type = CFI_type_int64_t; break;
+        }
+    } else if (kind == 'f') {
+        switch (elem_len) {
+            case 4: type = CFI_type_float; break;
+            case 8: type = CFI_type_double; break;
+        }
+    }
+
+    status = CFI_establish(desc, base_addr, CFI_attribute_other, type, elem_len, (CFI_rank_t) rank, extents);
+    if (status != CFI_SUCCESS) {
+        return status;
+    }
+
+    for (dim = 0; dim < rank; dim++) {
+        desc->dim[dim].sm = strides[dim];
+    }
+
+    return CFI_SUCCESS;
+}
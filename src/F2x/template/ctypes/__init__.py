@@ -15,7 +15,18 @@
 # limitations under the License.
 """
 Generates a Python module that interacts with a ISO C interface generated by 'bindc' template using ctypes including
-error handling using 'cerr' template.
+error handling using 'cerr' template. The C interface of a routine is only configured when it is called first, so
+importing modules with many routines stays fast.
+
+Derived types provide :code:`pack(instances)` and :code:`unpack(instances, values)` class methods that read or write all
+scalar number and logical fields of many instances with one call using a NumPy structured array. Array fields of
+derived types that only contain scalar numbers (and have a C compatible memory layout) can also be accessed as NumPy
+structured array without copying using :code:`view()`.
+
+The generated modules can collect call statistics (calls, time spent converting arguments and in the library, bytes
+copied) for each method. Profiling is enabled by :code:`enable_profiling()` or by setting the environment variable
+:code:`F2X_PROFILE`. The statistics are available as :code:`profile.table()` or can be written by
+:code:`profile.dump(filename)` to be loaded with :py:mod:`pstats`.
 """
 name = 'ctypes'
 templates = ['@ctypes/_glue.py.t']
@@ -31,9 +31,9 @@ import os
 
 import numpy
 
-from {% if context.args.py_absolute_import %}F2x.template.ctypes{% endif %}.glue import FType, Field, ArrayField, Global, ArrayGlobal, \
-                  constructor, destructor, array_from_pointer, \
-                  F2xError
+from {% if context.args.py_absolute_import %}F2x.template.ctypes{% endif %}.glue import Library, FType, Field, ArrayField, Global, ArrayGlobal, \
+                  constructor, destructor, array_from_pointer, load_on_first_call, load_capi, load_ufuncs, \
+                  as_fortran_array, PackedFields, Profile, F2xError, F2xCopyError
 
 {% if config.has_section("pyimport") -%}
 	{% for imp in config.options("pyimport") %}
@@ -43,7 +43,10 @@ from {{ imp }} import {{ config.get("pyimport", imp) }}
 
 library_name = '{{ config.get('generate', 'dll') }}'
 library_path = os.path.join(os.path.dirname(__file__), library_name)
-library = ctypes.cdll.LoadLibrary(library_path)
+library = Library(library_path)
+
+# Raise F2xCopyError instead of copying array arguments (None uses the default of the glue library).
+strict_arrays = {% if config.has_option("generate", "strict_arrays") %}{{ config.getboolean("generate", "strict_arrays") }}{% else %}None{% endif %}
 
 
 def check_error(name):
@@ -52,8 +55,7 @@ def check_error(name):
         raise F2xError(name, code)
 
 
-library.f2x_err_get.argtypes = None
-library.f2x_err_get.rtype = ctypes.c_int
+library.prototype('f2x_err_get', ctypes.c_int, [])
 
 
 {% for type in module.types if type.public %}
@@ -73,9 +75,9 @@ class _Globals(FType):
         "{{ global.name }}",
         {{ global.ftype or global.pytype }},
         [{{ types.join_dims(global.dims) }}],
-        library.get_{{ global.name }}
+        library.symbol('get_{{ global.name }}')
         {%- if global.dims %},
-        library.alloc_{{ global.name }}
+        library.symbol('alloc_{{ global.name }}')
         {%- endif %}
         {%- if global.strlen %},
         strlen={{ global.strlen }}
@@ -84,14 +86,14 @@ class _Globals(FType):
     {%- else %}
     {{ global.name }} = Global(
         {{ global.ftype or global.pytype }},
-        library.get_{{ global.name }},
+        library.symbol('get_{{ global.name }}'),
         {%- if global.setter %}
-        library.set_{{ global.name }}
+        library.symbol('set_{{ global.name }}')
         {%- else %}
         None
         {%- endif %}
         {%- if global.dynamic %},
-        library.alloc_{{ global.name }}
+        library.symbol('alloc_{{ global.name }}')
         {%- endif %}
     )
     {%- endif %}
@@ -107,4 +109,38 @@ globals = _Globals()
 # {{ method.name }}
 {{ calls.import_method(method) }}
 {{ calls.export_method(method) }}
+    {%- if method.batch %}
+
+
+{{ calls.export_batch(method) }}
+    {%- endif %}
 {%- endfor %}
+{%- if module.methods %}
+
+
+# Use precompiled stubs and ufuncs (generated by 'capi' and 'ufunc' templates) where available. They replace the
+# methods when the library is loaded on the first call of a method. The module namespace is passed as vars() as
+# globals() might be shadowed by the module variables.
+_namespace = vars()
+load_on_first_call(library, _namespace, [{% for method in module.methods %}'{{ method.name }}'{% if not loop.last %}, {% endif %}{% endfor %}])
+library.on_load(load_capi, '{{ module.name }}', _namespace)
+library.on_load(load_ufuncs, '{{ module.name }}', _namespace)
+{%- endif %}
+
+# Call statistics of the exported methods (enabled by F2X_PROFILE environment variable or enable_profiling()).
+profile = Profile(library, vars(), [{% for method in module.methods %}'{{ method.name }}'{% if not loop.last %}, {% endif %}{% endfor %}])
+enable_profiling = profile.enable
+disable_profiling = profile.disable
+{%- if module.methods and config.has_section("ufunc") and config.options("ufunc") %}
+
+# Ufuncs that combine several methods (configured for the 'ufunc' template) are only added when the library is loaded.
+_combined_ufuncs = {{ config.options("ufunc")|map('upper')|list }}
+
+
+def __getattr__(name):
+    if name in _combined_ufuncs and not library.loaded:
+        library.dll
+        if name in _namespace:
+            return _namespace[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+{%- endif %}
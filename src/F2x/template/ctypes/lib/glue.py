@@ -20,11 +20,82 @@ correct C interfaces and converting values between FORTRAN and Python types. Arr
 Usually there should be no need to access this module directly.
 """
 
+import collections
 import ctypes
+import functools
+import marshal
+import os
+import threading
+import time
 
 import numpy
 
 
+class Symbol(object):
+    """
+    A function exported by a :py:class:`Library` that is looked up when it is resolved.
+
+    The generated wrappers pass symbols instead of C functions to fields and constructors. This way, importing a
+    wrapper does not load the library.
+
+    :param library: The :py:class:`Library` that exports the function.
+    :param name: The name of the function.
+    """
+    __slots__ = ('library', 'name')
+
+    def __init__(self, library, name):
+        self.library = library
+        self.name = name
+
+    def resolve(self):
+        """
+        Look up the C function. This loads the library if required.
+        """
+        return getattr(self.library, self.name)
+
+
+def _resolve(cfunc):
+    if isinstance(cfunc, Symbol):
+        return cfunc.resolve()
+    return cfunc
+
+
+class _LazyStaticMethod(object):
+    """
+    A static method that is created from a :py:class:`Symbol` when it is accessed first.
+
+    It replaces itself in the class it was defined in, i.e., later accesses have no overhead.
+    """
+
+    def __init__(self, configure, symbol):
+        self._configure = configure
+        self._symbol = symbol
+        self._owner = None
+        self._name = None
+
+    def __set_name__(self, owner, name):
+        self._owner = owner
+        self._name = name
+
+    def __get__(self, instance, owner):
+        cfunc = self._configure(self._symbol.resolve())
+        if self._owner is not None:
+            setattr(self._owner, self._name, staticmethod(cfunc))
+        return cfunc
+
+
+def _static(configure, cfunc):
+    if isinstance(cfunc, Symbol):
+        return _LazyStaticMethod(configure, cfunc)
+    return staticmethod(configure(cfunc))
+
+
+def _constructor(cfunc):
+    cfunc.argtypes = []
+    cfunc.restype = ctypes.c_void_p
+    return cfunc
+
+
 def constructor(cfunc):
     """
     Make a C function a constructor.
@@ -32,12 +103,17 @@ def constructor(cfunc):
     The C interface is defined to accept no parameters and return a void pointer. It is also wrapped as a staticmethod
     to allow usage in classes.
 
-    :param cfunc: The plain C function as imported from the C library using ctypes.
+    :param cfunc: The plain C function as imported from the C library using ctypes or a :py:class:`Symbol` that is
+                  resolved when the constructor is used first.
     :return: A static method with appropriate C interface.
     """
-    cfunc.argtypes = []
-    cfunc.restype = ctypes.c_void_p
-    return staticmethod(cfunc)
+    return _static(_constructor, cfunc)
+
+
+def _destructor(cfunc):
+    cfunc.argtypes = [ctypes.POINTER(ctypes.c_void_p)]
+    cfunc.restype = None
+    return cfunc
 
 
 def destructor(cfunc):
@@ -47,31 +123,242 @@ def destructor(cfunc):
     Destructors accept pointers to void pointers as argument. They are also wrapped as a staticmethod for usage in
     classes.
 
-    :param cfunc: The C function as imported by ctypes.
+    :param cfunc: The C function as imported by ctypes or a :py:class:`Symbol` that is resolved when the destructor is
+                  used first.
     :return: The configured destructor.
     """
-    cfunc.argtypes = [ctypes.POINTER(ctypes.c_void_p)]
-    cfunc.restype = None
-    return staticmethod(cfunc)
+    return _static(_destructor, cfunc)
+
+
+class Library(object):
+    """
+    A shared library that is loaded on first use.
+
+    The C interfaces of the exported functions can be declared in advance using :py:meth:`prototype`. A function is
+    looked up and configured when it is accessed for the first time. It is then stored as attribute, i.e., later calls
+    have no overhead compared to a library loaded by :py:data:`ctypes.cdll`.
+
+    The library itself is only loaded when it is used first, e.g., by the first call of a wrapped method. Callbacks
+    registered by :py:meth:`on_load` are called at that time.
+
+    :param path: The path to the shared library.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._dll = None
+        self._prototypes = {}
+        self._profile = None
+        self._on_load = []
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._dll is not None
+
+    @property
+    def dll(self):
+        """
+        The library as loaded by ctypes. Accessing this loads the library if required.
+        """
+        if self._dll is None:
+            with self._lock:
+                if self._dll is None:
+                    dll = ctypes.cdll.LoadLibrary(self._path)
+                    for callback, args in self._on_load:
+                        callback(dll, *args)
+                    self._on_load.clear()
+                    self._dll = dll
+
+        return self._dll
+
+    def on_load(self, callback, *args):
+        """
+        Register a function that is called when the library is loaded.
+
+        The library is only available to other threads after all callbacks returned. Callbacks must not use this
+        object to access the library.
+
+        :param callback: The function to call. It is passed the library as loaded by ctypes and *args*.
+        :param args: Additional arguments for *callback*.
+        """
+        if self._dll is None:
+            self._on_load.append((callback, args))
+        else:
+            callback(self._dll, *args)
+
+    def symbol(self, name):
+        """
+        Refer to an exported function without loading the library.
+
+        :param name: The name of the function.
+        :return: A :py:class:`Symbol` that loads the library when it is resolved.
+        """
+        return Symbol(self, name)
+
+    def prototype(self, name, restype, argtypes):
+        """
+        Declare the C interface of an exported function.
+
+        :param name: The name of the function.
+        :param restype: The ctypes type of the result (or :code:`None`).
+        :param argtypes: A list with the ctypes types of the arguments.
+        """
+        self._prototypes[name] = restype, argtypes
+        self.__dict__.pop(name, None)
+
+    def profile(self, profile):
+        """
+        Measure the time spent in the declared functions.
+
+        :param profile: The :py:class:`Profile` that collects the timings or :code:`None` to stop measuring.
+        """
+        self._profile = profile
+        for name in self._prototypes:
+            self.__dict__.pop(name, None)
+
+    def __getattr__(self, name):
+        if name.startswith('__') and name.endswith('__'):
+            raise AttributeError(name)
+
+        cfunc = getattr(self.dll, name)
+        prototype = self._prototypes.get(name)
+        if prototype is not None:
+            cfunc.restype, cfunc.argtypes = prototype
+            if self._profile is not None:
+                cfunc = self._profile.native(name, cfunc)
+
+        setattr(self, name, cfunc)
+        return cfunc
+
+
+_dtypes = {}
+
+
+class _ArrayInterface(object):
+    __slots__ = ('__array_interface__', )
+
+    def __init__(self, interface):
+        self.__array_interface__ = interface
 
 
 def array_from_pointer(ctype, dims, ptr):
     """
-    Helper that converts a pointer to a ctypes array.
+    Helper that converts a pointer to a NumPy array.
 
-    The array will have flat layout.
+    The array will have FORTRAN layout and shares the memory it points to, i.e., no data is copied. The array is built
+    from the raw address so no new ctypes array types are created.
 
     :param ctype: Type of the contents of the array.
     :param dims: List with the current sizes of the array.
     :param ptr: Address of array memory.
-    :return: A ctypes array that points to the referred data.
+    :return: A NumPy array that points to the referred data.
+    :raises ValueError: If *ptr* is a null pointer.
     """
-    array_size = 1
+    address = ctypes.addressof(ptr.contents)
+    dtype = _dtypes.get(ctype)
+    if dtype is None:
+        dtype = _dtypes[ctype] = numpy.dtype(ctype)
+
+    return _array_from_address(dtype, dims, address)
+
+
+def _array_from_address(dtype, dims, address):
+    strides = []
+    stride = dtype.itemsize
     for size in dims:
-        array_size *= size
+        strides.append(stride)
+        stride *= size
+
+    array = numpy.asarray(_ArrayInterface({
+        'version': 3,
+        'typestr': dtype.str,
+        'data': (address, False),
+        'shape': tuple(dims),
+        'strides': tuple(strides),
+    }))
+
+    # Structured types are passed as raw bytes and need to be re-interpreted.
+    return array.view(dtype) if dtype.names else array
+
+
+#: Default for the strict array mode of all wrapped modules. A module can override it by setting its own
+#: :code:`strict_arrays` to :code:`True` or :code:`False`.
+strict_arrays = False
+
+#: Number of implicit copies (or conversions) of array arguments, counted per argument (:code:`METHOD.ARG`).
+copy_events = collections.Counter()
+
+#: Number of bytes copied by implicit conversions of array arguments, counted per argument (:code:`METHOD.ARG`).
+copy_bytes = collections.Counter()
+
+
+class F2xCopyError(ValueError):
+    """
+    This exception is raised in strict array mode when an array argument would need to be copied or converted before
+    it can be passed to FORTRAN.
+    """
+    pass
+
+
+def as_fortran_array(value, ctype, name, strict=None):
+    """
+    Get an array that can be passed to FORTRAN without further conversion.
+
+    NumPy arrays that are F-contiguous and have the expected data type are passed on unchanged. All other values are
+    copied into a new array. Each copy is counted in :py:data:`copy_events`. In strict array mode, a
+    :py:class:`F2xCopyError` is raised instead.
+
+    :param value: The value to pass.
+    :param ctype: The ctypes type of the array elements.
+    :param name: The name of the argument (used for reporting).
+    :param strict: Enable or disable strict array mode. If :code:`None`, :py:data:`strict_arrays` is used.
+    :return: An F-contiguous NumPy array with matching data type.
+    """
+    dtype = _dtypes.get(ctype)
+    if dtype is None:
+        dtype = _dtypes[ctype] = numpy.dtype(ctype)
+
+    if isinstance(value, numpy.ndarray):
+        if value.dtype == dtype and value.flags.f_contiguous:
+            return value
+        reason = f"{value.dtype} array{'' if value.flags.f_contiguous else ' (not F-contiguous)'}"
+    else:
+        reason = type(value).__name__
+
+    if strict_arrays if strict is None else strict:
+        raise F2xCopyError(f"{name}: {reason} would be copied to F-contiguous {dtype} array.")
+
+    copy_events[name] += 1
+    value = numpy.array(value, dtype=dtype, order='F')
+    copy_bytes[name] += value.nbytes
+    return value
 
-    array_type = ctype * array_size
-    return array_type.from_address(ctypes.addressof(ptr.contents))
+
+def cfi_array(value, ctype, rank, name, strict=None):
+    """
+    Get an array that can be passed as C descriptor (:code:`CFI_cdesc_t`) as used by the 'cfi' template.
+
+    NumPy arrays with the expected data type are passed with their actual strides, i.e., they are not copied. Other
+    values are converted by :py:func:`as_fortran_array` first.
+
+    :param value: The value to pass.
+    :param ctype: The ctypes type of the array elements.
+    :param rank: The rank of the FORTRAN array.
+    :param name: The name of the argument (used for reporting).
+    :param strict: Enable or disable strict array mode. If :code:`None`, :py:data:`strict_arrays` is used.
+    :return: A NumPy array with matching data type and rank.
+    """
+    dtype = _dtypes.get(ctype)
+    if dtype is None:
+        dtype = _dtypes[ctype] = numpy.dtype(ctype)
+
+    if not isinstance(value, numpy.ndarray) or value.dtype != dtype:
+        value = as_fortran_array(value, ctype, name, strict)
+    if value.ndim != rank:
+        raise ValueError(f"{name}: expected array of rank {rank}, got rank {value.ndim}.")
+
+    return value
 
 
 class NullPointerError(BaseException):
@@ -147,12 +434,39 @@ def _allocator(ctype, cfunc):
     return cfunc
 
 
-class Field(object):
+class _LazyBinding(object):
+    """
+    Base class for fields that configure their C functions when they are used first.
+
+    The C functions (or :py:class:`Symbol` objects) are stored in :code:`_cfuncs`. They are resolved and passed to
+    :py:meth:`_bind` when one of the attributes listed in :code:`_bound` is accessed for the first time. This sets the
+    attributes, i.e., later accesses have no overhead.
+    """
+    _bound = ()
+
+    def __getattr__(self, name):
+        if name not in self._bound:
+            raise AttributeError(name)
+
+        self._bind(*map(_resolve, self._cfuncs))
+        return self.__dict__[name]
+
+    def _bind(self, *cfuncs):
+        raise NotImplementedError()
+
+
+class Field(_LazyBinding):
+    _bound = ('getter', 'setter', 'allocator')
+
     def __init__(self, ctype, getter, setter=None, allocator=None, strlen=None):
         self.ctype = ctype
-        self.getter = _getter(ctype, getter)
-        self.setter = _setter(ctype, setter, strlen)
-        self.allocator = _allocator(ctype, allocator)
+        self.strlen = strlen
+        self._cfuncs = getter, setter, allocator
+
+    def _bind(self, getter, setter, allocator):
+        self.getter = _getter(self.ctype, getter)
+        self.setter = _setter(self.ctype, setter, self.strlen)
+        self.allocator = _allocator(self.ctype, allocator)
 
     def __get__(self, instance, owner):
         if instance is None:
@@ -247,11 +561,10 @@ def _global_allocator(ctype, cfunc):
 
 
 class Global(Field):
-    def __init__(self, ctype, getter, setter=None, allocator=None, strlen=None):
-        self.ctype = ctype
-        self.getter = _global_getter(ctype, getter)
-        self.setter = _global_setter(ctype, setter, strlen)
-        self.allocator = _global_allocator(ctype, allocator)
+    def _bind(self, getter, setter, allocator):
+        self.getter = _global_getter(self.ctype, getter)
+        self.setter = _global_setter(self.ctype, setter, self.strlen)
+        self.allocator = _global_allocator(self.ctype, allocator)
 
     def __get__(self, instance, owner):
         if instance is None:
@@ -286,7 +599,59 @@ class FTypeFieldArray(object):
         self.ptr = ptr
 
     def __len__(self):
-        return self.ptr.dims[self.field.name][0]
+        return self._get_dims()[0]
+
+    def _get_dims(self):
+        # The sizes of ALLOCATABLE and POINTER arrays are queried as FORTRAN code might have (re-)allocated the array.
+        dims = self.ptr.dims[self.field.name]
+        if self.field.sizes is not None:
+            csizes = (ctypes.c_int32 * len(dims))()
+            self.field.sizes(self.ptr.ptr, csizes)
+            dims[:] = csizes
+
+        return dims
+
+    def view(self):
+        """
+        Get the array as NumPy structured array that shares the memory with FORTRAN.
+
+        This is only possible if the element type only contains scalar number fields and has the same memory layout
+        as its packed mirror type (this is checked by the wrapper library). The records have the same fields as
+        returned by :py:meth:`FType.pack`.
+
+        :return: A NumPy array with FORTRAN layout.
+        :raises TypeError: If the element type cannot be accessed directly or a POINTER array is not contiguous.
+        """
+        packed = getattr(self.field.ctype, '_packed', None)
+        if packed is None or not packed.same_layout:
+            raise TypeError(f"Array of {self.field.ctype.__name__} cannot be viewed as structured array.")
+
+        name = self.field.name
+        dims = tuple(self._get_dims())
+        if 0 in dims:
+            return numpy.zeros(dims, packed.dtype, order='F')
+
+        # The address is checked on every access as FORTRAN code might have reallocated the array.
+        address = self[(0, ) * len(dims)].ptr.value
+        cached = self.ptr._views.get(name)
+
+        if cached is None or cached[0] != address or cached[1].shape != dims:
+            self._check_contiguous(dims, address, packed.dtype.itemsize)
+            cached = self.ptr._views[name] = address, _array_from_address(packed.dtype, dims, address)
+
+        return cached[1]
+
+    def _check_contiguous(self, dims, address, itemsize):
+        # A POINTER might be associated with an array section, i.e., the elements are not adjacent.
+        stride = itemsize
+        for axis, size in enumerate(dims):
+            if size > 1:
+                index = [0] * len(dims)
+                index[axis] = 1
+                if self[index].ptr.value - address != stride:
+                    raise TypeError(f"Array {self.field.name} is not contiguous and cannot be viewed as structured "
+                                    f"array.")
+            stride *= size
 
     def __getitem__(self, index):
         if not isinstance(index, (list, tuple)):
@@ -304,7 +669,7 @@ class FTypeFieldArray(object):
         self.field.allocator(self.ptr, sizes)
 
 
-def _array_getter(name, ctype, cfunc):
+def _array_getter(name, ctype, cfunc, allocatable=False):
     if ctype == ctypes.c_char_p:
         cfunc.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.POINTER(ctypes.c_int32))]
         cfunc.restype = ctypes.c_void_p
@@ -326,23 +691,34 @@ def _array_getter(name, ctype, cfunc):
             index = (ctypes.c_int32 * len(instance.dims[name]))(*index)
             cindex = ctypes.cast(index, ctypes.POINTER(ctypes.c_int32))
             cptr = cfunc(instance.ptr, ctypes.byref(cindex))
-            return ctype(cptr, False)
+            return ctype(ctypes.c_void_p(cptr), False)
+
+        return _get
+
+    elif allocatable:
+        # The FORTRAN getter also reports the current sizes of the array.
+        cfunc.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int32), ctypes.POINTER(ctypes.c_void_p)]
+        cfunc.restype = None
+
+        def _get(instance):
+            dims = instance.dims[name]
+            csizes = (ctypes.c_int32 * len(dims))()
+            cptr = ctypes.c_void_p()
+            cfunc(instance.ptr, csizes, ctypes.byref(cptr))
+            if cptr.value:
+                dims[:] = csizes
+            return cptr.value
 
         return _get
 
     else:
-        cfunc.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.POINTER(ctype))]
+        cfunc.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p)]
         cfunc.restype = None
 
         def _get(instance):
-            cptr = ctypes.POINTER(ctype)()
+            cptr = ctypes.c_void_p()
             cfunc(instance.ptr, ctypes.byref(cptr))
-            try:
-                carray = array_from_pointer(ctype, instance.dims[name], cptr)
-            except ValueError:
-                raise NullPointerError
-
-            return numpy.ndarray(instance.dims[name], ctype, carray, order='F')
+            return cptr.value
 
         return _get
 
@@ -362,6 +738,15 @@ def _array_setter(name, ctype, cfunc):
         return _set
 
 
+def _array_sizes(cfunc):
+    if cfunc is None:
+        return
+
+    cfunc.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int32)]
+    cfunc.restype = None
+    return cfunc
+
+
 def _array_allocator(name, ctype, cfunc):
     if cfunc is None:
         return
@@ -375,6 +760,7 @@ def _array_allocator(name, ctype, cfunc):
             cptr = ctypes.cast(csizes, ctypes.POINTER(ctypes.c_int32))
             cfunc(instance.ptr, ctypes.byref(cptr))
             instance.dims[name][:] = sizes
+            instance._views.pop(name, None)
     
         return _alloc
     
@@ -387,19 +773,34 @@ def _array_allocator(name, ctype, cfunc):
             cptr = ctypes.cast(csizes, ctypes.POINTER(ctypes.c_int32))
             cfunc(instance.ptr, ctypes.byref(cptr))
             instance.dims[name][:] = sizes
+            instance._views.pop(name, None)
     
         return _alloc
 
 
-class ArrayField(object):
-    def __init__(self, name, ctype, dims, getter, setter, allocator=None, strlen=None):
+class ArrayField(_LazyBinding):
+    """
+    Descriptor for array fields of derived types.
+
+    Numeric arrays are returned as NumPy views on the Fortran memory. The views are cached per instance. The address
+    of the array (and the sizes of allocatable arrays) is checked on every access, so the view is rebuilt if the array
+    was reallocated (also by FORTRAN code) or its dimensions changed.
+    """
+
+    _bound = ('getter', 'setter', 'allocator', 'sizes')
+
+    def __init__(self, name, ctype, dims, getter, setter, allocator=None, strlen=None, sizes=None):
         self.name = name
         self.ctype = ctype
         self.dims = dims
-        self.getter = _array_getter(self.name, self.ctype, getter)
+        self.strlen = strlen
+        self._cfuncs = getter, setter, allocator, sizes
+
+    def _bind(self, getter, setter, allocator, sizes):
+        self.getter = _array_getter(self.name, self.ctype, getter, 0 in self.dims)
         self.setter = _array_setter(self.name, self.ctype, setter)
         self.allocator = _array_allocator(self.name, self.ctype, allocator)
-        self.strlen = strlen
+        self.sizes = _array_sizes(sizes)
 
     def __get__(self, instance, owner):
         if self.strlen is not None:
@@ -409,7 +810,7 @@ class ArrayField(object):
             return FTypeFieldArray(self, instance)
 
         else:
-            return self.getter(instance)
+            return self.get_view(instance)
 
     def __set__(self, instance, value):
         if issubclass(self.ctype, FType):
@@ -419,14 +820,31 @@ class ArrayField(object):
 
         else:
             try:
-                array = self.getter(instance)
+                array = self.get_view(instance)
             except NullPointerError:
                 value = numpy.array(value)
                 self.allocator(instance, value.shape)
-                array = self.getter(instance)
+                array = self.get_view(instance)
 
             array[:] = value
 
+    def get_view(self, instance):
+        address = self.getter(instance)
+        if not address:
+            raise NullPointerError
+
+        dims = tuple(instance.dims[self.name])
+        cached = instance._views.get(self.name)
+
+        if cached is None or cached[0] != address or cached[1].shape != dims:
+            dtype = _dtypes.get(self.ctype)
+            if dtype is None:
+                dtype = _dtypes[self.ctype] = numpy.dtype(self.ctype)
+
+            cached = instance._views[self.name] = address, _array_from_address(dtype, dims, address)
+
+        return cached[1]
+
 
 class StringFieldArray(FTypeFieldArray):
     def __setitem__(self, index, value):
@@ -437,7 +855,7 @@ class StringFieldArray(FTypeFieldArray):
     
 
 
-def _global_array_getter(name, ctype, cfunc):
+def _global_array_getter(name, ctype, cfunc, allocatable=False):
     if issubclass(ctype, FType):
         cfunc.argtypes = [ctypes.POINTER(ctypes.POINTER(ctypes.c_int32))]
         cfunc.restype = ctypes.c_void_p
@@ -446,23 +864,33 @@ def _global_array_getter(name, ctype, cfunc):
             index = (ctypes.c_int32 * len(instance.dims))(*index)
             cindex = ctypes.cast(index, ctypes.POINTER(ctypes.c_int32))
             cptr = cfunc(ctypes.byref(cindex))
-            return ctype(cptr, False)
+            return ctype(ctypes.c_void_p(cptr), False)
+
+        return _get
+
+    elif allocatable:
+        cfunc.argtypes = [ctypes.POINTER(ctypes.c_int32), ctypes.POINTER(ctypes.c_void_p)]
+        cfunc.restype = None
+
+        def _get(instance):
+            dims = instance.dims[name]
+            csizes = (ctypes.c_int32 * len(dims))()
+            cptr = ctypes.c_void_p()
+            cfunc(csizes, ctypes.byref(cptr))
+            if cptr.value:
+                dims[:] = csizes
+            return cptr.value
 
         return _get
 
     else:
-        cfunc.argtypes = [ctypes.POINTER(ctypes.POINTER(ctype))]
+        cfunc.argtypes = [ctypes.POINTER(ctypes.c_void_p)]
         cfunc.restype = None
 
         def _get(instance):
-            cptr = ctypes.POINTER(ctype)()
+            cptr = ctypes.c_void_p()
             cfunc(ctypes.byref(cptr))
-            try:
-                carray = array_from_pointer(ctype, instance.dims, cptr)
-            except ValueError:
-                raise NullPointerError
-
-            return numpy.ndarray(instance.dims, ctype, carray, order='F')
+            return cptr.value
 
         return _get
 
@@ -479,24 +907,32 @@ def _global_array_allocator(name, cfunc):
         cptr = ctypes.cast(csizes, ctypes.POINTER(ctypes.c_int32))
         cfunc(ctypes.byref(cptr))
         instance.dims[name][:] = sizes
+        instance._views.pop(name, None)
 
     return _alloc
 
 
 class ArrayGlobal(ArrayField):
-    def __init__(self, name, ctype, dims, getter, allocator=None):
+    _bound = ('getter', 'allocator', 'sizes')
+
+    def __init__(self, name, ctype, dims, getter, allocator=None, strlen=None):
         self.name = name
         self.ctype = ctype
         self.dims = dims
-        self.getter = _global_array_getter(self.name, self.ctype, getter)
+        self.strlen = strlen
+        self._cfuncs = getter, allocator
+
+    def _bind(self, getter, allocator):
+        self.getter = _global_array_getter(self.name, self.ctype, getter, 0 in self.dims)
         self.allocator = _global_array_allocator(self.name, allocator)
+        self.sizes = None
 
     def __get__(self, instance, owner):
         if issubclass(self.ctype, FType):
             return FTypeFieldArray(self, instance)
 
         else:
-            return self.getter(instance)
+            return self.get_view(instance)
 
     def __set__(self, instance, value):
         if issubclass(self.ctype, FType):
@@ -506,18 +942,113 @@ class ArrayGlobal(ArrayField):
 
         else:
             try:
-                array = self.getter(instance)
+                array = self.get_view(instance)
             except NullPointerError:
                 value = numpy.array(value)
                 self.allocator(instance, value.shape)
-                array = self.getter(instance)
+                array = self.get_view(instance)
 
             array[:] = value
 
 
+class PackedFields(_LazyBinding):
+    """
+    Copy all scalar number and logical fields of many derived type instances with one call.
+
+    The values are stored in a NumPy structured array that matches the :code:`BIND(C)` mirror type generated by the
+    'bindc' template (i.e., one record per instance and one field per FORTRAN field).
+
+    :param fields: A list of :code:`(name, dtype)` pairs describing the mirror type.
+    :param pack: The :code:`<type>_pack` routine from the wrapper library.
+    :param unpack: The :code:`<type>_unpack` routine from the wrapper library.
+    :param layout: The :code:`<type>_layout` routine from the wrapper library (if the type only has scalar number
+                   fields).
+    """
+    _bound = ('_pack', '_unpack', '_layout')
+
+    def __init__(self, fields, pack, unpack, layout=None):
+        self.dtype = numpy.dtype(fields, align=True)
+        self._same_layout = None
+        self._cfuncs = pack, unpack, layout
+
+    def _bind(self, pack, unpack, layout):
+        pack.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p]
+        pack.restype = None
+        unpack.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p]
+        unpack.restype = None
+        if layout is not None:
+            layout.argtypes = []
+            layout.restype = ctypes.c_bool
+
+        self._pack = pack
+        self._unpack = unpack
+        self._layout = layout
+
+    @property
+    def same_layout(self):
+        """ :code:`True` if the derived type has the same memory layout as the mirror type. """
+        if self._same_layout is None:
+            self._same_layout = self._layout is not None and self._layout()
+
+        return self._same_layout
+
+    def _pointers(self, instances):
+        return (ctypes.c_void_p * len(instances))(*(instance.ptr.value for instance in instances))
+
+    def pack(self, instances):
+        """
+        Read the fields of all *instances*.
+
+        :param instances: A sequence of instances of the derived type.
+        :return: A structured array with one record per instance.
+        """
+        values = numpy.zeros(len(instances), self.dtype)
+        self._pack(len(instances), self._pointers(instances), values.ctypes.data)
+        return values
+
+    def unpack(self, instances, values):
+        """
+        Write the fields of all *instances*.
+
+        :param instances: A sequence of instances of the derived type.
+        :param values: A structured array (or anything that can be converted to one) with one record per instance.
+        """
+        values = numpy.ascontiguousarray(values, self.dtype)
+        if values.shape != (len(instances), ):
+            raise ValueError(f"Expected {len(instances)} records, got array of shape {values.shape}.")
+
+        self._unpack(len(instances), self._pointers(instances), values.ctypes.data)
+
+
 class FType(object):
+    """
+    Base class for wrapped derived types.
+
+    A wrapper only holds the pointer to the FORTRAN instance and its ownership. The fields of each class are collected
+    once when the class is created. The dimensions of array fields and the cached array views are created when an
+    array field is used for the first time. Generated subclasses declare empty :code:`__slots__`, so wrappers do not
+    carry a :code:`__dict__`.
+    """
+    __slots__ = ('ptr', 'owned', '_dims', '_view_cache', '__weakref__')
+
     _new = None
     _free = None
+    _packed = None
+    _fields = ()
+    _array_dims = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = tuple(
+            (name, field)
+            for name, field in cls.__dict__.items()
+            if isinstance(field, (Field, ArrayField))
+        )
+        cls._array_dims = tuple(
+            (name, tuple(field.dims))
+            for name, field in cls._fields
+            if isinstance(field, ArrayField)
+        )
 
     def __init__(self, cptr=None, owned=None, **kwargs):
         if cptr is None:
@@ -528,22 +1059,37 @@ class FType(object):
             self.ptr = cptr
             self.owned = owned if owned is not None else False
 
-        self.dims = {
-            name: list(field.dims)
-            for name, field in self.fields(ArrayField)
-        }
+        self._dims = None
+        self._view_cache = None
 
         for name, value in kwargs.items():
             setattr(self, name, value)
 
+    @property
+    def dims(self):
+        if self._dims is None:
+            self._dims = {name: list(dims) for name, dims in self._array_dims}
+        return self._dims
+
+    @property
+    def _views(self):
+        if self._view_cache is None:
+            self._view_cache = {}
+        return self._view_cache
+
     def __del__(self):
         if self.owned:
             self.owned = False
             self._free(ctypes.byref(self.ptr))
 
     def copy_from(self, other):
+        packed = ()
+        if self._packed is not None and type(other) is type(self):
+            self.unpack([self], self.pack([other]))
+            packed = self._packed.dtype.names
+
         for name, field in self.fields():
-            if isinstance(field, ArrayField):
+            if isinstance(field, ArrayField) or name in packed:
                 continue
             try:
                 value = getattr(other, name)
@@ -552,9 +1098,40 @@ class FType(object):
 
             setattr(self, name, value)
 
+    @classmethod
+    def pack(cls, instances):
+        """
+        Read all scalar number and logical fields of *instances* with one call.
+
+        :param instances: A sequence of instances of this type.
+        :return: A NumPy structured array with one record per instance.
+        """
+        return cls._get_packed(instances).pack(instances)
+
+    @classmethod
+    def unpack(cls, instances, values):
+        """
+        Write all scalar number and logical fields of *instances* with one call.
+
+        :param instances: A sequence of instances of this type.
+        :param values: A structured array with one record per instance as returned by :py:meth:`pack`.
+        """
+        cls._get_packed(instances).unpack(instances, values)
+
+    @classmethod
+    def _get_packed(cls, instances):
+        if cls._packed is None:
+            raise TypeError(f"{cls.__name__} has no fields that can be packed.")
+
+        for instance in instances:
+            if not isinstance(instance, cls):
+                raise TypeError(f"Cannot pack {type(instance).__name__} as {cls.__name__}.")
+
+        return cls._packed
+
     @classmethod
     def fields(cls, types=(Field, ArrayField)):
-        for name, field in cls.__dict__.items():
+        for name, field in cls._fields:
             if isinstance(field, types):
                 yield name, field
 
@@ -563,3 +1140,278 @@ class F2xError(Exception):
     def __init__(self, name, code):
         super(Exception, self).__init__("During execution of {0} an error ({1}) occured.".format(name, code))
         self.code = code
+
+
+def load_on_first_call(library, namespace, names):
+    """
+    Defer loading a library until one of the wrapped methods is called.
+
+    The methods are replaced by functions that load *library* and call the method that is found in *namespace*
+    afterwards. This might be a replacement installed by :py:meth:`Library.on_load` (like the stubs of
+    :py:func:`load_capi`). Otherwise, the original method is restored.
+
+    :param library: The :py:class:`Library` used by the methods.
+    :param namespace: The namespace of the generated Python module (i.e., its :code:`globals()`).
+    :param names: The names of the wrapped methods.
+    """
+    methods = {name: namespace[name] for name in names if name in namespace}
+
+    def _first_call(name, method):
+        @functools.wraps(method)
+        def _load(*args, **kwargs):
+            library.dll
+            return namespace[name](*args, **kwargs)
+
+        return _load
+
+    def _restore(dll):
+        for name, method in methods.items():
+            if namespace.get(name) is placeholders[name]:
+                namespace[name] = method
+
+    placeholders = {name: _first_call(name, method) for name, method in methods.items()}
+    namespace.update(placeholders)
+    library.on_load(_restore)
+
+
+def load_capi(library, module_name, namespace):
+    """
+    Replace wrapped methods by the precompiled stubs generated by the 'capi' template.
+
+    If *library* contains no stubs for the module, nothing is changed. Attributes of the replaced methods (like
+    :code:`batch`) are kept by wrapping the stub.
+
+    :param library: The wrapper library as loaded by ctypes.
+    :param module_name: Name of the FORTRAN module.
+    :param namespace: The namespace of the generated Python module (i.e., its :code:`globals()`).
+    :return: The module that contains the stubs or :code:`None`.
+    """
+    try:
+        loader = ctypes.PYFUNCTYPE(ctypes.py_object, ctypes.py_object)((f'f2x_capi_{module_name}', library))
+    except AttributeError:
+        return None
+
+    stubs = loader(F2xError)
+    for name, stub in vars(stubs).items():
+        if name.startswith('_'):
+            continue
+
+        attributes = getattr(namespace.get(name), '__dict__', None)
+        if attributes:
+            stub = functools.partial(stub)
+            stub.__dict__.update(attributes)
+        namespace[name] = stub
+
+    return stubs
+
+
+def load_ufuncs(library, module_name, namespace):
+    """
+    Replace wrapped ELEMENTAL methods by the NumPy ufuncs generated by the 'ufunc' template.
+
+    If *library* contains no ufuncs for the module, nothing is changed. This also adds ufuncs that combine several
+    specific methods.
+
+    :param library: The wrapper library as loaded by ctypes.
+    :param module_name: Name of the FORTRAN module.
+    :param namespace: The namespace of the generated Python module (i.e., its :code:`globals()`).
+    :return: The module that contains the ufuncs or :code:`None`.
+    """
+    try:
+        loader = ctypes.PYFUNCTYPE(ctypes.py_object, ctypes.py_object)((f'f2x_ufunc_{module_name}', library))
+    except AttributeError:
+        return None
+
+    ufuncs = loader(F2xError)
+    for name, ufunc in vars(ufuncs).items():
+        if not name.startswith('_'):
+            namespace[name] = ufunc
+
+    return ufuncs
+
+
+class Profile(object):
+    """
+    Call statistics for the wrapped methods of a module.
+
+    While profiling is enabled, the wrapped methods are replaced by instrumented versions. They count the calls and
+    measure the total time of each call and the time spent in the library (native). The remaining time is spent
+    converting arguments and results (marshal). Bytes copied by :py:func:`as_fortran_array` are counted as well.
+    Methods that were replaced by stubs or ufuncs do not call the library through ctypes, i.e., all their time is
+    reported as marshal time. Timings of concurrent calls from several threads are not separated.
+
+    Profiling is enabled on import if the environment variable :code:`F2X_PROFILE` is set (and not :code:`0`).
+
+    :param library: The :py:class:`Library` used by the methods.
+    :param namespace: The namespace of the generated Python module (i.e., its :code:`globals()`).
+    :param names: The names of the wrapped methods.
+    """
+
+    def __init__(self, library, namespace, names):
+        self._library = library
+        self._namespace = namespace
+        self._names = names
+        self._methods = {}
+        self._copy_bytes = None
+        self._native = 0.0
+        self._caller = None
+        self.calls = collections.Counter()
+        self.total = collections.Counter()
+        self.native_time = collections.Counter()
+        self.copied = collections.Counter()
+        self.library_calls = collections.Counter()
+        self.library_time = collections.Counter()
+
+        if os.environ.get('F2X_PROFILE', '0') not in ('', '0'):
+            self.enable()
+
+    @property
+    def enabled(self):
+        return bool(self._methods)
+
+    def enable(self):
+        """
+        Replace the wrapped methods by instrumented versions.
+
+        This loads the library so that stubs and ufuncs (which replace the wrapped methods on load) are instrumented.
+        """
+        if self.enabled:
+            return
+
+        self._library.dll
+
+        for name in self._names:
+            method = self._namespace.get(name)
+            if method is None:
+                continue
+
+            wrapper = self.method(name, method)
+            batch = getattr(method, 'batch', None)
+            if batch is not None:
+                wrapper.batch = self.method(name + '.batch', batch)
+            self._methods[name] = method
+            self._namespace[name] = wrapper
+
+        self._copy_bytes = collections.Counter(copy_bytes)
+        self._library.profile(self)
+
+    def disable(self):
+        """
+        Restore the original methods. The statistics are kept.
+        """
+        if not self.enabled:
+            return
+
+        self._library.profile(None)
+        self._namespace.update(self._methods)
+        self._methods.clear()
+        self._count_copies()
+
+    def reset(self):
+        """
+        Clear the statistics.
+        """
+        for counter in (self.calls, self.total, self.native_time, self.copied, self.library_calls, self.library_time):
+            counter.clear()
+        if self.enabled:
+            self._copy_bytes = collections.Counter(copy_bytes)
+
+    def method(self, name, func):
+        """
+        Instrument a wrapped method.
+
+        :param name: The name that is used to report the method.
+        :param func: The method to instrument.
+        :return: A function that calls *func* and records its timings.
+        """
+        @functools.wraps(func)
+        def _profiled(*args, **kwargs):
+            caller, self._caller = self._caller, name
+            native = self._native
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.total[name] += time.perf_counter() - start
+                self.native_time[name] += self._native - native
+                self.calls[name] += 1
+                self._caller = caller
+
+        return _profiled
+
+    def native(self, name, cfunc):
+        """
+        Instrument a library function.
+
+        :param name: The name of the C function.
+        :param cfunc: The C function as imported by ctypes.
+        :return: A function that calls *cfunc* and records the time spent.
+        """
+        def _profiled(*args):
+            start = time.perf_counter()
+            try:
+                return cfunc(*args)
+            finally:
+                elapsed = time.perf_counter() - start
+                self._native += elapsed
+                self.library_calls[self._caller, name] += 1
+                self.library_time[self._caller, name] += elapsed
+
+        return _profiled
+
+    def _count_copies(self):
+        for arg, count in (collections.Counter(copy_bytes) - self._copy_bytes).items():
+            self.copied[arg.split('.', 1)[0]] += count
+        self._copy_bytes = collections.Counter(copy_bytes)
+
+    def stats(self):
+        """
+        Get the statistics of all methods that were called.
+
+        :return: A list of tuples :code:`(name, calls, total, marshal, native, copied)` sorted by total time.
+        """
+        if self.enabled:
+            self._count_copies()
+
+        return sorted((
+            (name, calls, self.total[name], self.total[name] - self.native_time[name], self.native_time[name],
+             self.copied[name])
+            for name, calls in self.calls.items()
+        ), key=lambda row: row[2], reverse=True)
+
+    def table(self):
+        """
+        Format the statistics as table.
+
+        :return: The table as string.
+        """
+        lines = [f"{'method':<32} {'calls':>10} {'total [s]':>12} {'marshal [s]':>12} {'native [s]':>12} "
+                 f"{'copied [B]':>12}"]
+        for name, calls, total, marshal_time, native, copied in self.stats():
+            lines.append(f"{name:<32} {calls:>10} {total:>12.6f} {marshal_time:>12.6f} {native:>12.6f} {copied:>12}")
+        return '\n'.join(lines)
+
+    def dump(self, filename):
+        """
+        Write the statistics in the format of :py:mod:`cProfile`, i.e., they can be loaded by :py:class:`pstats.Stats`.
+
+        Each method is reported with its marshal time as internal time. The library functions it called are reported as
+        its callees.
+
+        :param filename: The name of the output file.
+        """
+        module_file = self._namespace.get('__file__', self._namespace.get('__name__', '?'))
+        stats = {}
+        for name, calls, total, marshal_time, native, copied in self.stats():
+            stats[module_file, 0, name] = (calls, calls, marshal_time, total, {})
+
+        for (caller, name), calls in self.library_calls.items():
+            elapsed = self.library_time[caller, name]
+            key = self._library._path, 0, name
+            cc, nc, tt, ct, callers = stats.get(key, (0, 0, 0.0, 0.0, {}))
+            if caller is not None:
+                callers[module_file, 0, caller] = (calls, calls, elapsed, elapsed)
+            stats[key] = (cc + calls, nc + calls, tt + elapsed, ct + elapsed, callers)
+
+        with open(filename, 'wb') as output:
+            marshal.dump(stats, output)
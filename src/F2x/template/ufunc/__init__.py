@@ -0,0 +1,38 @@
+# -*- encoding: utf-8 -*-
+#
+# Copyright 2018 German Aerospace Center (DLR)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Generates NumPy ufuncs for :code:`ELEMENTAL` procedures. Each ufunc has a C loop that calls the ISO C interface
+generated by 'bindc' once per element and uses the error handling of 'cerr'. The ufuncs are compiled into the wrapper
+library and replace the corresponding methods of the 'ctypes' template when the library is loaded on first use (like
+the stubs of 'capi'), so they support broadcasting, :code:`out=` and the other ufunc features of NumPy.
+
+All arguments need to be INTEGER, REAL or LOGICAL scalars with INTENT(IN) or INTENT(OUT). INTENT(OUT) arguments are
+returned after the function result. Specific procedures for different kinds can be combined into one ufunc that
+dispatches on the data type of its arguments::
+
+    [ufunc]
+    square = square_r4, square_r8
+
+The name of the combined ufunc is converted to upper case.
+"""
+import numpy
+
+name = 'ufunc'
+templates = ['@ufunc/_ufunc.c.t']
+requires = ['ctypes']
+modules = None
+libraries = None
+include_dirs = [numpy.get_include()]
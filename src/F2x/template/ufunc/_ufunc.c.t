@@ -0,0 +1,270 @@
+{#-##################################################################################################################-#}
+{#- F2x 'ufunc' main template.                                                                                       -#}
+{#-                                                                                                                  -#}
+{#- This template generates NumPy ufuncs for `ELEMENTAL` `FUNCTION`s and `SUBROUTINE`s exported by the 'bindc'       -#}
+{#- template. The inner loops call the `BIND(C)` routine once per element.                                            -#}
+{#-                                                                                                                  -#}
+{#- Copyright 2018 German Aerospace Center (DLR)                                                                     -#}
+{#-                                                                                                                  -#}
+{#- Licensed under the Apache License, Version 2.0 (the "License");                                                  -#}
+{#- you may not use this file except in compliance with the License.                                                 -#}
+{#- You may obtain a copy of the License at                                                                          -#}
+{#-                                                                                                                  -#}
+{#-     http://www.apache.org/licenses/LICENSE-2.0                                                                   -#}
+{#-                                                                                                                  -#}
+{#- Unless required by applicable law or agreed to in writing, software                                              -#}
+{#- distributed under the License is distributed on an "AS IS" BASIS,                                                -#}
+{#- WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.                                         -#}
+{#- See the License for the specific language governing permissions and                                              -#}
+{#- limitations under the License.                                                                                   -#}
+{#-##################################################################################################################-#}
+{%- set C_TYPES = {
+    'INTEGER': {None: 'int32_t', 1: 'int8_t', 2: 'int16_t', 4: 'int32_t', 8: 'int64_t'},
+    'LOGICAL': {None: 'int32_t', 1: 'int8_t', 2: 'int16_t', 4: 'int32_t', 8: 'int64_t'},
+    'REAL': {None: 'float', 4: 'float', 8: 'double'},
+} -%}
+{%- set NPY_TYPES = {
+    'INTEGER': {None: 'int32', 1: 'int8', 2: 'int16', 4: 'int32', 8: 'int64'},
+    'LOGICAL': {None: 'bool', 1: 'bool', 2: 'bool', 4: 'bool', 8: 'bool'},
+    'REAL': {None: 'float32', 4: 'float32', 8: 'float64'},
+} -%}
+
+
+{#- Get the C type of a scalar variable as passed to the `BIND(C)` routine.
+#}
+{%- macro c_type(var) -%}
+    {{ C_TYPES[var.type|upper][var.get('kind')] }}
+{%- endmacro %}
+
+
+{#- Get the NumPy C type of the array elements for a scalar variable.
+#}
+{%- macro npy_type(var) -%}
+    npy_{{ NPY_TYPES[var.type|upper][var.get('kind')] }}
+{%- endmacro %}
+
+
+{#- Get the NumPy type number for a scalar variable.
+#}
+{%- macro npy_typenum(var) -%}
+    NPY_{{ NPY_TYPES[var.type|upper][var.get('kind')]|upper }}
+{%- endmacro %}
+
+
+{#- Generate the inner loop for an elemental method.
+
+   The loop copies the input elements into C variables, calls the `BIND(C)` routine and stores the function result
+   and all output arguments. The whole loop runs in one `setjmp` context, i.e., an error stops the loop.
+
+   :param method: The :type SubDef: or :type FuncDef: node of the exported method.
+#}
+{%- macro export_loop(method) -%}
+    {%- set inargs = method.args|selectattr('intent', 'equalto', 'IN')|list -%}
+    {%- set outargs = method.args|selectattr('intent', 'equalto', 'OUT')|list -%}
+    {%- set offset = inargs|length + (1 if method.ret else 0) -%}
+/* Prototype for BIND(C) routine {{ method.name }} */
+{% if method.ret %}{{ c_type(method.ret) }}{% else %}void{% endif %} {{ method.export_name }}(
+    {%- for arg in method.args -%}
+        {{ c_type(arg) }} *{% if not loop.last %}, {% endif %}
+    {%- endfor -%}
+);
+
+static void f2x_ufunc_{{ method.export_name }}_loop(char **args, npy_intp const *dimensions, npy_intp const *steps,
+                                                    void *data) {
+    npy_intp i, n = dimensions[0];
+    {%- for arg in method.args %}
+    {{ c_type(arg) }} {{ arg.name }}_INTERN = 0;
+    {%- endfor %}
+    {%- if method.ret %}
+    {{ c_type(method.ret) }} {{ method.ret.name }}_INTERN;
+    {%- endif %}
+    jmp_buf *_jmp_buf;
+
+    _jmp_buf = f2x_prepare_jmp_buffer();
+    if (_jmp_buf == 0) {
+        f2x_ufunc_error("{{ method.name }}");
+        return;
+    }
+
+    if (setjmp(*_jmp_buf) == 0) {
+        f2x_err_reset();
+        for (i = 0; i < n; i++) {
+            {%- for arg in inargs %}
+            {{ arg.name }}_INTERN = ({{ c_type(arg) }}) *({{ npy_type(arg) }} *) (args[{{ loop.index0 }}] + i * steps[{{ loop.index0 }}]);
+            {%- endfor %}
+            {% if method.ret %}{{ method.ret.name }}_INTERN = {% endif %}{{ method.export_name }}(
+            {%- for arg in method.args -%}
+                &{{ arg.name }}_INTERN{% if not loop.last %}, {% endif %}
+            {%- endfor -%}
+            );
+            {%- if method.ret %}
+            {{ store(method.ret, inargs|length) }}
+            {%- endif %}
+            {%- for arg in outargs %}
+            {{ store(arg, offset + loop.index0) }}
+            {%- endfor %}
+        }
+    }
+
+    f2x_clear_jmp_buffer();
+    if (f2x_err_get() != 0) {
+        f2x_ufunc_error("{{ method.name }}");
+    }
+}
+{%- endmacro %}
+
+
+{#- Store the C variable of an output in the output array at position `index`.
+#}
+{%- macro store(var, index) -%}
+    *({{ npy_type(var) }} *) (args[{{ index }}] + i * steps[{{ index }}]) = ({{ npy_type(var) }}) {{ var.name }}_INTERN
+    {%- if var.type|upper == 'LOGICAL' %} != 0{% endif %};
+{%- endmacro %}
+
+
+{#- Select elemental methods that only use scalars of known type. -#}
+{%- set loop_methods = [] -%}
+{%- for method in module.methods if method.elemental -%}
+    {%- set unsupported = [] -%}
+    {%- for var in method.args + ([method.ret] if method.ret else []) -%}
+        {%- if var.dims or var.strlen or var.ftype or var.type|upper not in C_TYPES
+               or var.get('kind') not in C_TYPES[var.type|upper] -%}
+            {%- do unsupported.append(var) -%}
+        {%- endif -%}
+    {%- endfor -%}
+    {%- for arg in method.args if arg.intent not in ('IN', 'OUT') -%}
+        {%- do unsupported.append(arg) -%}
+    {%- endfor -%}
+    {%- if method.ret and method.ret.getter != 'function' -%}
+        {%- do unsupported.append(method.ret) -%}
+    {%- endif -%}
+    {%- if not unsupported -%}
+        {%- do loop_methods.append(method) -%}
+    {%- endif -%}
+{%- endfor -%}
+
+{#- Collect the ufuncs with their loops: one for each method and one for each group from the configuration. -#}
+{%- set ufuncs = [] -%}
+{%- for method in loop_methods -%}
+    {%- do ufuncs.append((method.name, [method])) -%}
+{%- endfor -%}
+{%- if config.has_section("ufunc") -%}
+    {%- for name in config.options("ufunc") -%}
+        {%- set specifics = config.get("ufunc", name).lower().replace(' ', '').split(',') -%}
+        {%- set group = [] -%}
+        {%- set signatures = [] -%}
+        {%- for specific in specifics -%}
+            {%- for method in loop_methods if method.name.lower() == specific -%}
+                {%- do group.append(method) -%}
+                {%- do signatures.append((method.args|selectattr('intent', 'equalto', 'IN')|list|length,
+                                          method.args|length + (1 if method.ret else 0))) -%}
+            {%- endfor -%}
+        {%- endfor -%}
+        {%- if group and group|length == specifics|length and signatures|unique|list|length == 1 -%}
+            {%- do ufuncs.append((name|upper, group)) -%}
+        {%- endif -%}
+    {%- endfor -%}
+{%- endif -%}
+/* This file was generated by the F2x 'ufunc' template. Please do not modify directly. */
+{%- if loop_methods %}
+#define PY_SSIZE_T_CLEAN
+#define NPY_NO_DEPRECATED_API NPY_1_7_API_VERSION
+#include <Python.h>
+#include <setjmp.h>
+#include <stdint.h>
+#include <numpy/ndarraytypes.h>
+#include <numpy/ufuncobject.h>
+
+void f2x_err_reset();
+jmp_buf *f2x_prepare_jmp_buffer();
+void f2x_clear_jmp_buffer();
+int f2x_err_get();
+
+static PyObject *f2x_ufunc_error_type = NULL;
+static PyObject *f2x_ufunc_module = NULL;
+
+
+/* Raise the F2x error type for the current error code. The loops may run without holding the GIL. */
+static void f2x_ufunc_error(const char *name) {
+    PyGILState_STATE state = PyGILState_Ensure();
+    PyObject *error_args = Py_BuildValue("(si)", name, f2x_err_get());
+
+    if (error_args != NULL) {
+        PyErr_SetObject(f2x_ufunc_error_type, error_args);
+        Py_DECREF(error_args);
+    }
+
+    PyGILState_Release(state);
+}
+{%- for method in loop_methods %}
+
+
+{{ export_loop(method) }}
+{%- endfor %}
+{%- for name, group in ufuncs %}
+
+
+static PyUFuncGenericFunction f2x_ufunc_{{ name }}_{{ loop.index }}_funcs[] = {
+    {%- for method in group %}f2x_ufunc_{{ method.export_name }}_loop{% if not loop.last %}, {% endif %}{% endfor -%}
+};
+static void *f2x_ufunc_{{ name }}_{{ loop.index }}_data[] = {
+    {%- for method in group %}NULL{% if not loop.last %}, {% endif %}{% endfor -%}
+};
+static char f2x_ufunc_{{ name }}_{{ loop.index }}_types[] = {
+    {%- for method in group %}
+    {% for arg in method.args|selectattr('intent', 'equalto', 'IN') %}{{ npy_typenum(arg) }}, {% endfor -%}
+    {% if method.ret %}{{ npy_typenum(method.ret) }}, {% endif -%}
+    {% for arg in method.args|selectattr('intent', 'equalto', 'OUT') %}{{ npy_typenum(arg) }}, {% endfor -%}
+    {%- endfor %}
+};
+{%- endfor %}
+
+
+static struct PyModuleDef f2x_ufunc_moduledef = {
+    PyModuleDef_HEAD_INIT, "{{ context.basename }}_ufunc", NULL, -1, NULL
+};
+
+
+/* Add a new ufunc to the module. */
+static int f2x_ufunc_add(PyUFuncGenericFunction *funcs, void **data, char *types, int ntypes, int nin, int nout,
+                         const char *name) {
+    PyObject *ufunc = PyUFunc_FromFuncAndData(funcs, data, types, ntypes, nin, nout, PyUFunc_None, name, NULL, 0);
+
+    if (ufunc == NULL || PyModule_AddObject(f2x_ufunc_module, name, ufunc) < 0) {
+        Py_XDECREF(ufunc);
+        return -1;
+    }
+
+    return 0;
+}
+
+
+/* Create the ufunc module. The library keeps a reference to the module, the result is a new reference. */
+PyObject *f2x_ufunc_{{ module.name }}(PyObject *error_type) {
+    if (f2x_ufunc_module == NULL) {
+        import_umath();
+
+        f2x_ufunc_module = PyModule_Create(&f2x_ufunc_moduledef);
+        if (f2x_ufunc_module == NULL) {
+            return NULL;
+        }
+        {%- for name, group in ufuncs %}
+            {%- set method = group[0] %}
+            {%- set nin = method.args|selectattr('intent', 'equalto', 'IN')|list|length %}
+
+        if (f2x_ufunc_add(f2x_ufunc_{{ name }}_{{ loop.index }}_funcs, f2x_ufunc_{{ name }}_{{ loop.index }}_data,
+                          f2x_ufunc_{{ name }}_{{ loop.index }}_types, {{ group|length }}, {{ nin }},
+                          {{ method.args|length - nin + (1 if method.ret else 0) }}, "{{ name }}") < 0) {
+            Py_CLEAR(f2x_ufunc_module);
+            return NULL;
+        }
+        {%- endfor %}
+
+        Py_INCREF(error_type);
+        f2x_ufunc_error_type = error_type;
+    }
+
+    Py_XINCREF(f2x_ufunc_module);
+    return f2x_ufunc_module;
+}
+{% endif %}
@@ -0,0 +1,69 @@
+MODULE SCALARS
+
+    USE F2X_ERR
+
+    PUBLIC
+
+CONTAINS
+
+    FUNCTION ADD_INTEGERS(A, B)
+        INTEGER, INTENT(IN) :: A
+        INTEGER, INTENT(IN) :: B
+        INTEGER :: ADD_INTEGERS
+
+        ADD_INTEGERS = A + B
+    END FUNCTION
+
+    FUNCTION AXPY(A, X, Y)
+        REAL(8), INTENT(IN) :: A
+        REAL(8), INTENT(IN) :: X
+        REAL(8), INTENT(IN) :: Y
+        REAL(8) :: AXPY
+
+        AXPY = A * X + Y
+    END FUNCTION
+
+    FUNCTION IS_POSITIVE(X)
+        REAL(8), INTENT(IN) :: X
+        LOGICAL :: IS_POSITIVE
+
+        IS_POSITIVE = X > 0
+    END FUNCTION
+
+    SUBROUTINE SPLIT_REAL(X, WHOLE, FRACTION)
+        REAL(8), INTENT(IN) :: X
+        INTEGER(8), INTENT(OUT) :: WHOLE
+        REAL(8), INTENT(OUT) :: FRACTION
+
+        WHOLE = INT(X, 8)
+        FRACTION = X - WHOLE
+    END SUBROUTINE
+
+    SUBROUTINE DOUBLE_INPLACE(X)
+        REAL(8), INTENT(INOUT) :: X
+
+        X = 2 * X
+    END SUBROUTINE
+
+    SUBROUTINE CHECKED_SQRT(X, Y)
+        REAL(8), INTENT(IN) :: X
+        REAL(8), INTENT(OUT) :: Y
+
+        IF (X < 0) CALL F2X_ERR_HANDLE(1)
+        Y = SQRT(X)
+    END SUBROUTINE
+
+    FUNCTION SLOW_SUM(N)
+        INTEGER, INTENT(IN) :: N
+        REAL(8) :: SLOW_SUM
+        INTEGER :: I
+
+        SLOW_SUM = 0
+        DO I = 1, ABS(N)
+            SLOW_SUM = SLOW_SUM + SQRT(REAL(I, 8))
+        END DO
+
+        IF (N < 0) CALL F2X_ERR_HANDLE(2)
+    END FUNCTION
+
+END
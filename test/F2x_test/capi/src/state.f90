@@ -0,0 +1,25 @@
+MODULE STATE
+
+    USE F2X_ERR
+
+    INTEGER, PUBLIC :: COUNTER = 0
+    REAL(8), PUBLIC :: SCALE = 2.0
+
+    PUBLIC
+
+CONTAINS
+
+    SUBROUTINE BUMP(N)
+        INTEGER, INTENT(IN) :: N
+
+        COUNTER = COUNTER + N
+    END SUBROUTINE
+
+    FUNCTION SCALED(X)
+        REAL(8), INTENT(IN) :: X
+        REAL(8) :: SCALED
+
+        SCALED = SCALE * X
+    END FUNCTION
+
+END
@@ -0,0 +1,50 @@
+MODULE MATRICES
+
+    USE F2X_ERR
+
+    PUBLIC
+
+CONTAINS
+
+    FUNCTION INDEXED_SUM(X)
+        INTEGER, INTENT(IN) :: X(:, :)
+        INTEGER(8) :: INDEXED_SUM
+        INTEGER :: I, J
+
+        INDEXED_SUM = 0
+        DO J = 1, SIZE(X, 2)
+            DO I = 1, SIZE(X, 1)
+                INDEXED_SUM = INDEXED_SUM + X(I, J) * (I + 100 * J)
+            END DO
+        END DO
+    END FUNCTION
+
+    SUBROUTINE SCALE(X, FACTOR)
+        REAL(8), INTENT(INOUT) :: X(:, :)
+        REAL(8), INTENT(IN) :: FACTOR
+
+        IF (FACTOR < 0) CALL F2X_ERR_HANDLE(3)
+        X = FACTOR * X
+    END SUBROUTINE
+
+    SUBROUTINE FILL_INDEX(X)
+        INTEGER, INTENT(OUT) :: X(:, :)
+        INTEGER :: I, J
+
+        DO J = 1, SIZE(X, 2)
+            DO I = 1, SIZE(X, 1)
+                X(I, J) = I + 100 * J
+            END DO
+        END DO
+    END SUBROUTINE
+
+    SUBROUTINE GROW(X, N)
+        REAL(8), ALLOCATABLE, INTENT(INOUT) :: X(:)
+        INTEGER, INTENT(IN) :: N
+
+        IF (ALLOCATED(X)) DEALLOCATE(X)
+        ALLOCATE(X(N))
+        X = 0
+    END SUBROUTINE
+
+END
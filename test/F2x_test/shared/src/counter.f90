@@ -0,0 +1,24 @@
+MODULE COUNTER
+
+    USE F2X_ERR
+
+    INTEGER :: TOTAL = 0
+
+CONTAINS
+
+    SUBROUTINE INCREMENT(N)
+        INTEGER, INTENT(IN) :: N
+
+        IF (N < 0) THEN
+            CALL F2X_ERR_HANDLE(5)
+        END IF
+        TOTAL = TOTAL + N
+    END SUBROUTINE
+
+    FUNCTION CURRENT()
+        INTEGER :: CURRENT
+
+        CURRENT = TOTAL
+    END FUNCTION
+
+END
@@ -0,0 +1,13 @@
+MODULE REPORT
+
+    USE COUNTER
+
+CONTAINS
+
+    FUNCTION DOUBLE_TOTAL()
+        INTEGER :: DOUBLE_TOTAL
+
+        DOUBLE_TOTAL = 2 * TOTAL
+    END FUNCTION
+
+END
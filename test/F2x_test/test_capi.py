@@ -0,0 +1,71 @@
+import types
+
+import numpy
+import pytest
+
+from F2x_test.capi.lib import scalars_glue as ctypes_scalars
+from F2x_test.capi.lib import state_glue as ctypes_state
+from F2x_test.capi.stubs import scalars_glue as capi_scalars
+from F2x_test.capi.stubs import state_glue as capi_state
+
+
+def test_capi_stubs_loaded():
+    assert capi_scalars.AXPY(2.0, 3.0, 1.0) == 7.0
+    assert isinstance(capi_scalars.AXPY, types.BuiltinFunctionType)
+    assert isinstance(ctypes_scalars.AXPY, types.FunctionType)
+
+
+@pytest.mark.parametrize('state', [ctypes_state, capi_state])
+def test_capi_module_variables(state):
+    state.globals.SCALE = 2.0
+    assert state.SCALED(1.5) == 3.0
+
+    counter = state.globals.COUNTER
+    state.BUMP(3)
+    assert state.globals.COUNTER == counter + 3
+
+
+@pytest.mark.parametrize('scalars', [ctypes_scalars, capi_scalars])
+def test_capi_results(scalars):
+    assert scalars.ADD_INTEGERS(40, 2) == 42
+    assert scalars.AXPY(2.0, 3.0, 1.5) == 7.5
+    assert scalars.AXPY(Y=1.5, A=2.0, X=3.0) == 7.5
+    assert scalars.IS_POSITIVE(1.0) is True
+    assert scalars.IS_POSITIVE(-1.0) is False
+    assert scalars.SPLIT_REAL(3.25) == (3, 0.25)
+    assert scalars.DOUBLE_INPLACE(2.5) == 5.0
+    assert scalars.CHECKED_SQRT(4.0) == 2.0
+
+
+def test_capi_errors():
+    with pytest.raises(capi_scalars.F2xError):
+        capi_scalars.CHECKED_SQRT(-1.0)
+    assert capi_scalars.CHECKED_SQRT(9.0) == 3.0
+
+    with pytest.raises(TypeError):
+        capi_scalars.AXPY(1.0, 2.0)
+    with pytest.raises(TypeError):
+        capi_scalars.AXPY(1.0, 2.0, Z=3.0)
+    with pytest.raises(TypeError):
+        capi_scalars.ADD_INTEGERS(1, "2")
+
+
+@pytest.mark.parametrize('scalars', [ctypes_scalars, capi_scalars])
+def test_batch_results(scalars):
+    result = scalars.ADD_INTEGERS.batch([1, 2, 3], 10)
+    assert result.dtype == numpy.int32
+    assert result.tolist() == [11, 12, 13]
+
+    x = numpy.array([[-1.0, 2.0], [0.0, 0.5]])
+    assert scalars.IS_POSITIVE.batch(x).tolist() == [[False, True], [False, True]]
+    assert scalars.IS_POSITIVE.batch([]).shape == (0, )
+
+    assert not hasattr(scalars.AXPY, 'batch')
+
+
+def test_batch_matches_loop():
+    a = numpy.arange(1000, dtype=numpy.int32)
+    b = numpy.ones_like(a)
+
+    expected = [ctypes_scalars.ADD_INTEGERS(int(x), int(y)) for x, y in zip(a, b)]
+    assert ctypes_scalars.ADD_INTEGERS.batch(a, b).tolist() == expected
@@ -0,0 +1,83 @@
+import logging
+import os
+import shutil
+
+import numpy
+import pytest
+
+from F2x.runtime import argp
+from F2x.runtime.wrapper import F2xWrapper
+from F2x_test.cfi.lib import glue, matrices_cfi as matrices
+
+
+def _indexed_sum(x):
+    i, j = numpy.indices(x.shape) + 1
+    return int((x * (i + 100 * j)).sum())
+
+
+@pytest.mark.parametrize('view', [
+    lambda x: x,
+    lambda x: numpy.asfortranarray(x),
+    lambda x: x[::2, 1:],
+    lambda x: x.T[::-1],
+])
+def test_cfi_strided_input(view):
+    x = view(numpy.arange(48, dtype=numpy.int32).reshape(6, 8))
+    glue.copy_events.clear()
+
+    assert matrices.INDEXED_SUM(x) == _indexed_sum(x)
+    assert glue.copy_events['INDEXED_SUM.X'] == 0
+
+
+def test_cfi_inplace():
+    x = numpy.ones((4, 6))
+    view = x[1:, ::3]
+
+    assert matrices.SCALE(view, 2.5) is view
+    assert (x[1:, ::3] == 2.5).all()
+    assert x.sum() == 24 - 6 + 6 * 2.5
+
+
+def test_cfi_conversion():
+    glue.copy_events.clear()
+    assert matrices.INDEXED_SUM([[1, 2], [3, 4]]) == _indexed_sum(numpy.array([[1, 2], [3, 4]]))
+    assert glue.copy_events['INDEXED_SUM.X'] == 1
+
+    matrices.strict_arrays = True
+    try:
+        with pytest.raises(matrices.F2xCopyError):
+            matrices.INDEXED_SUM(numpy.zeros((2, 2)))
+    finally:
+        matrices.strict_arrays = None
+
+    with pytest.raises(ValueError):
+        matrices.INDEXED_SUM(numpy.zeros(4, dtype=numpy.int32))
+
+
+def test_cfi_error():
+    with pytest.raises(matrices.F2xError) as error:
+        matrices.SCALE(numpy.ones((2, 2)), -1.0)
+    assert error.value.code == 3
+
+
+def test_cfi_intent_out():
+    x = numpy.zeros((3, 8), dtype=numpy.int32)
+    view = x[:, ::2]
+
+    assert matrices.FILL_INDEX(view) is view
+    i, j = numpy.indices(view.shape) + 1
+    assert (x[:, ::2] == i + 100 * j).all()
+    assert (x[:, 1::2] == 0).all()
+
+
+def test_cfi_unsupported(tmpdir, caplog):
+    assert not hasattr(matrices, 'GROW')
+
+    source = str(tmpdir.join('matrices.f90'))
+    shutil.copy(os.path.join(os.path.dirname(__file__), 'cfi', 'src', 'matrices.f90'), source)
+    args = argp.get_args_parser().parse_args(['-t', '@cfi/_cfi.py.t', source])
+
+    with caplog.at_level(logging.WARNING, logger='F2x'):
+        F2xWrapper(args, logging.getLogger('F2x_test.cfi')).run()
+
+    assert "skips GROW in {0}, it does not support argument X (ALLOCATABLE array).".format(source) in caplog.text
@@ -0,0 +1,27 @@
+import pytest
+
+from F2x_test.capi.codes import scalars_glue as codes_scalars
+
+
+def test_codes_results():
+    assert codes_scalars.ADD_INTEGERS(40, 2) == 42
+    assert codes_scalars.AXPY(2.0, 3.0, 1.5) == 7.5
+    assert codes_scalars.IS_POSITIVE(1.0) is True
+    assert codes_scalars.IS_POSITIVE(-1.0) is False
+    assert codes_scalars.SPLIT_REAL(3.25) == (3, 0.25)
+    assert codes_scalars.DOUBLE_INPLACE(2.5) == 5.0
+    assert codes_scalars.CHECKED_SQRT(4.0) == 2.0
+    assert codes_scalars.ADD_INTEGERS.batch([1, 2, 3], 10).tolist() == [11, 12, 13]
+
+
+def test_codes_errors():
+    with pytest.raises(codes_scalars.F2xError) as error:
+        codes_scalars.CHECKED_SQRT(-1.0)
+    assert error.value.code == 1
+    assert codes_scalars.CHECKED_SQRT(9.0) == 3.0
+
+    with pytest.raises(codes_scalars.F2xError) as error:
+        codes_scalars.SLOW_SUM(-2)
+    assert error.value.code == 2
+    assert codes_scalars.SLOW_SUM(1) == 1.0
+
@@ -0,0 +1,194 @@
+# -*- encoding: utf-8 -*-
+#
+# Copyright 2018 German Aerospace Center (DLR)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import glob
+import asyncio
+import logging
+import os
+import socket
+import threading
+
+import pytest
+
+from F2x.distutils.command.build_src import _is_bundled_template_dir
+from F2x.runtime import daemon
+from F2x.runtime.main import main as f2x_main
+from F2x.template import package_dir as template_package_dir
+
+
+BROKEN_SOURCE = u"""
+MODULE broken
+    INTEGER ::
+END MODULE
+"""
+
+
+class _ChunkedSocket(object):
+    """ Returns the data in small chunks to simulate short reads. """
+
+    def __init__(self, data, chunk_size=3):
+        self.data = data
+        self.chunk_size = chunk_size
+
+    def recv(self, size):
+        data, self.data = self.data[:min(size, self.chunk_size)], self.data[min(size, self.chunk_size):]
+        return data
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super(_ListHandler, self).__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage()))
+
+
+def _serve_once(socket_path, messages):
+    """ Accept a single connection, send *messages* as frames (or raw if they are bytes) and close the connection. """
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(1)
+
+    def serve():
+        conn, _ = server.accept()
+        daemon.recv_frame(conn)
+        for message in messages:
+            if isinstance(message, bytes):
+                conn.sendall(message)
+            else:
+                daemon.send_frame(conn, message)
+        conn.close()
+        server.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_frame_round_trip():
+    messages = [{'type': 'request', 'id': 1, 'args': ['-t', u'@bindc/_glue.f90.t', u'ä.f90']}, {}]
+    data = b''.join(map(daemon.encode_frame, messages))
+
+    sock = _ChunkedSocket(data)
+    assert [daemon.recv_frame(sock) for _ in messages] == messages
+    assert daemon.recv_frame(sock) is None
+
+
+@pytest.mark.parametrize('size', [2, 4, 10])
+def test_frame_truncated(size):
+    data = daemon.encode_frame({'type': 'log', 'message': 'truncated'})
+
+    with pytest.raises(ConnectionError):
+        daemon.recv_frame(_ChunkedSocket(data[:size]))
+
+
+def test_frame_oversized(monkeypatch):
+    monkeypatch.setattr(daemon, '_MAX_FRAME_SIZE', 16)
+
+    with pytest.raises(ValueError):
+        daemon.encode_frame({'message': 'more than sixteen bytes'})
+
+    # The payload is not even read.
+    with pytest.raises(ValueError):
+        daemon.recv_frame(_ChunkedSocket(daemon._FRAME_HEADER.pack(17)))
+
+
+def test_client_closed(tmpdir):
+    socket_path = str(tmpdir.join('daemon.sock'))
+    thread = _serve_once(socket_path, [])
+
+    client = daemon.F2xClient(socket_path)
+    with pytest.raises(ConnectionError):
+        client.invoke(['source.f90'])
+    client.close()
+    thread.join()
+
+
+def test_client_result(tmpdir):
+    socket_path = str(tmpdir.join('daemon.sock'))
+    thread = _serve_once(socket_path, [
+        {'type': 'log', 'id': 1, 'level': logging.WARNING, 'name': 'F2x', 'process': 'worker', 'message': 'careful'},
+        {'type': 'result', 'id': 1, 'exit_code': 1, 'error': 'RuntimeError: failed', 'run_time': 0.0},
+    ])
+
+    log = logging.Logger('F2x_test.daemon')
+    handler = _ListHandler()
+    log.addHandler(handler)
+
+    client = daemon.F2xClient(socket_path, log=log)
+    assert client.invoke(['source.f90']) == 1
+    client.close()
+    thread.join()
+
+    assert handler.records == [(logging.WARNING, '[worker] careful'),
+                               (logging.ERROR, 'Request 1 failed: RuntimeError: failed')]
+
+
+def test_async_client_closed(tmpdir):
+    socket_path = str(tmpdir.join('daemon.sock'))
+    thread = _serve_once(socket_path, [])
+
+    async def invoke():
+        client = await daemon.AsyncF2xClient.connect(socket_path)
+
+        # The first request is pending when the connection is closed, the second one is sent afterwards.
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await asyncio.wait_for(client.invoke(['source.f90']), 10.0)
+
+        await client.close()
+
+    asyncio.run(invoke())
+    thread.join()
+
+
+def test_async_client_oversized(tmpdir):
+    socket_path = str(tmpdir.join('daemon.sock'))
+    thread = _serve_once(socket_path, [daemon._FRAME_HEADER.pack(daemon._MAX_FRAME_SIZE + 1)])
+
+    async def invoke():
+        client = await daemon.AsyncF2xClient.connect(socket_path)
+        with pytest.raises(ValueError):
+            await asyncio.wait_for(client.invoke(['source.f90']), 10.0)
+
+    asyncio.run(invoke())
+    thread.join()
+
+
+def test_parse_error(tmpdir):
+    source = tmpdir.join('broken.f90')
+    source.write(BROKEN_SOURCE)
+    args = ['-t', '@bindc/_glue.f90.t', str(source)]
+
+    with pytest.raises(SystemExit) as e:
+        f2x_main(args)
+    assert e.value.code == 1
+
+    socket_path = str(tmpdir.join('daemon.sock'))
+    server = daemon.F2xDaemon(socket_path, None, 1, idle_timeout=0.5)
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+
+    client = daemon.F2xClient(socket_path)
+    assert client.invoke(args) == 1
+    client.close()
+    thread.join()
+
+
+def test_bundled_template_dir(tmpdir):
+    assert _is_bundled_template_dir(None)
+    assert _is_bundled_template_dir(os.path.join(template_package_dir, 'ctypes'))
+    assert not _is_bundled_template_dir(str(tmpdir))
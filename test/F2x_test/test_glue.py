@@ -0,0 +1,69 @@
+# -*- encoding: utf-8 -*-
+#
+# Copyright 2018 German Aerospace Center (DLR)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import ctypes
+
+import numpy
+import pytest
+
+from F2x.template.ctypes.lib.glue import F2xCopyError, array_from_pointer, as_fortran_array, copy_events
+
+
+def _legacy_array_from_pointer(ctype, dims, ptr):
+    """ The original conversion via a ctypes array type, kept as reference. """
+    array_size = 1
+    for size in dims:
+        array_size *= size
+
+    array_type = ctype * array_size
+    carray = array_type.from_address(ctypes.addressof(ptr.contents))
+    return numpy.ndarray(dims, ctype, carray, order='F')
+
+
+def _fortran_array(ctype, dims):
+    data = numpy.asfortranarray(numpy.arange(numpy.prod(dims)).reshape(dims, order='F'), dtype=ctype)
+    return data, data.ctypes.data_as(ctypes.POINTER(ctype))
+
+
+@pytest.mark.parametrize('ctype, dims', [(ctypes.c_double, [5]), (ctypes.c_int32, [2, 3, 4])])
+def test_array_from_pointer(ctype, dims):
+    data, ptr = _fortran_array(ctype, dims)
+    array = array_from_pointer(ctype, dims, ptr)
+
+    assert array.shape == tuple(dims)
+    assert array.flags.f_contiguous
+    assert numpy.array_equal(array, _legacy_array_from_pointer(ctype, dims, ptr))
+
+    array[(0, ) * len(dims)] = -1
+    assert data[(0, ) * len(dims)] == -1
+
+
+def test_array_from_null_pointer():
+    with pytest.raises(ValueError):
+        array_from_pointer(ctypes.c_double, [3], ctypes.POINTER(ctypes.c_double)())
+
+
+def test_as_fortran_array():
+    value = numpy.zeros((3, 4), dtype=numpy.float64, order='F')
+    assert as_fortran_array(value, ctypes.c_double, 'TEST.F') is value
+    assert copy_events['TEST.F'] == 0
+
+    result = as_fortran_array(value.T, ctypes.c_double, 'TEST.C')
+    assert result is not value and result.flags.f_contiguous
+    assert copy_events['TEST.C'] == 1
+
+    with pytest.raises(F2xCopyError):
+        as_fortran_array(value, ctypes.c_float, 'TEST.DTYPE', strict=True)
+    assert copy_events['TEST.DTYPE'] == 0
@@ -0,0 +1,75 @@
+# -*- encoding: utf-8 -*-
+#
+# Copyright 2018 German Aerospace Center (DLR)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import glob
+import os
+
+import pytest
+
+from F2x.parser.plyplus import source as plyplus_source
+
+
+GRAMMAR = u"""
+start: item+ ;
+item: NAME | NUMBER ;
+NAME: '[a-z]+' ;
+NUMBER: '[0-9]+' ;
+WS: '[ \\t\\n]+' (%ignore) ;
+"""
+
+
+@pytest.fixture
+def grammar_file(tmpdir, monkeypatch):
+    monkeypatch.setattr(plyplus_source, 'grammar_cache', {})
+    grammar_file = tmpdir.join('tiny.g')
+    grammar_file.write(GRAMMAR)
+    return str(grammar_file)
+
+
+def _load(grammar_file, cache_dir):
+    plyplus_source.grammar_cache.clear()
+    grammar = plyplus_source.load_grammar(grammar_file, cache_dir)
+    assert len(grammar.parse(u'abc 12 d').tail) == 3
+    return grammar
+
+
+def test_grammar_cache(grammar_file, tmpdir, monkeypatch):
+    cache_dir = str(tmpdir.join('cache'))
+    _load(grammar_file, cache_dir)
+    table_files = os.listdir(cache_dir)
+    assert len(table_files) == 1
+
+    def generate(*args, **kwargs):
+        raise AssertionError("LALR tables were generated again.")
+
+    monkeypatch.setattr(plyplus_source.yacc, 'LRGeneratedTable', generate)
+    _load(grammar_file, cache_dir)
+    assert os.listdir(cache_dir) == table_files
+
+
+def test_grammar_cache_broken(grammar_file, tmpdir):
+    cache_dir = str(tmpdir.join('cache'))
+    _load(grammar_file, cache_dir)
+    table_filename, = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)]
+    with open(table_filename, 'rb') as table_file:
+        table = table_file.read()
+
+    with open(table_filename, 'wb') as table_file:
+        table_file.write(table[:len(table) // 2])
+    _load(grammar_file, cache_dir)
+
+    assert os.listdir(cache_dir) == [os.path.basename(table_filename)]
+    with open(table_filename, 'rb') as table_file:
+        assert table_file.read() == table
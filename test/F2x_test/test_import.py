@@ -0,0 +1,44 @@
+import subprocess
+import sys
+
+
+_IMPORT_CHECK = """
+from F2x_test.capi.stubs import scalars_glue as scalars
+from F2x_test.ufunc.lib import thermo_glue as thermo
+
+bound = [name for name in scalars.library._prototypes if name in vars(scalars.library)]
+print(len(bound), scalars.library.loaded, type(scalars.AXPY).__name__)
+
+from F2x_test.capi.stubs.scalars_glue import AXPY
+print(AXPY(2.0, 3.0, 1.0), scalars.library.loaded, type(scalars.AXPY).__name__)
+
+print(thermo.library.loaded, type(thermo.CUBE).__name__, thermo.library.loaded)
+"""
+
+
+def test_lazy_import():
+    output = subprocess.run([sys.executable, '-c', _IMPORT_CHECK], check=True, capture_output=True, text=True)
+    imported, called, combined = output.stdout.splitlines()
+
+    assert imported.split() == ['0', 'False', 'function']
+    assert called.split() == ['7.0', 'True', 'builtin_function_or_method']
+    assert combined.split() == ['False', 'ufunc', 'True']
+
+
+_TYPES_CHECK = """
+from F2x_test.types.lib import swarm_glue as swarm
+from F2x_test.capi.stubs import state_glue as state
+
+print(swarm.library.loaded, state.library.loaded, hasattr(swarm, 'NO_SUCH_NAME'), swarm.library.loaded)
+
+flock = swarm.FLOCK()
+print(swarm.library.loaded, state.library.loaded, state.globals.COUNTER, state.library.loaded)
+"""
+
+
+def test_lazy_import_types():
+    output = subprocess.run([sys.executable, '-c', _TYPES_CHECK], check=True, capture_output=True, text=True)
+    imported, used = output.stdout.splitlines()
+
+    assert imported.split() == ['False', 'False', 'False', 'False']
+    assert used.split() == ['True', 'False', '0', 'True']
@@ -1,4 +1,7 @@
-from F2x_test.interface.lib import sub_call_glue as sub_call
+import numpy
+import pytest
+
+from F2x_test.interface.lib import arrays_glue as arrays, glue, sub_call_glue as sub_call
 
 
 def test_subcall_input_args():
@@ -7,3 +10,25 @@ def test_subcall_input_args():
 
 def test_subcall_return_integer():
     assert sub_call.RETURN_INTEGER() == 42
+
+
+def test_array_input_copies():
+    intarr = numpy.arange(5, dtype=numpy.int32)
+    glue.copy_events.clear()
+    arrays.ARRAY_INPUT(intarr)
+    assert glue.copy_events['ARRAY_INPUT.INTARR'] == 0
+
+    arrays.ARRAY_INPUT([1, 2, 3, 4, 5])
+    arrays.ARRAY_INPUT(intarr.astype(numpy.int64))
+    assert glue.copy_events['ARRAY_INPUT.INTARR'] == 2
+
+    arrays.strict_arrays = True
+    try:
+        arrays.ARRAY_INPUT(intarr)
+        with pytest.raises(arrays.F2xCopyError):
+            arrays.ARRAY_INPUT(intarr.astype(numpy.float64))
+        with pytest.raises(arrays.F2xCopyError):
+            arrays.ARRAY_INPUT(numpy.arange(10, dtype=numpy.int32)[::2])
+    finally:
+        arrays.strict_arrays = None
+    assert glue.copy_events['ARRAY_INPUT.INTARR'] == 2
@@ -0,0 +1,59 @@
+# -*- encoding: utf-8 -*-
+#
+# Copyright 2018 German Aerospace Center (DLR)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import glob
+import os
+from types import SimpleNamespace
+
+from F2x.distutils.manifest import BuildManifest
+from F2x.distutils.strategy.base import BuildStrategy
+
+
+def _build(tmpdir, f2x_options=()):
+    """ Select the sources to wrap like build_src does and 'wrap' them by writing their outputs. """
+    target_dir = str(tmpdir)
+    manifest = BuildManifest(os.path.join(target_dir, 'f2x-manifest.json'))
+    build_src = SimpleNamespace(manifest=manifest, force=False, f2x_options=list(f2x_options))
+    extension = SimpleNamespace(ext_modules=[(os.path.join(target_dir, 'source.f90'), {'output': ['source_glue.py']})],
+                                depends=[])
+
+    selected = BuildStrategy().select_wrap_sources(build_src, extension, target_dir)
+    manifest.start()
+    for _, _, output, _ in selected:
+        for output_file in output:
+            with open(output_file, 'w') as wrapped_file:
+                wrapped_file.write('# wrapped\n')
+    manifest.update()
+
+    return len(selected)
+
+
+def test_manifest(tmpdir):
+    source = tmpdir.join('source.f90')
+    source.write('MODULE SOURCE\nEND\n')
+
+    assert _build(tmpdir) == 1
+    assert _build(tmpdir) == 0
+
+    source.write('MODULE SOURCE\nINTEGER :: I\nEND\n')
+    assert _build(tmpdir) == 1
+    assert _build(tmpdir) == 0
+
+    assert _build(tmpdir, ['--declarations-only']) == 1
+    assert _build(tmpdir, ['--declarations-only']) == 0
+
+    tmpdir.join('source_glue.py').remove()
+    assert _build(tmpdir, ['--declarations-only']) == 1
+    assert _build(tmpdir, ['--declarations-only']) == 0
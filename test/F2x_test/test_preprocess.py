@@ -0,0 +1,171 @@
+# -*- encoding: utf-8 -*-
+#
+# Copyright 2018 German Aerospace Center (DLR)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import glob
+import importlib.util
+import os
+import re
+import sys
+
+from F2x.parser.plyplus import source as plyplus_source
+from F2x.parser.source import SourceFile
+from F2x.runtime import argp
+
+
+LEGACY_RULES = (
+    (u'end/function',   r'(?i)END[ \t\u000C]+FUNCTION',     r'ENDFUNCTION'),
+    (u'end/interface',  r'(?i)END[ \t\u000C]+INTERFACE',    r'ENDINTERFACE'),
+    (u'end/module',     r'(?i)END[ \t\u000C]+MODULE',       r'ENDMODULE'),
+    (u'end/procedure',  r'(?i)END[ \t\u000C]+PROCEDURE',    r'ENDPROCEDURE'),
+    (u'end/program',    r'(?i)END[ \t\u000C]+PROGRAM',      r'ENDPROGRAM'),
+    (u'end/submodule',  r'(?i)END[ \t\u000C]+SUBMODULE',    r'ENDSUBMODULE'),
+    (u'end/subroutine', r'(?i)END[ \t\u000C]+SUBROUTINE',   r'ENDSUBROUTINE'),
+    (u'end/type',       r'(?i)END[ \t\u000C]+TYPE',         r'ENDTYPE'),
+    (u'type/double precision', r'(?i)DOUBLE\s+PRECISION', r'DOUBLEPRECISION'),
+    (u'type/double complex',   r'(?i)DOUBLE\s+COMPLEX',   r'DOUBLECOMPLEX'),
+    (u'array/left',  r'\(/', '['),
+    (u'array/right', r'/\)', ']'),
+    (u'kind', r'(\d+)_(\d+|LF)', r'\1'),
+)
+
+EXTRA_SOURCE = u"""
+MODULE extra
+    DOUBLE PRECISION, PARAMETER :: PI = 3.14159_8
+CONTAINS
+    double   precision function twice(x) result(y)
+        double complex :: z
+        INTEGER :: a(3) = (/ 1, 2, 3 /)
+        z = (1.0_8, 2.0_8)
+        y = 2 * x
+    end   function
+    SUBROUTINE noop(x, &
+                    y)
+        INTEGER, INTENT(IN) :: x, &
+                               y
+        IF (x > y) THEN
+            CALL noop(y, x)
+        END IF
+    END SUBROUTINE noop
+END MODULE
+"""
+
+
+def _legacy_preprocess(src):
+    """ The original multi-pass preprocessing, kept as reference. """
+    lines = src.source.splitlines()
+    ignore = src.config.get('parser', 'ignore')
+    for index in map(int, map(str.strip, ignore.split(','))):
+        lines[index - 1] = '!F2x/ignore ' + lines[index - 1]
+
+    ln, st, info = 0, 0, None
+    while ln < len(lines):
+        line = lines[ln].strip().upper()
+        if line and line[0] != u'!':
+            if st == 0:
+                if line == u'CONTAINS':
+                    st = 1
+            elif st == 1:
+                if u'FUNCTION' in line:
+                    st, info = 2, u'FUNCTION'
+                elif u'SUBROUTINE' in line:
+                    st, info = 2, u'SUBROUTINE'
+            elif st == 2:
+                lineBefore = lines[ln - 1].strip().upper()
+                if line.startswith(u'TYPE ::'):
+                    st = 21
+                elif u'::' not in line and u'&' not in lineBefore:
+                    st = 3
+                    ln -= 1
+            elif st == 21:
+                if line.startswith(u'END') and line.endswith(u'TYPE'):
+                    st = 2
+            elif st == 3:
+                if u'END' in line and info in line:
+                    st = 1
+                else:
+                    lines[ln] = u'!F2x-exe' + lines[ln]
+        if st != 3:
+            while ln < len(lines) and lines[ln].strip().endswith('&'):
+                ln += 1
+        ln += 1
+
+    for index in src.config.options('replace'):
+        lines[int(index) - 1] = src.config.get('replace', index)
+
+    source = u'\n'.join(lines)
+    for name, pattern, repl in LEGACY_RULES:
+        source, count = re.subn(pattern, repl, source)
+
+    if not source.endswith('\n'):
+        source += '\n'
+
+    src.pre_source_lines = list(map(str.rstrip, source.split('\n')))
+    return source
+
+
+def _make_source(tmpdir, copies):
+    sources = glob.glob(os.path.join(os.path.dirname(__file__), 'interface', 'src', '*.f90'))
+    text = u'\n'.join(open(filename).read() for filename in sources) + EXTRA_SOURCE
+
+    filename = os.path.join(str(tmpdir), 'large.f90')
+    with open(filename, 'w') as source_file:
+        source_file.write(text * copies)
+
+    src = SourceFile(filename, argp.get_args_parser().parse_args([filename]))
+    src.read()
+    src.config.set('parser', 'ignore', '3, 7')
+    src.config.add_section('replace')
+    src.config.set('replace', '5', '    ! replaced')
+    return src
+
+
+def test_preprocess_equivalent(tmpdir):
+    src = _make_source(tmpdir, 3)
+    expected = _legacy_preprocess(src)
+    expected_lines = src.pre_source_lines
+
+    src.preprocess()
+    assert src.source == expected
+    assert src.pre_source_lines == expected_lines
+
+
+def test_preprocess_declarations_only(tmpdir):
+    src = _make_source(tmpdir, 1)
+    src.config.set('parser', 'declarations_only', 'True')
+    src.preprocess()
+
+    parsed_lines = src.source.split('\n')
+    assert not any(line.startswith('!F2x-exe') for line in parsed_lines)
+    assert len(parsed_lines) < len(src.pre_source_lines)
+    for line, original_line in enumerate(src.line_map, 1):
+        assert parsed_lines[line - 1].rstrip() == src.pre_source_lines[original_line - 1]
+        assert src.original_line(line) == original_line
+
+
+def test_tree_class_key(tmpdir, monkeypatch):
+    module_file = tmpdir.join('custom_tree.py')
+    module_file.write('from F2x.parser.plyplus.tree import Module\n\n\nclass CustomModule(Module):\n    pass\n')
+
+    spec = importlib.util.spec_from_file_location('custom_tree', str(module_file))
+    custom_tree = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(custom_tree)
+    monkeypatch.setitem(sys.modules, 'custom_tree', custom_tree)
+
+    key = plyplus_source._tree_class_key(custom_tree.CustomModule)
+    assert key == plyplus_source._tree_class_key(custom_tree.CustomModule)
+
+    module_file.write('from F2x.parser.plyplus.tree import Module\n\n\nclass CustomModule(Module):\n    fails = True\n')
+    monkeypatch.setattr(plyplus_source, '_module_hashes', {})
+    assert plyplus_source._tree_class_key(custom_tree.CustomModule) != key
@@ -0,0 +1,50 @@
+import os
+import pstats
+import subprocess
+import sys
+
+from F2x_test.capi.lib import scalars_glue as scalars
+from F2x_test.interface.lib import arrays_glue as arrays
+
+
+def test_profile_stats(tmp_path):
+    scalars.profile.reset()
+    scalars.enable_profiling()
+    try:
+        for _ in range(100):
+            scalars.AXPY(2.0, 3.0, 1.0)
+        scalars.ADD_INTEGERS.batch([1, 2, 3], 10)
+    finally:
+        scalars.disable_profiling()
+    scalars.AXPY(2.0, 3.0, 1.0)
+
+    stats = {row[0]: row[1:] for row in scalars.profile.stats()}
+    calls, total, marshal, native, copied = stats['AXPY']
+    assert calls == 100
+    assert 0 < native < total
+    assert marshal == total - native
+    assert stats['ADD_INTEGERS.batch'][0] == 1
+    assert 'AXPY' in scalars.profile.table()
+
+    scalars.profile.dump(tmp_path / 'scalars.prof')
+    profile = pstats.Stats(str(tmp_path / 'scalars.prof'))
+    assert profile.total_calls > 100
+
+
+def test_profile_copied():
+    arrays.profile.reset()
+    arrays.enable_profiling()
+    try:
+        arrays.ARRAY_INPUT([1, 2, 3, 4, 5])
+    finally:
+        arrays.disable_profiling()
+
+    assert arrays.profile.copied['ARRAY_INPUT'] == 5 * 4
+
+
+def test_profile_environment():
+    code = 'from F2x_test.capi.lib import scalars_glue as s; s.AXPY(1.0, 2.0, 3.0); print(s.profile.calls["AXPY"])'
+    output = subprocess.run([sys.executable, '-c', code], env=dict(os.environ, F2X_PROFILE='1'),
+                            check=True, capture_output=True, text=True)
+    assert output.stdout.strip() == '1'
+
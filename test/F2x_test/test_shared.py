@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+from F2x_test.shared.lib import counter_glue as counter, report_glue as report
+
+
+def test_shared_library():
+    lib_dir = os.path.dirname(counter.__file__)
+    assert counter.library_path == report.library_path
+    assert [name for name in os.listdir(lib_dir) if name.startswith('lib')] == [counter.library_name]
+
+    # Both modules see the same FORTRAN module data.
+    start = counter.CURRENT()
+    counter.INCREMENT(3)
+    counter.INCREMENT(4)
+    assert counter.CURRENT() == start + 7
+    assert report.DOUBLE_TOTAL() == 2 * counter.CURRENT()
+
+
+def test_shared_error_state():
+    with pytest.raises(counter.F2xError) as error:
+        counter.INCREMENT(-1)
+    assert error.value.code == 5
+
+    assert report.DOUBLE_TOTAL() == 2 * counter.CURRENT()
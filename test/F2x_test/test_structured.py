@@ -0,0 +1,98 @@
+import numpy
+import pytest
+
+from F2x_test.types.lib import swarm_glue as swarm
+
+
+def test_layout():
+    assert swarm.BODY._packed.same_layout
+    assert not swarm.MARKER._packed.same_layout
+    assert swarm.FLOCK._packed.same_layout is False
+
+
+def test_view():
+    flock = swarm.FLOCK()
+    bodies = flock.BODIES.view()
+
+    assert bodies.shape == (1000, )
+    assert bodies.dtype == swarm.BODY._packed.dtype
+    assert bodies is flock.BODIES.view()
+
+    bodies['ID'] = numpy.arange(1000)
+    bodies['X'] = 1.0
+    bodies['V'] = numpy.linspace(0.0, 1.0, 1000)
+    bodies['MASS'] = 0.5
+    swarm.ADVANCE(flock, 2.0)
+
+    assert (bodies['X'] == 1.0 + 2.0 * numpy.linspace(0.0, 1.0, 1000)).all()
+    assert flock.BODIES[10].ID == 10
+    assert flock.BODIES[10].X == bodies[10]['X']
+    assert swarm.TOTAL_MASS(flock) == 500.0
+
+
+def test_view_allocatable():
+    flock = swarm.FLOCK()
+    flock.BODIES.view()['MASS'] = 0.0
+    assert flock.EXTRA.view().shape == (0, )
+
+    flock.EXTRA.allocate(20)
+    extra = flock.EXTRA.view()
+    extra['MASS'] = 2.0
+    assert extra.shape == (20, )
+    assert swarm.TOTAL_MASS(flock) == 40.0
+
+
+def test_view_allocated_by_fortran():
+    flock = swarm.FLOCK()
+    assert len(flock.EXTRA) == 0
+
+    swarm.GROW_EXTRA(flock, 7)
+    extra = flock.EXTRA.view()
+    assert len(flock.EXTRA) == 7
+    assert extra.shape == (7, )
+    assert (extra['MASS'] == 1.0).all()
+
+
+def test_view_pointer():
+    flock = swarm.FLOCK()
+    assert flock.TRACKED.view().shape == (0, )
+
+    swarm.TRACK(flock, 1)
+    tracked = flock.TRACKED.view()
+    assert tracked.shape == (1000, )
+    tracked['ID'] = 42
+    assert flock.BODIES[999].ID == 42
+
+    swarm.TRACK(flock, 2)
+    with pytest.raises(TypeError):
+        flock.TRACKED.view()
+
+
+def test_view_unsupported():
+    with pytest.raises(TypeError):
+        swarm.FLOCK().MARKERS.view()
+
+
+def test_view_reallocated():
+    flock = swarm.FLOCK()
+    flock.EXTRA.allocate(5)
+    extra = flock.EXTRA.view()
+    extra['MASS'] = 2.0
+
+    swarm.RENEW_EXTRA(flock)
+    renewed = flock.EXTRA.view()
+    assert renewed is not extra
+    assert (renewed['MASS'] == 2.0).all()
+    assert renewed is flock.EXTRA.view()
+
+
+def test_numeric_view_reallocated():
+    trail = swarm.TRAIL()
+    trail.POINTS = numpy.arange(4.0)
+    points = trail.POINTS
+    assert points is trail.POINTS
+
+    swarm.RENEW_TRAIL(trail)
+    renewed = trail.POINTS
+    assert renewed is not points
+    assert (renewed == numpy.arange(4.0)).all()
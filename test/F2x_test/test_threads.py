@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from F2x_test.capi.lib import scalars_glue as scalars
+
+
+def _slow_sum_or_error(n):
+    try:
+        return scalars.SLOW_SUM(n)
+    except scalars.F2xError as error:
+        return error.code
+
+
+def test_threads_error_state():
+    values = [100000 * (-1) ** i for i in range(64)]
+    expected = [_slow_sum_or_error(n) for n in values]
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(_slow_sum_or_error, values))
+
+    assert results == expected
+    assert results[1] == 2
+    assert scalars.SLOW_SUM(10) == pytest.approx(sum(i ** 0.5 for i in range(1, 11)))
+
+
+def test_threads_results():
+    values = [200000 + i for i in range(8)]
+    expected = [scalars.SLOW_SUM(n) for n in values]
+
+    with ThreadPoolExecutor(4) as executor:
+        assert list(executor.map(scalars.SLOW_SUM, values)) == expected
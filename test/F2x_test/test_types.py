@@ -0,0 +1,65 @@
+import numpy
+import pytest
+
+from F2x_test.types.lib import particles_glue as particles, swarm_glue as swarm
+
+
+def _particles(count):
+    return [
+        particles.PARTICLE(ID=i, X=0.5 * i, Y=-1.0, Z=2.0 * i, ACTIVE=bool(i % 2), STEPS=i, LABEL=f"P{i}")
+        for i in range(count)
+    ]
+
+
+def test_pack():
+    values = particles.PARTICLE.pack(_particles(100))
+
+    assert values.dtype.names == ('ID', 'X', 'Y', 'Z', 'MASS', 'ACTIVE', 'STEPS')
+    assert values.dtype['MASS'] == numpy.float32
+    assert (values['ID'] == numpy.arange(100)).all()
+    assert (values['X'] == 0.5 * numpy.arange(100)).all()
+    assert (values['Y'] == -1.0).all()
+    assert (values['ACTIVE'] == numpy.arange(100) % 2).all()
+
+
+def test_unpack():
+    instances = _particles(50)
+    values = particles.PARTICLE.pack(instances)
+    values['X'] += 10.0
+    values['MASS'] = 1.5
+    values['ACTIVE'] = True
+
+    particles.PARTICLE.unpack(instances, values)
+    assert [p.X for p in instances] == [10.0 + 0.5 * i for i in range(50)]
+    assert all(p.ACTIVE for p in instances)
+    assert (particles.PARTICLE.pack(instances)['MASS'] == 1.5).all()
+
+    particles.MOVE(instances[3], 1.0)
+    assert particles.PARTICLE.pack(instances[3:4])[0]['STEPS'] == 4
+
+    with pytest.raises(ValueError):
+        particles.PARTICLE.unpack(instances, values[:10])
+    with pytest.raises(TypeError):
+        particles.PARTICLE.pack([object()])
+
+
+def test_copy_from():
+    source, target = _particles(2)
+    particles.PARTICLE.unpack([source], numpy.array([(7, 1.0, 2.0, 3.0, 4.5, True, 9)],
+                                                    particles.PARTICLE._packed.dtype))
+
+    target.copy_from(source)
+    values = particles.PARTICLE.pack([target])[0]
+    assert tuple(values) == (7, 1.0, 2.0, 3.0, 4.5, True, 9)
+    assert target.LABEL == "P0"
+
+
+def test_wrapper_slots():
+    flock = swarm.FLOCK()
+    assert not hasattr(flock, '__dict__')
+    assert flock._dims is None
+    assert [name for name, _ in swarm.FLOCK.fields()] == ['COUNT', 'BODIES', 'EXTRA', 'MARKERS', 'TRACKED']
+
+    flock.EXTRA.allocate(3)
+    assert flock.dims == {'BODIES': [1000], 'EXTRA': [3], 'MARKERS': [10], 'TRACKED': [0]}
+    assert not hasattr(flock.BODIES[0], '__dict__')
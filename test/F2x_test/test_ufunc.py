@@ -0,0 +1,51 @@
+import numpy
+import pytest
+
+from F2x_test.ufunc.lib import thermo_glue as thermo
+
+
+GAS_CONSTANT = 287.05
+
+
+def test_ufunc_broadcast():
+    rho = numpy.array([[1.0], [2.0]])
+    t = numpy.array([250.0, 300.0, 350.0])
+
+    assert numpy.allclose(thermo.PRESSURE(rho, t), rho * GAS_CONSTANT * t)
+    assert isinstance(thermo.PRESSURE, numpy.ufunc)
+    assert thermo.PRESSURE(1.0, 300.0) == pytest.approx(300.0 * GAS_CONSTANT)
+
+    out = numpy.empty((2, 3))
+    assert thermo.PRESSURE(rho, t, out=out) is out
+    assert numpy.allclose(out, rho * GAS_CONSTANT * t)
+
+
+def test_ufunc_logical():
+    result = thermo.IS_SUPERSONIC([100.0, -400.0, 340.0], 340.0)
+    assert result.dtype == numpy.bool_
+    assert result.tolist() == [False, True, False]
+
+
+def test_ufunc_outputs():
+    r, phi = thermo.POLAR(numpy.array([1.0, 0.0, -2.0]), numpy.array([0.0, 1.0, 0.0]))
+    assert numpy.allclose(r, [1.0, 1.0, 2.0])
+    assert numpy.allclose(phi, [0.0, numpy.pi / 2, numpy.pi])
+
+
+def test_ufunc_generic():
+    assert thermo.CUBE.ntypes == 3
+    assert thermo.CUBE(numpy.arange(4, dtype=numpy.int32)).tolist() == [0, 1, 8, 27]
+    assert thermo.CUBE(numpy.float32(2.0)).dtype == numpy.float32
+    assert thermo.CUBE(numpy.array([1.5])).dtype == numpy.float64
+    assert thermo.CUBE_R8(1.5) == 1.5 ** 3
+
+
+def test_ufunc_error():
+    assert numpy.allclose(thermo.TEMPERATURE(GAS_CONSTANT * 300.0, [1.0, 2.0]), [300.0, 150.0])
+
+    with pytest.raises(thermo.F2xError) as error:
+        thermo.TEMPERATURE(1e5, [1.0, 0.0])
+    assert error.value.code == 7
+
+    assert not isinstance(thermo.NOT_ELEMENTAL, numpy.ufunc)
+    assert thermo.NOT_ELEMENTAL(2.0) == 2.0
@@ -0,0 +1,94 @@
+# -*- encoding: utf-8 -*-
+#
+# Copyright 2018 German Aerospace Center (DLR)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import glob
+import glob
+import logging
+import os
+import shutil
+
+from F2x.runtime import argp
+from F2x.runtime.wrapper import F2xWrapper
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super(_ListHandler, self).__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage()))
+
+
+def _wrap(sources, jobs):
+    log = logging.Logger('F2x_test.wrapper', logging.DEBUG)
+    handler = _ListHandler()
+    log.addHandler(handler)
+
+    args = argp.get_args_parser().parse_args(
+        ['-t', '@bindc/_glue.f90.t', '-t', '@ctypes/_glue.py.t', '-j', str(jobs)] + sources)
+    wrapper = F2xWrapper(args, log)
+    wrapper.run()
+
+    outputs = {}
+    for source in sources:
+        basename, _ = os.path.splitext(source)
+        for output_filename in glob.glob(basename + '_glue.*'):
+            with open(output_filename) as output_file:
+                outputs[output_filename] = output_file.read()
+            os.remove(output_filename)
+
+    assert wrapper.progress == wrapper.total_progress
+    return outputs, [record for record in handler.records if 'processes' not in record[1]]
+
+
+def test_parallel_same_as_serial(tmpdir):
+    src_dir = os.path.join(os.path.dirname(__file__), 'interface', 'src')
+    sources = []
+    for source in sorted(glob.glob(os.path.join(src_dir, '*.f90'))):
+        sources.append(str(tmpdir.join(os.path.basename(source))))
+        shutil.copy(source, sources[-1])
+
+    serial_outputs, serial_log = _wrap(sources, 1)
+    parallel_outputs, parallel_log = _wrap(sources, 2)
+
+    assert len(serial_outputs) == 2 * len(sources)
+    assert parallel_outputs == serial_outputs
+    assert serial_log and parallel_log == serial_log
+
+
+def test_ast_with_cached_tree(tmpdir, monkeypatch):
+    monkeypatch.setenv('F2X_CACHE_DIR', str(tmpdir.join('cache')))
+    tmpdir.join('_ast.tl').write(u"{{ ast.head }}\n")
+    tmpdir.join('_head.txt.t').write(u"{% include '_ast.tl' %}")
+    source = str(tmpdir.join('source.f90'))
+    shutil.copy(os.path.join(os.path.dirname(__file__), 'interface', 'src', 'sub_call.f90'), source)
+
+    def wrap(*options):
+        args = argp.get_args_parser().parse_args(
+            ['-t', str(tmpdir.join('_head.txt.t'))] + list(options) + [source])
+        F2xWrapper(args, logging.Logger('F2x_test.wrapper')).run()
+        return tmpdir.join('source_head.txt').read()
+
+    assert wrap() == u'start'
+    assert wrap() == u'start'
+
+    from F2x.parser.plyplus.source import SourceFile
+
+    def fail(*args):
+        raise AssertionError("cached tree used")
+
+    monkeypatch.setattr(SourceFile, 'load_cached_gtree', fail)
+    assert wrap('-f') == u'start'
@@ -0,0 +1,24 @@
+MODULE PARTICLES
+
+    TYPE, PUBLIC :: PARTICLE
+        INTEGER :: ID
+        REAL(8) :: X
+        REAL(8) :: Y
+        REAL(8) :: Z
+        REAL :: MASS
+        LOGICAL :: ACTIVE
+        INTEGER(8) :: STEPS
+        CHARACTER(16) :: LABEL
+    END TYPE
+
+CONTAINS
+
+    SUBROUTINE MOVE(P, DX)
+        TYPE(PARTICLE), INTENT(INOUT) :: P
+        REAL(8), INTENT(IN) :: DX
+
+        P%X = P%X + DX
+        P%STEPS = P%STEPS + 1
+    END SUBROUTINE
+
+END
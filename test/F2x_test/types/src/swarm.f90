@@ -0,0 +1,78 @@
+MODULE SWARM
+
+    TYPE, PUBLIC :: BODY
+        INTEGER :: ID
+        REAL(8) :: X
+        REAL(8) :: V
+        REAL :: MASS
+    END TYPE
+
+    TYPE, PUBLIC :: MARKER
+        INTEGER :: ID
+        LOGICAL :: VISIBLE
+    END TYPE
+
+    TYPE, PUBLIC :: FLOCK
+        INTEGER :: COUNT
+        TYPE(BODY), DIMENSION(1000) :: BODIES
+        TYPE(BODY), DIMENSION(:), ALLOCATABLE :: EXTRA
+        TYPE(MARKER), DIMENSION(10) :: MARKERS
+        TYPE(BODY), DIMENSION(:), POINTER :: TRACKED => NULL()
+    END TYPE
+
+    TYPE, PUBLIC :: TRAIL
+        REAL(8), DIMENSION(:), ALLOCATABLE :: POINTS
+    END TYPE
+
+CONTAINS
+
+    SUBROUTINE ADVANCE(F, DT)
+        TYPE(FLOCK), INTENT(INOUT) :: F
+        REAL(8), INTENT(IN) :: DT
+
+        F%BODIES%X = F%BODIES%X + F%BODIES%V * DT
+    END SUBROUTINE
+
+    FUNCTION TOTAL_MASS(F) RESULT(MASS)
+        TYPE(FLOCK), INTENT(IN) :: F
+        REAL(8) :: MASS
+
+        MASS = SUM(F%BODIES%MASS)
+        IF (ALLOCATED(F%EXTRA)) MASS = MASS + SUM(F%EXTRA%MASS)
+    END FUNCTION
+
+    SUBROUTINE RENEW_EXTRA(F)
+        TYPE(FLOCK), INTENT(INOUT) :: F
+        TYPE(BODY), DIMENSION(:), ALLOCATABLE :: NEW_EXTRA
+
+        ALLOCATE(NEW_EXTRA(SIZE(F%EXTRA)))
+        NEW_EXTRA = F%EXTRA
+        CALL MOVE_ALLOC(NEW_EXTRA, F%EXTRA)
+    END SUBROUTINE
+
+    SUBROUTINE GROW_EXTRA(F, N)
+        TYPE(FLOCK), INTENT(INOUT) :: F
+        INTEGER, INTENT(IN) :: N
+
+        IF (ALLOCATED(F%EXTRA)) DEALLOCATE(F%EXTRA)
+        ALLOCATE(F%EXTRA(N))
+        F%EXTRA%MASS = 1.0
+    END SUBROUTINE
+
+    SUBROUTINE TRACK(F, STEP)
+        TYPE(FLOCK), INTENT(INOUT), TARGET :: F
+        INTEGER, INTENT(IN) :: STEP
+
+        F%TRACKED => F%BODIES(1:SIZE(F%BODIES):STEP)
+    END SUBROUTINE
+
+    SUBROUTINE RENEW_TRAIL(T)
+        TYPE(TRAIL), INTENT(INOUT) :: T
+        REAL(8), DIMENSION(:), ALLOCATABLE :: NEW_POINTS
+
+        ALLOCATE(NEW_POINTS(SIZE(T%POINTS)))
+        NEW_POINTS = T%POINTS
+        CALL MOVE_ALLOC(NEW_POINTS, T%POINTS)
+    END SUBROUTINE
+
+END
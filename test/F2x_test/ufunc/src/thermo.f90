@@ -0,0 +1,76 @@
+MODULE THERMO
+
+    USE F2X_ERR
+
+    PUBLIC
+
+    REAL(8), PARAMETER :: GAS_CONSTANT = 287.05
+
+CONTAINS
+
+    ELEMENTAL FUNCTION PRESSURE(RHO, T)
+        REAL(8), INTENT(IN) :: RHO
+        REAL(8), INTENT(IN) :: T
+        REAL(8) :: PRESSURE
+
+        PRESSURE = RHO * GAS_CONSTANT * T
+    END FUNCTION
+
+    ELEMENTAL FUNCTION IS_SUPERSONIC(V, C)
+        REAL(8), INTENT(IN) :: V
+        REAL(8), INTENT(IN) :: C
+        LOGICAL :: IS_SUPERSONIC
+
+        IS_SUPERSONIC = ABS(V) > C
+    END FUNCTION
+
+    ELEMENTAL FUNCTION CUBE_I4(X)
+        INTEGER, INTENT(IN) :: X
+        INTEGER :: CUBE_I4
+
+        CUBE_I4 = X * X * X
+    END FUNCTION
+
+    ELEMENTAL FUNCTION CUBE_R4(X)
+        REAL(4), INTENT(IN) :: X
+        REAL(4) :: CUBE_R4
+
+        CUBE_R4 = X * X * X
+    END FUNCTION
+
+    ELEMENTAL FUNCTION CUBE_R8(X)
+        REAL(8), INTENT(IN) :: X
+        REAL(8) :: CUBE_R8
+
+        CUBE_R8 = X * X * X
+    END FUNCTION
+
+    ELEMENTAL SUBROUTINE POLAR(X, Y, R, PHI)
+        REAL(8), INTENT(IN) :: X
+        REAL(8), INTENT(IN) :: Y
+        REAL(8), INTENT(OUT) :: R
+        REAL(8), INTENT(OUT) :: PHI
+
+        R = SQRT(X * X + Y * Y)
+        PHI = ATAN2(Y, X)
+    END SUBROUTINE
+
+    IMPURE ELEMENTAL SUBROUTINE TEMPERATURE(P, RHO, T)
+        REAL(8), INTENT(IN) :: P
+        REAL(8), INTENT(IN) :: RHO
+        REAL(8), INTENT(OUT) :: T
+
+        IF (RHO <= 0) THEN
+            CALL F2X_ERR_HANDLE(7)
+        END IF
+        T = P / (RHO * GAS_CONSTANT)
+    END SUBROUTINE
+
+    FUNCTION NOT_ELEMENTAL(X)
+        REAL(8), INTENT(IN) :: X
+        REAL(8) :: NOT_ELEMENTAL
+
+        NOT_ELEMENTAL = X
+    END FUNCTION
+
+END
@@ -0,0 +1,195 @@
+# -*- encoding: utf-8 -*-
+#
+# Copyright 2018 German Aerospace Center (DLR)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmarks for F2x and the wrappers of the test extensions.
+
+Build the test extensions first (:code:`python setup.py build_ext --inplace`), then run
+:code:`python benchmark.py [name ...]`. The results are only reported, they are not checked.
+"""
+import subprocess
+import sys
+import tempfile
+import time
+
+
+benchmarks = {}
+
+
+def benchmark(func):
+    """ Register a benchmark. """
+    benchmarks[func.__name__] = func
+    return func
+
+
+def best_time(func, repeat=5):
+    """ Get the best time of several runs of *func*. """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def calls_per_second(func, number=20000, repeat=5):
+    """ Get the best rate of several runs of *number* calls of *func*. """
+    def run():
+        for _ in range(number):
+            func()
+
+    return number / best_time(run, repeat)
+
+
+@benchmark
+def preprocess():
+    from F2x_test.test_preprocess import _make_source, _legacy_preprocess
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = _make_source(tmpdir, 200)
+        raw_source = src.source
+        line_count = len(src.source_lines)
+
+        def run_legacy():
+            src.source = raw_source
+            return _legacy_preprocess(src)
+
+        def run_single_pass():
+            src.source = raw_source
+            src.preprocess()
+
+        legacy_time = best_time(run_legacy)
+        single_pass_time = best_time(run_single_pass)
+
+    print(f'preprocess {line_count} lines: legacy {legacy_time:.3f} s, single pass {single_pass_time:.3f} s')
+
+
+@benchmark
+def array_from_pointer():
+    import ctypes
+    from F2x.template.ctypes.lib.glue import array_from_pointer
+    from F2x_test.test_glue import _fortran_array, _legacy_array_from_pointer
+
+    for dims in ([1000], [10, 10, 10]):
+        data, ptr = _fortran_array(ctypes.c_double, dims)
+        legacy_rate = calls_per_second(lambda: _legacy_array_from_pointer(ctypes.c_double, dims, ptr))
+        rate = calls_per_second(lambda: array_from_pointer(ctypes.c_double, dims, ptr))
+
+        print(f'array_from_pointer {len(dims)}-D: legacy {legacy_rate:.0f} calls/s, zero-copy {rate:.0f} calls/s')
+
+
+@benchmark
+def capi():
+    from F2x_test.capi.lib import scalars_glue as ctypes_scalars
+    from F2x_test.capi.stubs import scalars_glue as capi_scalars
+
+    ctypes_rate = calls_per_second(lambda: ctypes_scalars.AXPY(2.0, 3.0, 1.0))
+    capi_rate = calls_per_second(lambda: capi_scalars.AXPY(2.0, 3.0, 1.0))
+
+    print(f'AXPY: ctypes {ctypes_rate:.0f} calls/s, capi {capi_rate:.0f} calls/s')
+
+
+@benchmark
+def batch():
+    import numpy
+    from F2x_test.capi.lib import scalars_glue as scalars
+
+    a = numpy.arange(100000, dtype=numpy.int32)
+    b = numpy.ones_like(a)
+
+    loop_time = best_time(lambda: [scalars.ADD_INTEGERS(int(x), int(y)) for x, y in zip(a, b)], repeat=1)
+    batch_time = best_time(lambda: scalars.ADD_INTEGERS.batch(a, b))
+
+    print(f'ADD_INTEGERS: loop {loop_time:.4f} s, batch {batch_time:.4f} s')
+
+
+@benchmark
+def threads():
+    from concurrent.futures import ThreadPoolExecutor
+    from F2x_test.capi.lib import scalars_glue as scalars
+
+    n = 2000000
+
+    def run_serial():
+        for _ in range(4):
+            scalars.SLOW_SUM(n)
+
+    def run_threaded():
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(scalars.SLOW_SUM, [n] * 4))
+
+    serial_time = best_time(run_serial, repeat=3)
+    threaded_time = best_time(run_threaded, repeat=3)
+
+    print(f'SLOW_SUM: serial {serial_time:.3f} s, threaded {threaded_time:.3f} s')
+
+
+@benchmark
+def error_codes():
+    from F2x_test.capi.codes import scalars_glue as codes_scalars
+    from F2x_test.capi.lib import scalars_glue as ctypes_scalars
+
+    for name, args in (('ADD_INTEGERS', (40, 2)), ('AXPY', (2.0, 3.0, 1.0)), ('DOUBLE_INPLACE', (2.5, )),
+                       ('CHECKED_SQRT', (4.0, ))):
+        ctypes_rate = calls_per_second(lambda: getattr(ctypes_scalars, name)(*args))
+        codes_rate = calls_per_second(lambda: getattr(codes_scalars, name)(*args))
+        print(f'{name}: setjmp {ctypes_rate:.0f} calls/s, error codes {codes_rate:.0f} calls/s')
+
+
+@benchmark
+def profile():
+    from F2x_test.capi.lib import scalars_glue as scalars
+
+    plain_rate = calls_per_second(lambda: scalars.AXPY(2.0, 3.0, 1.0))
+    scalars.enable_profiling()
+    try:
+        profiled_rate = calls_per_second(lambda: scalars.AXPY(2.0, 3.0, 1.0))
+    finally:
+        scalars.disable_profiling()
+
+    print(f'AXPY: {plain_rate:.0f} calls/s, profiled {profiled_rate:.0f} calls/s')
+
+
+_IMPORT_BENCHMARK = """
+import time
+
+from F2x_test.capi.lib import glue
+
+start = time.perf_counter()
+from F2x_test.capi.stubs import scalars_glue as scalars
+import_time = time.perf_counter() - start
+
+start = time.perf_counter()
+scalars.ADD_INTEGERS(2, 3)
+for name in scalars.library._prototypes:
+    getattr(scalars.library, name)
+bind_time = time.perf_counter() - start
+
+print(import_time, bind_time)
+"""
+
+
+@benchmark
+def lazy_import():
+    output = subprocess.run([sys.executable, '-c', _IMPORT_BENCHMARK], check=True, capture_output=True, text=True)
+    import_time, bind_time = map(float, output.stdout.split())
+
+    print(f'scalars: import {import_time:.4f} s, load and bind all routines {bind_time:.4f} s')
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or list(benchmarks):
+        benchmarks[name]()
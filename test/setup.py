@@ -26,7 +26,8 @@ strategy.register_strategy('cython', CythonExtBuildStrategy(['cython']))
 setup(
     name="F2x tests",
 
-    packages=['F2x_test', 'F2x_test.interface', 'cython_ex'],
+    packages=['F2x_test', 'F2x_test.interface', 'F2x_test.capi', 'F2x_test.cfi', 'F2x_test.types', 'F2x_test.ufunc',
+              'F2x_test.shared', 'cython_ex'],
 
     ext_modules=[
         Extension('F2x_test.interface.lib.*', ['F2x_test/interface/src/*.f90'],
@@ -34,6 +35,44 @@ setup(
                   strategy='lib',
                   inline_sources=False),
 
+        Extension('F2x_test.capi.lib.*', ['F2x_test/capi/src/*.f90'],
+                  library_name='flib_scalars',
+                  strategy='lib',
+                  inline_sources=False),
+
+        Extension('F2x_test.capi.stubs.*', ['F2x_test/capi/src/*.f90'],
+                  library_name='flib_scalars_capi',
+                  strategy='lib_capi',
+                  inline_sources=False),
+
+        Extension('F2x_test.capi.codes.*', ['F2x_test/capi/src/*.f90'],
+                  library_name='flib_scalars_codes',
+                  strategy='lib_codes',
+                  inline_sources=False),
+
+        Extension('F2x_test.cfi.lib.*', ['F2x_test/cfi/src/*.f90'],
+                  library_name='flib_matrices',
+                  strategy='lib_cfi',
+                  inline_sources=False),
+
+        Extension('F2x_test.types.lib.*', ['F2x_test/types/src/*.f90'],
+                  library_name='flib_particles',
+                  strategy='lib',
+                  inline_sources=False),
+
+        Extension('F2x_test.ufunc.lib.*', ['F2x_test/ufunc/src/*.f90'],
+                  library_name='flib_thermo',
+                  strategy='lib_ufunc',
+                  inline_sources=False),
+
+        Extension('F2x_test.shared.lib.*', ['F2x_test/shared/src/counter.f90'],
+                  strategy='lib_package',
+                  inline_sources=False),
+
+        Extension('F2x_test.shared.lib.*', ['F2x_test/shared/src/report.f90'],
+                  strategy='lib_package',
+                  inline_sources=False),
+
         Extension('F2x_test.interface.bindc_new.*', ['F2x_test/interface/src/*.f90',
                                                      'cython_ex/simple.f90', 'cython_ex/second.f90'],
                   library_name='flib_bindc_new',